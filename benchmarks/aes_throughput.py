@@ -0,0 +1,76 @@
+"""
+Compare plain and WinZip AES throughput (MB/s) for each available crypto backend.
+
+Run from the package root:
+
+    python benchmarks/aes_throughput.py --size-mb 256
+
+Entries are STORED so the numbers measure crypto and I/O, not compression.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyzipper
+from zip_utils.crypto import available_backends, register_crypto_backend
+from zip_utils.progress import CHUNK_SIZE
+
+PASSWORD = b"benchmark-password"
+
+
+def _write(path, payload, total_bytes, encrypted):
+    """Helper function to write one STORED entry of ``total_bytes`` in CHUNK_SIZE pieces"""
+    with pyzipper.AESZipFile(path, 'w', compression=pyzipper.ZIP_STORED) as zip_file:
+        if encrypted:
+            zip_file.setpassword(PASSWORD)
+            zip_file.setencryption(pyzipper.WZ_AES, nbits=256)
+        with zip_file.open('data.bin', 'w', force_zip64=True) as target:
+            written = 0
+            while written < total_bytes:
+                target.write(payload)
+                written += len(payload)
+
+
+def _read(path, encrypted):
+    """Helper function to read the entry back, checking CRC/HMAC"""
+    with pyzipper.AESZipFile(path, 'r') as zip_file:
+        if encrypted:
+            zip_file.setpassword(PASSWORD)
+        with zip_file.open('data.bin') as source:
+            while source.read(CHUNK_SIZE):
+                pass
+
+
+def _rate(total_bytes, func, *args):
+    """Helper function returning MB/s for one call"""
+    start = time.perf_counter()
+    func(*args)
+    return total_bytes / (1024 * 1024) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=128, help="entry size in MB")
+    args = parser.parse_args()
+
+    total_bytes = args.size_mb * 1024 * 1024
+    payload = os.urandom(CHUNK_SIZE)
+    runs = [("plain", None)] + [(f"aes256/{name}", name) for name in available_backends()]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'bench.zip')
+        print(f"{'mode':<22}{'write MB/s':>12}{'read MB/s':>12}")
+        for label, backend in runs:
+            if backend is not None:
+                register_crypto_backend(backend)
+            write_rate = _rate(total_bytes, _write, path, payload, total_bytes, backend is not None)
+            read_rate = _rate(total_bytes, _read, path, backend is not None)
+            print(f"{label:<22}{write_rate:>12.1f}{read_rate:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Measure how long each task module takes to import in a fresh interpreter.
+
+Run from the package root:
+
+    python benchmarks/import_time.py --runs 5 --top 5
+
+Each run starts a new Python process, so module caches do not hide the cost.
+The time covers loading ``tasks/<name>/__init__.py`` and everything it
+imports, but not interpreter start-up. ``--top`` also lists the slowest
+imports of each task, taken from ``python -X importtime``.
+
+``oocana`` shows up near the top for every task; in a real flow the executor
+has already imported it, so only the rest is paid per task.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASKS_DIR = os.path.join(PACKAGE_ROOT, 'tasks')
+
+# Imported by the measuring snippet itself, not by the task
+_HARNESS_MODULES = {'importlib.util', 'time'}
+
+# Loads a task the way the runtime does: by file path, with the package root importable
+_LOAD_TASK = """
+import importlib.util, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('task', {path!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+heavy = [name for name in ('pandas', 'chardet') if name in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def _import_once(path):
+    """Helper function returning (seconds, heavy modules loaded) for one fresh import"""
+    code = _LOAD_TASK.format(root=PACKAGE_ROOT, path=path)
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True,
+                            text=True, cwd=PACKAGE_ROOT).stdout.split()
+    return float(output[0]), output[1] if len(output) > 1 else ''
+
+
+def _slowest_imports(path, count):
+    """Helper function listing the ``count`` top-level imports with the highest cumulative time"""
+    code = _LOAD_TASK.format(root=PACKAGE_ROOT, path=path)
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], check=True,
+                            capture_output=True, text=True, cwd=PACKAGE_ROOT).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Only modules imported directly by the task (no leading indentation)
+        if cumulative.strip().isdigit() and not name.startswith('  ', 1) and name.strip() not in _HARNESS_MODULES:
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help="fresh imports per task")
+    parser.add_argument('--top', type=int, default=0, help="also list the N slowest imports per task")
+    parser.add_argument('tasks', nargs='*', help="task names (default: all)")
+    args = parser.parse_args()
+
+    tasks = args.tasks or sorted(name for name in os.listdir(TASKS_DIR)
+                                 if os.path.isfile(os.path.join(TASKS_DIR, name, '__init__.py')))
+
+    print(f"{'task':<26}{'median ms':>11}{'min ms':>9}  heavy modules loaded")
+    for task in tasks:
+        path = os.path.join(TASKS_DIR, task, '__init__.py')
+        samples = [_import_once(path) for _ in range(args.runs)]
+        times = [seconds * 1000 for seconds, _ in samples]
+        heavy = samples[-1][1] or '-'
+        print(f"{task:<26}{statistics.median(times):>11.1f}{min(times):>9.1f}  {heavy}")
+        for cumulative, name in _slowest_imports(path, args.top):
+            print(f"    {cumulative / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
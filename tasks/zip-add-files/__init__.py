@@ -6,6 +6,9 @@ class Inputs(typing.TypedDict):
     archive_path_prefix: str | None
     password: str | None
     overwrite_existing: bool
+    include_patterns: list[str] | None
+    exclude_patterns: list[str] | None
+    stat_workers: int
 class Outputs(typing.TypedDict):
     zip_path: typing.NotRequired[str]
     added_files_count: typing.NotRequired[float]
@@ -18,6 +21,16 @@ import os
 import shutil
 import tempfile
 import pyzipper
+from zip_utils.progress import ProgressReporter, transcode_member, write_file
+from zip_utils.scanner import scan_source
+from zip_utils.handles import discard_archive, open_archive
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -35,6 +48,9 @@ def main(params: Inputs, context: Context) -> Outputs:
     archive_path_prefix = params.get("archive_path_prefix", "") or ""
     password = params.get("password")
     overwrite_existing = params["overwrite_existing"]
+    include_patterns = params.get("include_patterns")
+    exclude_patterns = params.get("exclude_patterns")
+    stat_workers = params.get("stat_workers", 0)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -46,6 +62,7 @@ def main(params: Inputs, context: Context) -> Outputs:
     
     files_added = []
     added_files_count = 0
+    reporter = ProgressReporter(context, label="Adding files")
     
     # Create temporary file for modification
     with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_file:
@@ -53,21 +70,21 @@ def main(params: Inputs, context: Context) -> Outputs:
     
     try:
         # Read existing ZIP and copy contents to new ZIP
-        with pyzipper.AESZipFile(zip_path, 'r') as existing_zip:
+        with open_archive(zip_path) as existing_zip:
             if password:
                 existing_zip.setpassword(password.encode('utf-8'))
             
             # Get list of existing files
             existing_files = set(existing_zip.namelist())
+            reporter.add_total(sum(info.file_size for info in existing_zip.infolist()), len(existing_files))
             
             with pyzipper.AESZipFile(temp_zip_path, 'w', compression=pyzipper.ZIP_DEFLATED) as new_zip:
                 if password:
                     new_zip.setpassword(password.encode('utf-8'))
                 
-                # Copy existing files
+                # Copy existing files, re-encoded chunk by chunk instead of read whole
                 for item in existing_files:
-                    data = existing_zip.read(item)
-                    new_zip.writestr(item, data)
+                    transcode_member(existing_zip, item, new_zip, item, reporter)
                 
                 # Add new files
                 for file_path in files_to_add:
@@ -80,27 +97,27 @@ def main(params: Inputs, context: Context) -> Outputs:
                         if archive_name in existing_files and not overwrite_existing:
                             continue
                         
-                        new_zip.write(file_path, archive_name)
+                        reporter.add_total(os.path.getsize(file_path), 1)
+                        write_file(new_zip, file_path, archive_name, reporter)
                         files_added.append(archive_name)
                         added_files_count += 1
                         
                     elif os.path.isdir(file_path):
                         # Directory
-                        for root, dirs, files in os.walk(file_path):
-                            for file in files:
-                                full_file_path = os.path.join(root, file)
-                                rel_path = os.path.relpath(full_file_path, os.path.dirname(file_path))
-                                archive_name = os.path.join(archive_path_prefix, rel_path) if archive_path_prefix else rel_path
-                                
-                                # Check if file already exists
-                                if archive_name in existing_files and not overwrite_existing:
-                                    continue
-                                
-                                new_zip.write(full_file_path, archive_name)
-                                files_added.append(archive_name)
-                                added_files_count += 1
+                        for entry in scan_source(file_path, True, include_patterns, exclude_patterns, stat_workers):
+                            archive_name = os.path.join(archive_path_prefix, entry.arcname) if archive_path_prefix else entry.arcname
+                            
+                            # Check if file already exists
+                            if archive_name in existing_files and not overwrite_existing:
+                                continue
+                            
+                            reporter.add_total(entry.size, 1)
+                            write_file(new_zip, entry.path, archive_name, reporter, file_stat=entry.stat)
+                            files_added.append(archive_name)
+                            added_files_count += 1
         
         # Replace original ZIP with modified one
+        discard_archive(zip_path)
         shutil.move(temp_zip_path, zip_path)
         
     except Exception as e:
@@ -109,6 +126,8 @@ def main(params: Inputs, context: Context) -> Outputs:
             os.unlink(temp_zip_path)
         raise e
     
+    reporter.finish()
+    
     # Get new file size
     new_size = os.path.getsize(zip_path)
     
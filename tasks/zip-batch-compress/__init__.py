@@ -7,6 +7,15 @@ class Inputs(typing.TypedDict):
     add_timestamp: bool
     password: str | None
     include_subdirectories: bool
+    compression_method: typing.Literal["DEFLATED", "STORED", "BZIP2", "LZMA", "ZSTD"]
+    max_workers: int
+    max_io_concurrency: int
+    include_patterns: list[str] | None
+    exclude_patterns: list[str] | None
+    stat_workers: int
+    result_format: typing.Literal["dataframe", "dict"]
+    resume: bool
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     created_zips: typing.NotRequired[list[str]]
     total_original_size: typing.NotRequired[float]
@@ -17,9 +26,21 @@ class Outputs(typing.TypedDict):
 
 from oocana import Context
 import os
+import collections
 import datetime
-import pandas as pd
-import pyzipper
+from zip_utils.progress import OperationCancelled, ProgressReporter, remove_partial
+from zip_utils.budget import process_workers
+from zip_utils.batch import PARTIAL_SUFFIX, FolderResult, compress_folder, compress_folders_parallel
+from zip_utils.journal import BatchJournal, batch_signature
+from zip_utils.scanner import scan_source, tree_fingerprint
+from zip_utils.results import make_table
+from zip_utils.compression import compression_from_name, register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -38,10 +59,27 @@ def main(params: Inputs, context: Context) -> Outputs:
     add_timestamp = params["add_timestamp"]
     password = params.get("password")
     include_subdirectories = params["include_subdirectories"]
+    compression_method = params.get("compression_method", "DEFLATED")
+    compression_type = compression_from_name(compression_method)
+    # Sequential unless the pool is asked for: max_workers processes, 0 for one per CPU the
+    # container allows, as many as max_memory_mb can hold
+    max_workers = process_workers(params.get("max_memory_mb") or 0, params.get("max_workers", 1))
+    max_io_concurrency = params.get("max_io_concurrency", 4)
+    include_patterns = params.get("include_patterns")
+    exclude_patterns = params.get("exclude_patterns")
+    stat_workers = params.get("stat_workers", 0)
+    result_format = params.get("result_format", "dataframe")
+    resume = params.get("resume", True)
     
     # Ensure output directory exists
     os.makedirs(output_directory, exist_ok=True)
     
+    # Reruns of the same batch share a journal: names stay stable and finished folders are skipped
+    signature = batch_signature([os.path.realpath(folder) for folder in source_folders], compression_method,
+                                compression_level, add_timestamp, bool(password), include_subdirectories,
+                                include_patterns, exclude_patterns)
+    journal = BatchJournal(output_directory, signature, resume=resume)
+    
     created_zips = []
     total_original_size = 0
     total_compressed_size = 0
@@ -49,74 +87,125 @@ def main(params: Inputs, context: Context) -> Outputs:
     
     timestamp_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S") if add_timestamp else ""
     
-    for i, folder_path in enumerate(source_folders):
+    # Pick every output name up front so parallel workers can't claim the same one
+    folders = []
+    jobs = []
+    job_keys = []
+    reserved_paths = set(journal.planned.values())
+    occurrences = collections.Counter()
+    for folder_path in source_folders:
         if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
             continue
         
         folder_name = os.path.basename(folder_path.rstrip(os.sep))
+        real_path = os.path.realpath(folder_path)
+        occurrences[real_path] += 1
+        job_key = f"{real_path}#{occurrences[real_path]}"
         
-        # Create ZIP filename
-        if add_timestamp:
-            zip_filename = f"{folder_name}_{timestamp_str}.zip"
-        else:
-            zip_filename = f"{folder_name}.zip"
-        
-        zip_path = os.path.join(output_directory, zip_filename)
-        
-        # Handle duplicate filenames
-        counter = 1
-        while os.path.exists(zip_path):
-            base_name = zip_filename.rsplit('.', 1)[0]
-            zip_filename = f"{base_name}_{counter}.zip"
-            zip_path = os.path.join(output_directory, zip_filename)
-            counter += 1
-        
-        folder_original_size = 0
-        
-        try:
-            # Create ZIP file
-            if password:
-                with pyzipper.AESZipFile(zip_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
-                                       compresslevel=compression_level, encryption=pyzipper.WZ_AES256) as zip_file:
-                    zip_file.setpassword(password.encode('utf-8'))
-                    folder_original_size = _add_folder_to_zip(zip_file, folder_path, include_subdirectories)
+        # An interrupted run already named this folder's archive
+        zip_path = journal.planned.get(job_key)
+        if zip_path is None:
+            # Create ZIP filename
+            if add_timestamp:
+                zip_filename = f"{folder_name}_{timestamp_str}.zip"
             else:
-                with pyzipper.AESZipFile(zip_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
-                                       compresslevel=compression_level) as zip_file:
-                    folder_original_size = _add_folder_to_zip(zip_file, folder_path, include_subdirectories)
-            
-            # Get compressed size
-            compressed_size = os.path.getsize(zip_path)
-            compression_ratio = ((folder_original_size - compressed_size) / folder_original_size) * 100 if folder_original_size > 0 else 0
-            
-            created_zips.append(zip_path)
-            total_original_size += folder_original_size
-            total_compressed_size += compressed_size
+                zip_filename = f"{folder_name}.zip"
             
-            processing_results.append({
-                "folder_name": folder_name,
-                "zip_path": zip_path,
-                "original_size_mb": round(folder_original_size / 1024 / 1024, 2),
-                "compressed_size_mb": round(compressed_size / 1024 / 1024, 2),
-                "compression_ratio": round(compression_ratio, 2),
-                "status": "Success"
-            })
+            zip_path = os.path.join(output_directory, zip_filename)
             
-        except Exception as e:
+            # Handle duplicate filenames
+            counter = 1
+            while os.path.exists(zip_path) or zip_path in reserved_paths:
+                base_name = zip_filename.rsplit('.', 1)[0]
+                zip_filename = f"{base_name}_{counter}.zip"
+                zip_path = os.path.join(output_directory, zip_filename)
+                counter += 1
+            reserved_paths.add(zip_path)
+            journal.plan(job_key, zip_path)
+        
+        # Skip folders whose archive a previous run finished from the same files
+        finished = None
+        if job_key in journal.done:
+            fingerprint = tree_fingerprint(scan_source(folder_path, include_subdirectories, include_patterns,
+                                                       exclude_patterns, stat_workers))
+            finished = journal.finished(job_key, fingerprint)
+        if finished is not None:
+            folders.append((folder_name, zip_path,
+                            FolderResult(finished["original_size"], finished["compressed_size"], fingerprint)))
+            continue
+        
+        # Left behind by a run that died while writing it
+        remove_partial(zip_path + PARTIAL_SUFFIX)
+        folders.append((folder_name, zip_path, len(jobs)))
+        job_keys.append(job_key)
+        jobs.append((folder_path, zip_path, compression_type, compression_level, password, include_subdirectories,
+                     include_patterns, exclude_patterns, stat_workers))
+    
+    def record_result(index, result):
+        """Journal each archive as soon as it is complete, so a crash after it doesn't redo it"""
+        if not isinstance(result, Exception):
+            journal.complete(job_keys[index], jobs[index][1], result.original_size, result.compressed_size,
+                             result.fingerprint)
+    
+    # Totals grow as each folder is scanned
+    reporter = ProgressReporter(context, label="Batch compressing")
+    
+    max_workers = min(max_workers, len(jobs))
+    if max_workers > 1:
+        # One archive per process; results come back in input order
+        results = compress_folders_parallel(jobs, reporter, max_workers, max_io_concurrency, record_result)
+    else:
+        results = []
+        for index, job in enumerate(jobs):
+            try:
+                results.append(compress_folder(*job, reporter=reporter))
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                results.append(e)
+            record_result(index, results[-1])
+    
+    for folder_name, zip_path, result in folders:
+        if isinstance(result, int):
+            result = results[result]
+        if isinstance(result, Exception):
             processing_results.append({
                 "folder_name": folder_name,
                 "zip_path": "",
                 "original_size_mb": 0,
                 "compressed_size_mb": 0,
                 "compression_ratio": 0,
-                "status": f"Error: {str(e)}"
+                "status": f"Error: {str(result)}"
             })
+            continue
+        
+        folder_original_size, compressed_size = result.original_size, result.compressed_size
+        compression_ratio = ((folder_original_size - compressed_size) / folder_original_size) * 100 if folder_original_size > 0 else 0
+        
+        created_zips.append(zip_path)
+        total_original_size += folder_original_size
+        total_compressed_size += compressed_size
+        
+        processing_results.append({
+            "folder_name": folder_name,
+            "zip_path": zip_path,
+            "original_size_mb": round(folder_original_size / 1024 / 1024, 2),
+            "compressed_size_mb": round(compressed_size / 1024 / 1024, 2),
+            "compression_ratio": round(compression_ratio, 2),
+            "status": "Success"
+        })
+    
+    reporter.finish()
+    
+    # A batch that went through has nothing left to resume; one with failed folders retries only those
+    if not any(isinstance(result, Exception) for result in results):
+        journal.remove()
     
     # Calculate overall compression ratio
     overall_compression_ratio = ((total_original_size - total_compressed_size) / total_original_size) * 100 if total_original_size > 0 else 0
     
-    # Create summary DataFrame
-    summary_df = pd.DataFrame(processing_results)
+    # Create summary table
+    summary_df = make_table(processing_results, result_format)
     
     return {
         "created_zips": created_zips,
@@ -125,27 +214,3 @@ def main(params: Inputs, context: Context) -> Outputs:
         "overall_compression_ratio": round(overall_compression_ratio, 2),
         "processing_summary": summary_df
     }
-
-def _add_folder_to_zip(zip_file, folder_path, include_subdirectories):
-    """Helper function to add folder contents to ZIP file"""
-    total_size = 0
-    
-    for root, dirs, files in os.walk(folder_path):
-        # Skip subdirectories if not included
-        if not include_subdirectories and root != folder_path:
-            continue
-            
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_size = os.path.getsize(file_path)
-            total_size += file_size
-            
-            # Calculate relative path for archive
-            if include_subdirectories:
-                arcname = os.path.relpath(file_path, os.path.dirname(folder_path))
-            else:
-                arcname = os.path.join(os.path.basename(folder_path), file)
-            
-            zip_file.write(file_path, arcname)
-    
-    return total_size
\ No newline at end of file
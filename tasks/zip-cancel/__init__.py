@@ -0,0 +1,35 @@
+#region generated meta
+import typing
+class Inputs(typing.TypedDict):
+    job_ids: list[str] | None
+    all_sessions: bool
+class Outputs(typing.TypedDict):
+    cancelled_jobs: typing.NotRequired[list[str]]
+#endregion
+
+from oocana import Context
+from zip_utils.progress import cancel_running
+
+def main(params: Inputs, context: Context) -> Outputs:
+    """
+    Stop running ZIP tasks at their next chunk; they remove their partial output
+    
+    Args:
+        params: Input parameters selecting the jobs to cancel
+        context: OOMOL context object
+        
+    Returns:
+        The job ids that were asked to stop
+    """
+    job_ids = params.get("job_ids") or []
+    all_sessions = params.get("all_sessions", False)
+    
+    # Tasks of this flow run only, unless asked otherwise
+    session_id = None if all_sessions else context.session_id
+    cancelled_jobs = cancel_running(session_id, job_ids)
+    
+    context.report_log(f"Cancellation requested for {len(cancelled_jobs)} running task(s)")
+    
+    return {
+        "cancelled_jobs": cancelled_jobs
+    }
@@ -4,8 +4,13 @@ class Inputs(typing.TypedDict):
     source_path: str
     output_path: str
     compression_level: int
-    compression_method: typing.Literal["DEFLATED", "STORED", "BZIP2", "LZMA"]
+    compression_method: typing.Literal["DEFLATED", "STORED", "BZIP2", "LZMA", "ZSTD"]
     include_subdirectories: bool
+    streaming_output: bool
+    include_patterns: list[str] | None
+    exclude_patterns: list[str] | None
+    stat_workers: int
+    store_patterns: list[str] | None
 class Outputs(typing.TypedDict):
     zip_path: typing.NotRequired[str]
     compressed_size: typing.NotRequired[float]
@@ -18,6 +23,16 @@ from oocana import Context
 import os
 import time
 import pyzipper
+from zip_utils.progress import ProgressReporter, remove_partial, write_file
+from zip_utils.streaming import StreamSink
+from zip_utils.scanner import path_matcher, scan_source
+from zip_utils.compression import compression_from_name, register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -35,6 +50,11 @@ def main(params: Inputs, context: Context) -> Outputs:
     compression_level = params["compression_level"]
     compression_method = params["compression_method"]
     include_subdirectories = params["include_subdirectories"]
+    streaming_output = params.get("streaming_output", False)
+    include_patterns = params.get("include_patterns")
+    exclude_patterns = params.get("exclude_patterns")
+    stat_workers = params.get("stat_workers", 0)
+    store_patterns = params.get("store_patterns")
     
     if not os.path.exists(source_path):
         raise FileNotFoundError(f"Source path does not exist: {source_path}")
@@ -44,48 +64,43 @@ def main(params: Inputs, context: Context) -> Outputs:
     os.makedirs(output_dir, exist_ok=True)
     
     # Map compression method string to constant
-    method_map = {
-        "DEFLATED": pyzipper.ZIP_DEFLATED,
-        "STORED": pyzipper.ZIP_STORED,
-        "BZIP2": pyzipper.ZIP_BZIP2,
-        "LZMA": pyzipper.ZIP_LZMA
-    }
-    compression_type = method_map.get(compression_method, pyzipper.ZIP_DEFLATED)
+    compression_type = compression_from_name(compression_method)
     
-    original_size = 0
     start_time = time.time()
     
-    with pyzipper.AESZipFile(output_path, 'w', compression=compression_type, compresslevel=compression_level) as zip_file:
-        if os.path.isfile(source_path):
-            # Single file compression
-            file_size = os.path.getsize(source_path)
-            original_size += file_size
-            zip_file.write(source_path, os.path.basename(source_path))
-            
-        elif os.path.isdir(source_path):
-            # Directory compression
-            for root, dirs, files in os.walk(source_path):
-                # Skip subdirectories if not included
-                if not include_subdirectories and root != source_path:
-                    continue
-                    
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_size = os.path.getsize(file_path)
-                    original_size += file_size
-                    
-                    # Calculate relative path for archive
-                    if include_subdirectories:
-                        arcname = os.path.relpath(file_path, os.path.dirname(source_path))
-                    else:
-                        arcname = file
-                    
-                    zip_file.write(file_path, arcname)
+    # Collect files first so progress can be reported against a known total;
+    # subfolders are kept under the source folder's name, top-level-only scans aren't
+    entries = scan_source(source_path, include_subdirectories, include_patterns, exclude_patterns,
+                          stat_workers, root_name=include_subdirectories)
+    
+    original_size = sum(entry.size for entry in entries)
+    reporter = ProgressReporter(context, total_bytes=original_size, total_entries=len(entries), label="Compressing")
+    
+    # Streaming output never seeks back, so output_path may be a pipe/FIFO or socket
+    sink = StreamSink.open(output_path) if streaming_output else None
+    
+    try:
+        with pyzipper.AESZipFile(sink or output_path, 'w', compression=compression_type, compresslevel=compression_level) as zip_file:
+            # Already-compressed files (media, archives) are stored as-is, which also lets them be copied in-kernel
+            store_only = path_matcher(store_patterns)
+            for entry in entries:
+                compress_type = pyzipper.ZIP_STORED if store_only(entry.arcname) else None
+                write_file(zip_file, entry.path, entry.arcname, reporter, file_stat=entry.stat,
+                           compress_type=compress_type)
+    except Exception:
+        # Don't leave a truncated archive behind on failure or cancellation
+        remove_partial(output_path)
+        raise
+    finally:
+        if sink is not None:
+            sink.close()
+    
+    reporter.finish()
     
     compression_time = time.time() - start_time
     
-    # Get compressed size
-    compressed_size = os.path.getsize(output_path)
+    # Get compressed size; a streamed output may be a pipe, so count the bytes written
+    compressed_size = sink.bytes_written if sink is not None else os.path.getsize(output_path)
     
     # Calculate compression ratio
     if original_size > 0:
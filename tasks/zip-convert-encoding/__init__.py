@@ -9,6 +9,7 @@ class Inputs(typing.TypedDict):
     password: str | None
     output_password: str | None
     preserve_timestamps: bool
+    result_format: typing.Literal["dataframe", "dict"]
 class Outputs(typing.TypedDict):
     converted_zip_path: typing.NotRequired[str]
     conversion_summary: typing.NotRequired[dict]
@@ -19,9 +20,17 @@ class Outputs(typing.TypedDict):
 
 from oocana import Context
 import os
-import chardet
-import pandas as pd
 import pyzipper
+from zip_utils.progress import transcode_member
+from zip_utils.results import make_table
+from zip_utils.handles import open_archive
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -42,6 +51,7 @@ def main(params: Inputs, context: Context) -> Outputs:
     output_password = params.get("output_password")
     fix_garbled_names = params["fix_garbled_names"]
     preserve_timestamps = params["preserve_timestamps"]
+    result_format = params.get("result_format", "dataframe")
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -63,8 +73,9 @@ def main(params: Inputs, context: Context) -> Outputs:
         if source_encoding != "auto":
             return source_encoding
         
-        # Try chardet first
+        # Try chardet first (imported only when auto-detection actually runs)
         try:
+            import chardet
             detection = chardet.detect(raw_filename_bytes)
             if detection and detection['confidence'] > 0.7:
                 return detection['encoding'].lower()
@@ -108,17 +119,15 @@ def main(params: Inputs, context: Context) -> Outputs:
         return filename
     
     # Read source ZIP and create output ZIP
-    output_encryption = pyzipper.WZ_AES256 if output_password else None
-    
-    with pyzipper.AESZipFile(zip_path, 'r') as source_zip:
+    with open_archive(zip_path) as source_zip:
         if password:
             source_zip.setpassword(password.encode('utf-8'))
         
-        with pyzipper.AESZipFile(output_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
-                                encryption=output_encryption) as output_zip:
+        with pyzipper.AESZipFile(output_path, 'w', compression=pyzipper.ZIP_DEFLATED) as output_zip:
             
             if output_password:
                 output_zip.setpassword(output_password.encode('utf-8'))
+                output_zip.setencryption(pyzipper.WZ_AES, nbits=256)
             
             for file_info in source_zip.infolist():
                 original_filename = file_info.filename
@@ -158,17 +167,14 @@ def main(params: Inputs, context: Context) -> Outputs:
                         except (UnicodeDecodeError, UnicodeError):
                             pass  # Keep UTF-8 version
                     
-                    # Read file data
-                    file_data = source_zip.read(original_filename)
-                    
                     # Create new ZipInfo with corrected filename
-                    new_info = pyzipper.ZipInfo(converted_filename)
+                    new_info = output_zip.zipinfo_cls(converted_filename)
                     if preserve_timestamps:
                         new_info.date_time = file_info.date_time
                     new_info.compress_type = file_info.compress_type
                     
-                    # Write to output ZIP
-                    output_zip.writestr(new_info, file_data)
+                    # Write to output ZIP, streamed in chunks rather than read whole
+                    transcode_member(source_zip, file_info, output_zip, new_info)
                     
                     files_converted += 1
                     if had_encoding_issue:
@@ -194,11 +200,9 @@ def main(params: Inputs, context: Context) -> Outputs:
                         "file_size": getattr(file_info, 'file_size', 0)
                     })
     
-    # Create summary DataFrame
-    summary_df = pd.DataFrame(conversion_details)
-    
-    # Add summary statistics
-    if not summary_df.empty:
+    # Summary statistics, added as a last row after a blank one
+    summary_stats = None
+    if conversion_details:
         summary_stats = {
             "original_file": os.path.basename(zip_path),
             "converted_file": os.path.basename(output_path),
@@ -210,10 +214,9 @@ def main(params: Inputs, context: Context) -> Outputs:
             "success_rate": round((files_converted / len(conversion_details)) * 100, 1) if conversion_details else 0,
             "most_detected_encoding": detected_encoding
         }
-        
-        # Add summary row
-        summary_row = pd.DataFrame([summary_stats])
-        summary_df = pd.concat([summary_df, pd.DataFrame([{}]), summary_row], ignore_index=True)
+    
+    # Create summary table
+    summary_df = make_table(conversion_details, result_format, summary=summary_stats)
     
     return {
         "converted_zip_path": output_path,
@@ -6,6 +6,12 @@ class Inputs(typing.TypedDict):
     password: str
     encryption_strength: typing.Literal["128", "192", "256"]
     include_subdirectories: bool
+    streaming_output: bool
+    include_patterns: list[str] | None
+    exclude_patterns: list[str] | None
+    stat_workers: int
+    max_workers: int
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     zip_path: typing.NotRequired[str]
     compressed_size: typing.NotRequired[float]
@@ -16,6 +22,18 @@ class Outputs(typing.TypedDict):
 from oocana import Context
 import os
 import pyzipper
+from zip_utils.progress import ProgressReporter, remove_partial
+from zip_utils.budget import resources_from_params
+from zip_utils.pipeline import write_files_parallel
+from zip_utils.streaming import StreamSink
+from zip_utils.scanner import scan_source
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -33,6 +51,12 @@ def main(params: Inputs, context: Context) -> Outputs:
     password = params["password"]
     encryption_strength = params["encryption_strength"]
     include_subdirectories = params["include_subdirectories"]
+    streaming_output = params.get("streaming_output", False)
+    include_patterns = params.get("include_patterns")
+    exclude_patterns = params.get("exclude_patterns")
+    stat_workers = params.get("stat_workers", 0)
+    # Workers, queue depth and buffers sized to max_memory_mb and the container's limits
+    resources = resources_from_params(params)
     
     if not os.path.exists(source_path):
         raise FileNotFoundError(f"Source path does not exist: {source_path}")
@@ -44,42 +68,41 @@ def main(params: Inputs, context: Context) -> Outputs:
     output_dir = os.path.dirname(output_path)
     os.makedirs(output_dir, exist_ok=True)
     
-    # Set encryption type - pyzipper only supports WZ_AES (defaults to AES-256)
+    # Set encryption type - pyzipper only supports WZ_AES, with 128/192/256-bit keys
     encryption_type = pyzipper.WZ_AES
     
-    original_size = 0
+    # Collect files first so progress can be reported against a known total;
+    # subfolders are kept under the source folder's name, top-level-only scans aren't
+    entries = scan_source(source_path, include_subdirectories, include_patterns, exclude_patterns,
+                          stat_workers, root_name=include_subdirectories)
     
-    with pyzipper.AESZipFile(output_path, 'w', compression=pyzipper.ZIP_DEFLATED, encryption=encryption_type) as zip_file:
-        zip_file.setpassword(password.encode('utf-8'))
-        
-        if os.path.isfile(source_path):
-            # Single file compression
-            file_size = os.path.getsize(source_path)
-            original_size += file_size
-            zip_file.write(source_path, os.path.basename(source_path))
+    original_size = sum(entry.size for entry in entries)
+    reporter = ProgressReporter(context, total_bytes=original_size, total_entries=len(entries), label="Compressing")
+    
+    # Streaming output never seeks back, so output_path may be a pipe/FIFO or socket
+    sink = StreamSink.open(output_path) if streaming_output else None
+    
+    try:
+        with pyzipper.AESZipFile(sink or output_path, 'w', compression=pyzipper.ZIP_DEFLATED, encryption=encryption_type) as zip_file:
+            zip_file.setpassword(password.encode('utf-8'))
+            zip_file.setencryption(encryption_type, nbits=int(encryption_strength))
             
-        elif os.path.isdir(source_path):
-            # Directory compression
-            for root, dirs, files in os.walk(source_path):
-                # Skip subdirectories if not included
-                if not include_subdirectories and root != source_path:
-                    continue
-                    
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_size = os.path.getsize(file_path)
-                    original_size += file_size
-                    
-                    # Calculate relative path for archive
-                    if include_subdirectories:
-                        arcname = os.path.relpath(file_path, os.path.dirname(source_path))
-                    else:
-                        arcname = file
-                    
-                    zip_file.write(file_path, arcname)
+            # Key derivation, compression and AES run on a worker pool (0 = one per CPU);
+            # entries are still written in order, each with its own salt
+            write_files_parallel(zip_file, entries, reporter, resources.workers, resources.queue_depth_per_worker,
+                                 resources.parallel_max_file_size, resources.chunk_size)
+    except Exception:
+        # Don't leave a truncated archive behind on failure or cancellation
+        remove_partial(output_path)
+        raise
+    finally:
+        if sink is not None:
+            sink.close()
+    
+    reporter.finish()
     
-    # Get compressed size
-    compressed_size = os.path.getsize(output_path)
+    # Get compressed size; a streamed output may be a pipe, so count the bytes written
+    compressed_size = sink.bytes_written if sink is not None else os.path.getsize(output_path)
     
     # Calculate compression ratio
     if original_size > 0:
@@ -5,6 +5,13 @@ class Inputs(typing.TypedDict):
     output_path: str
     include_subdirectories: bool
     password: str | None
+    compression_method: typing.Literal["DEFLATED", "STORED", "BZIP2", "LZMA", "ZSTD"]
+    streaming_output: bool
+    include_patterns: list[str] | None
+    exclude_patterns: list[str] | None
+    stat_workers: int
+    store_patterns: list[str] | None
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     zip_path: typing.NotRequired[str]
     compressed_size: typing.NotRequired[float]
@@ -15,6 +22,17 @@ class Outputs(typing.TypedDict):
 from oocana import Context
 import os
 import pyzipper
+from zip_utils.progress import ProgressReporter, remove_partial, write_file
+from zip_utils.budget import resources_from_params
+from zip_utils.streaming import StreamSink
+from zip_utils.scanner import path_matcher, scan_source
+from zip_utils.compression import compression_from_name, register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -31,6 +49,13 @@ def main(params: Inputs, context: Context) -> Outputs:
     output_path = params["output_path"]
     include_subdirectories = params["include_subdirectories"]
     password = params.get("password")
+    compression_method = params.get("compression_method", "DEFLATED")
+    streaming_output = params.get("streaming_output", False)
+    include_patterns = params.get("include_patterns")
+    exclude_patterns = params.get("exclude_patterns")
+    stat_workers = params.get("stat_workers", 0)
+    store_patterns = params.get("store_patterns")
+    resources = resources_from_params(params)
     
     if not os.path.exists(source_path):
         raise FileNotFoundError(f"Source path does not exist: {source_path}")
@@ -39,41 +64,42 @@ def main(params: Inputs, context: Context) -> Outputs:
     output_dir = os.path.dirname(output_path)
     os.makedirs(output_dir, exist_ok=True)
     
-    original_size = 0
+    # Collect files first so progress can be reported against a known total;
+    # subfolders are kept under the source folder's name, top-level-only scans aren't
+    entries = scan_source(source_path, include_subdirectories, include_patterns, exclude_patterns,
+                          stat_workers, root_name=include_subdirectories)
+    
+    original_size = sum(entry.size for entry in entries)
+    reporter = ProgressReporter(context, total_bytes=original_size, total_entries=len(entries), label="Compressing")
     
-    with pyzipper.AESZipFile(output_path, 'w', compression=pyzipper.ZIP_DEFLATED) as zip_file:
-        # Set password if provided
-        if password:
-            zip_file.setpassword(password.encode('utf-8'))
-            zip_file.setencryption(pyzipper.WZ_AES, nbits=256)
-        if os.path.isfile(source_path):
-            # Single file compression
-            file_size = os.path.getsize(source_path)
-            original_size += file_size
-            zip_file.write(source_path, os.path.basename(source_path))
+    # Streaming output never seeks back, so output_path may be a pipe/FIFO or socket
+    sink = StreamSink.open(output_path) if streaming_output else None
+    
+    try:
+        with pyzipper.AESZipFile(sink or output_path, 'w', compression=compression_from_name(compression_method)) as zip_file:
+            # Set password if provided
+            if password:
+                zip_file.setpassword(password.encode('utf-8'))
+                zip_file.setencryption(pyzipper.WZ_AES, nbits=256)
             
-        elif os.path.isdir(source_path):
-            # Directory compression
-            for root, dirs, files in os.walk(source_path):
-                # Skip subdirectories if not included
-                if not include_subdirectories and root != source_path:
-                    continue
-                    
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    file_size = os.path.getsize(file_path)
-                    original_size += file_size
-                    
-                    # Calculate relative path for archive
-                    if include_subdirectories:
-                        arcname = os.path.relpath(file_path, os.path.dirname(source_path))
-                    else:
-                        arcname = file
-                    
-                    zip_file.write(file_path, arcname)
+            # Already-compressed files (media, archives) are stored as-is, which also lets them be copied in-kernel
+            store_only = path_matcher(store_patterns)
+            for entry in entries:
+                compress_type = pyzipper.ZIP_STORED if store_only(entry.arcname) else None
+                write_file(zip_file, entry.path, entry.arcname, reporter, resources.chunk_size, file_stat=entry.stat,
+                           compress_type=compress_type)
+    except Exception:
+        # Don't leave a truncated archive behind on failure or cancellation
+        remove_partial(output_path)
+        raise
+    finally:
+        if sink is not None:
+            sink.close()
+    
+    reporter.finish()
     
-    # Get compressed size
-    compressed_size = os.path.getsize(output_path)
+    # Get compressed size; a streamed output may be a pipe, so count the bytes written
+    compressed_size = sink.bytes_written if sink is not None else os.path.getsize(output_path)
     
     # Calculate compression ratio
     if original_size > 0:
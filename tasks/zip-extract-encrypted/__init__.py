@@ -2,23 +2,42 @@
 import typing
 class Inputs(typing.TypedDict):
     zip_path: str
-    password: str
+    password: str | None
     output_directory: str
     create_subfolder: bool
     overwrite_existing: bool
     verify_password_first: bool
+    candidate_passwords: list[str] | None
+    max_total_size_mb: float
+    max_entry_size_mb: float
+    max_compression_ratio: float
+    max_entries: int
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     extracted_path: typing.NotRequired[str]
     extracted_files_count: typing.NotRequired[float]
     extracted_files: typing.NotRequired[list[str]]
     total_size: typing.NotRequired[float]
     password_verified: typing.NotRequired[bool]
+    matched_password_index: typing.NotRequired[float]
 #endregion
 
 from oocana import Context
 import os
 import pyzipper
 import zipfile
+from zip_utils.progress import OperationCancelled, ProgressReporter, extract_member, remove_partial
+from zip_utils.budget import resources_from_params
+from zip_utils.guard import guard_from_params
+from zip_utils.handles import open_archive
+from zip_utils.planner import advise_sequential, plan_extraction
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import find_password, register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def is_valid_zip_file(zip_path):
     """Check if file is a valid ZIP file"""
@@ -42,11 +61,14 @@ def main(params: Inputs, context: Context) -> Outputs:
         Information about extracted files and password verification
     """
     zip_path = params["zip_path"]
-    password = params["password"]
+    password = params.get("password")
     output_directory = params["output_directory"]
     create_subfolder = params["create_subfolder"]
     overwrite_existing = params["overwrite_existing"]
     verify_password_first = params["verify_password_first"]
+    candidate_passwords = params.get("candidate_passwords") or []
+    guard = guard_from_params(params)
+    resources = resources_from_params(params)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -57,8 +79,14 @@ def main(params: Inputs, context: Context) -> Outputs:
     if not is_valid_zip_file(zip_path):
         raise ValueError(f"File is not a valid ZIP file: {zip_path}")
     
-    if not password:
+    # The password input is tried first, then the candidates in order; the
+    # reported index is the matching value's first position in that list
+    positions = [password, *candidate_passwords]
+    candidates = list(dict.fromkeys(p for p in positions if p))
+    if not candidates:
         raise ValueError("Password is required for encrypted ZIP extraction")
+    password = candidates[0]
+    matched_password_index = positions.index(password)
     
     password_verified = False
     
@@ -78,47 +106,46 @@ def main(params: Inputs, context: Context) -> Outputs:
     
     try:
         # First try with pyzipper for AES encrypted ZIPs
-        with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
+        with open_archive(zip_path) as zip_file:
+            # Verify password(s) if requested, from the encryption headers alone:
+            # the AES verifier or the ZipCrypto check byte, no data is decrypted
+            if verify_password_first or len(candidates) > 1:
+                encoded = [candidate.encode('utf-8') for candidate in candidates]
+                matched = find_password(zip_file, encoded)
+                if matched is None:
+                    raise ValueError("Invalid password for encrypted ZIP file")
+                password = candidates[encoded.index(matched)]
+                matched_password_index = positions.index(password)
+            password_verified = True
+            
             zip_file.setpassword(password.encode('utf-8'))
             
-            # Verify password if requested
-            if verify_password_first:
-                try:
-                    # Try to read the first file to verify password
-                    file_list = [f for f in zip_file.infolist() if not f.is_dir()]
-                    if file_list:
-                        with zip_file.open(file_list[0].filename) as test_file:
-                            test_file.read(1)  # Read just one byte to test
-                    password_verified = True
-                except Exception:
-                    raise ValueError("Invalid password for encrypted ZIP file")
-            else:
-                password_verified = True
+            file_infos = [info for info in zip_file.infolist() if not info.is_dir()]
+            
+            # Plan once: archive offset order, existing files found per directory,
+            # every output directory created up front
+            plan = plan_extraction([(info, os.path.join(extracted_path, info.filename)) for info in file_infos],
+                                   overwrite_existing)
+            guard.check_plan([info for info, _ in plan.entries])
+            reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info, _ in plan.entries),
+                                        total_entries=len(plan.entries), label="Extracting")
+            advise_sequential(zip_file)
             
             # Extract all files
-            for file_info in zip_file.infolist():
-                # Skip directories
-                if file_info.is_dir():
-                    continue
-                
-                file_path = os.path.join(extracted_path, file_info.filename)
-                
-                # Check if file already exists
-                if os.path.exists(file_path) and not overwrite_existing:
-                    continue
-                
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                
+            for file_info, file_path in plan.entries:
                 # Extract file
                 try:
-                    with zip_file.open(file_info.filename) as source, open(file_path, 'wb') as target:
-                        target.write(source.read())
+                    extract_member(zip_file, file_info, file_path, reporter, resources.chunk_size, guard)
                     
                     extracted_files.append(file_path)
                     extracted_files_count += 1
                     total_size += file_info.file_size
                     
+                except OperationCancelled:
+                    # Remove everything extracted by this run
+                    for partial_path in extracted_files:
+                        remove_partial(partial_path)
+                    raise
                 except Exception:
                     # Skip files that can't be extracted
                     continue
@@ -139,28 +166,30 @@ def main(params: Inputs, context: Context) -> Outputs:
                     # Not encrypted, but user provided password - this might be wrong
                     password_verified = True
                 
+                file_infos = [info for info in zip_file.infolist() if not info.is_dir()]
+                
+                # Plan once, as above
+                plan = plan_extraction([(info, os.path.join(extracted_path, info.filename)) for info in file_infos],
+                                       overwrite_existing)
+                guard.check_plan([info for info, _ in plan.entries])
+                reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info, _ in plan.entries),
+                                            total_entries=len(plan.entries), label="Extracting")
+                advise_sequential(zip_file)
+                
                 # Extract all files
-                for file_info in zip_file.infolist():
-                    # Skip directories
-                    if file_info.is_dir():
-                        continue
-                    
-                    file_path = os.path.join(extracted_path, file_info.filename)
-                    
-                    # Check if file already exists
-                    if os.path.exists(file_path) and not overwrite_existing:
-                        continue
-                    
-                    # Ensure directory exists
-                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                    
-                    # Extract file
+                for file_info, file_path in plan.entries:
+                    # Extract file, chunk by chunk so the limits see what it inflates to
                     try:
-                        zip_file.extract(file_info.filename, extracted_path)
+                        extract_member(zip_file, file_info, file_path, reporter, resources.chunk_size, guard)
                         extracted_files.append(file_path)
                         extracted_files_count += 1
                         total_size += file_info.file_size
                         
+                    except OperationCancelled:
+                        # Remove everything extracted by this run
+                        for partial_path in extracted_files:
+                            remove_partial(partial_path)
+                        raise
                     except Exception:
                         # Skip files that can't be extracted
                         continue
@@ -168,10 +197,13 @@ def main(params: Inputs, context: Context) -> Outputs:
         except zipfile.BadZipFile:
             raise ValueError(f"File is not a valid ZIP file: {zip_path}")
     
+    reporter.finish()
+    
     return {
         "extracted_path": extracted_path,
         "extracted_files_count": extracted_files_count,
         "extracted_files": extracted_files,
         "total_size": total_size,
-        "password_verified": password_verified
+        "password_verified": password_verified,
+        "matched_password_index": matched_password_index
     }
@@ -7,6 +7,11 @@ class Inputs(typing.TypedDict):
     handle_name_conflicts: typing.Literal["skip", "rename", "overwrite"]
     file_filter: str | None
     max_files: int
+    max_total_size_mb: float
+    max_entry_size_mb: float
+    max_compression_ratio: float
+    max_entries: int
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     extracted_path: typing.NotRequired[str]
     extracted_files_count: typing.NotRequired[float]
@@ -17,7 +22,18 @@ class Outputs(typing.TypedDict):
 
 from oocana import Context
 import os
-import pyzipper
+from zip_utils.progress import OperationCancelled, ProgressReporter, extract_member, remove_partial
+from zip_utils.budget import resources_from_params
+from zip_utils.guard import guard_from_params
+from zip_utils.handles import open_archive
+from zip_utils.planner import advise_sequential, plan_extraction
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -36,6 +52,8 @@ def main(params: Inputs, context: Context) -> Outputs:
     handle_name_conflicts = params["handle_name_conflicts"]
     file_filter = params.get("file_filter", "") or ""
     max_files = params["max_files"]
+    guard = guard_from_params(params)
+    resources = resources_from_params(params)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -55,19 +73,18 @@ def main(params: Inputs, context: Context) -> Outputs:
     extracted_files_count = 0
     total_size = 0
     
-    with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
+    with open_archive(zip_path) as zip_file:
         if password:
             zip_file.setpassword(password.encode('utf-8'))
         
+        # Plan first: filter and flatten, then let the planner resolve name conflicts
+        # against the files already there and the names planned before, so the limits see the real list
+        targets = []
         for file_info in zip_file.infolist():
             # Skip directories
             if file_info.is_dir():
                 continue
             
-            # Check max files limit
-            if max_files > 0 and extracted_files_count >= max_files:
-                break
-            
             # Get just the filename without path
             filename = os.path.basename(file_info.filename)
             
@@ -83,38 +100,44 @@ def main(params: Inputs, context: Context) -> Outputs:
                     skipped_files_count += 1
                     continue
             
-            # Determine output file path
-            file_path = os.path.join(output_directory, filename)
-            
-            # Handle name conflicts
-            if os.path.exists(file_path):
-                if handle_name_conflicts == "skip":
-                    skipped_files_count += 1
-                    continue
-                elif handle_name_conflicts == "rename":
-                    # Add number suffix to avoid conflicts
-                    base_name, extension = os.path.splitext(filename)
-                    counter = 1
-                    while os.path.exists(file_path):
-                        new_filename = f"{base_name}_{counter}{extension}"
-                        file_path = os.path.join(output_directory, new_filename)
-                        counter += 1
-                # If "overwrite", we proceed with the original path
-            
+            targets.append((file_info, os.path.join(output_directory, filename)))
+        
+        # "skip" drops conflicting files, "rename" adds a number suffix, "overwrite" keeps the path
+        plan = plan_extraction(targets, overwrite_existing=handle_name_conflicts == "overwrite",
+                               rename_existing=handle_name_conflicts == "rename")
+        skipped_files_count += len(plan.skipped)
+        planned = plan.entries
+        # Check max files limit
+        if max_files > 0:
+            planned = planned[:max_files]
+        
+        # Declared sizes first: an archive already over the limits is refused before anything is written
+        guard.check_plan([file_info for file_info, _ in planned])
+        reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info, _ in planned),
+                                    total_entries=len(planned), label="Extracting")
+        advise_sequential(zip_file)
+        
+        for file_info, file_path in planned:
             # Extract file
             try:
-                with zip_file.open(file_info.filename) as source, open(file_path, 'wb') as target:
-                    target.write(source.read())
+                extract_member(zip_file, file_info, file_path, reporter, resources.chunk_size, guard)
                 
                 extracted_files.append(file_path)
                 extracted_files_count += 1
                 total_size += file_info.file_size
                 
+            except OperationCancelled:
+                # Remove everything extracted by this run
+                for partial_path in extracted_files:
+                    remove_partial(partial_path)
+                raise
             except Exception:
                 # Skip files that can't be extracted
                 skipped_files_count += 1
                 continue
     
+    reporter.finish()
+    
     return {
         "extracted_path": output_directory,
         "extracted_files_count": extracted_files_count,
@@ -7,6 +7,11 @@ class Inputs(typing.TypedDict):
     password: str | None
     preserve_structure: bool
     overwrite_existing: bool
+    max_total_size_mb: float
+    max_entry_size_mb: float
+    max_compression_ratio: float
+    max_entries: int
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     extracted_path: typing.NotRequired[str]
     extracted_files_count: typing.NotRequired[float]
@@ -17,7 +22,19 @@ class Outputs(typing.TypedDict):
 
 from oocana import Context
 import os
-import pyzipper
+from zip_utils.progress import OperationCancelled, ProgressReporter, extract_member, remove_partial
+from zip_utils.budget import resources_from_params
+from zip_utils.guard import guard_from_params
+from zip_utils.handles import open_archive
+from zip_utils.planner import advise_sequential, plan_extraction
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+from zip_utils.remote import RemoteFile, is_remote, member_range
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -36,8 +53,10 @@ def main(params: Inputs, context: Context) -> Outputs:
     password = params.get("password")
     preserve_structure = params["preserve_structure"]
     overwrite_existing = params["overwrite_existing"]
+    guard = guard_from_params(params)
+    resources = resources_from_params(params)
     
-    if not os.path.exists(zip_path):
+    if not is_remote(zip_path) and not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
     
     if not files_to_extract:
@@ -51,57 +70,87 @@ def main(params: Inputs, context: Context) -> Outputs:
     extracted_files_count = 0
     total_size = 0
     
-    with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
-        if password:
-            zip_file.setpassword(password.encode('utf-8'))
-        
-        # Get list of all files in ZIP
-        available_files = {info.filename: info for info in zip_file.infolist()}
-        
-        for file_to_extract in files_to_extract:
-            # Normalize path separators
-            normalized_file = file_to_extract.replace('\\', '/')
+    # Remote archives are read with range requests: the central directory
+    # plus the selected entries, never the whole file
+    remote = RemoteFile(zip_path) if is_remote(zip_path) else None
+    try:
+        with open_archive(remote or zip_path) as zip_file:
+            if password:
+                zip_file.setpassword(password.encode('utf-8'))
             
-            # Check if file exists in ZIP
-            if normalized_file not in available_files:
-                skipped_files.append(f"Not found: {file_to_extract}")
-                continue
+            # Get list of all files in ZIP
+            available_files = {info.filename: info for info in zip_file.infolist()}
             
-            file_info = available_files[normalized_file]
+            selected_infos = [available_files[name.replace('\\', '/')] for name in files_to_extract
+                              if name.replace('\\', '/') in available_files]
+            file_infos = [info for info in selected_infos if not info.is_dir()]
+            reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info in file_infos),
+                                        total_entries=len(file_infos), label="Extracting")
+            if remote is not None:
+                remote.prefetch([member_range(zip_file, info) for info in file_infos])
             
-            # Skip directories
-            if file_info.is_dir():
-                skipped_files.append(f"Directory: {file_to_extract}")
-                continue
-            
-            # Determine output path
-            if preserve_structure:
-                # Keep original directory structure
-                file_path = os.path.join(output_directory, file_info.filename)
-            else:
-                # Extract to flat structure
-                filename = os.path.basename(file_info.filename)
-                file_path = os.path.join(output_directory, filename)
-            
-            # Check if file already exists
-            if os.path.exists(file_path) and not overwrite_existing:
-                skipped_files.append(f"Already exists: {file_to_extract}")
-                continue
+            targets = []
+            for file_to_extract in files_to_extract:
+                # Normalize path separators
+                normalized_file = file_to_extract.replace('\\', '/')
+                
+                # Check if file exists in ZIP
+                if normalized_file not in available_files:
+                    skipped_files.append(f"Not found: {file_to_extract}")
+                    continue
+                
+                file_info = available_files[normalized_file]
+                
+                # Skip directories
+                if file_info.is_dir():
+                    skipped_files.append(f"Directory: {file_to_extract}")
+                    continue
+                
+                # Determine output path
+                if preserve_structure:
+                    # Keep original directory structure
+                    file_path = os.path.join(output_directory, file_info.filename)
+                else:
+                    # Extract to flat structure
+                    filename = os.path.basename(file_info.filename)
+                    file_path = os.path.join(output_directory, filename)
+                targets.append((file_info, file_path, file_to_extract))
             
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # Plan once: archive offset order, existing files found per directory,
+            # every output directory created up front
+            requested = {file_info.filename: file_to_extract for file_info, _, file_to_extract in targets}
+            plan = plan_extraction([(file_info, file_path) for file_info, file_path, _ in targets], overwrite_existing)
+            for file_info, _ in plan.skipped:
+                skipped_files.append(f"Already exists: {requested[file_info.filename]}")
+            guard.check_plan([file_info for file_info, _ in plan.entries])
+            advise_sequential(zip_file)
             
-            # Extract file
-            try:
-                with zip_file.open(file_info.filename) as source, open(file_path, 'wb') as target:
-                    target.write(source.read())
+            for file_info, file_path in plan.entries:
+                file_to_extract = requested[file_info.filename]
                 
-                extracted_files.append(file_path)
-                extracted_files_count += 1
-                total_size += file_info.file_size
-                
-            except Exception as e:
-                skipped_files.append(f"Error extracting {file_to_extract}: {str(e)}")
+                # Extract file
+                try:
+                    if remote is not None:
+                        remote.limit_readahead(member_range(zip_file, file_info)[1])
+                    extract_member(zip_file, file_info, file_path, reporter, resources.chunk_size, guard)
+                    
+                    extracted_files.append(file_path)
+                    extracted_files_count += 1
+                    total_size += file_info.file_size
+                    
+                except OperationCancelled:
+                    # Remove everything extracted by this run
+                    for partial_path in extracted_files:
+                        remove_partial(partial_path)
+                    raise
+                except Exception as e:
+                    skipped_files.append(f"Error extracting {file_to_extract}: {str(e)}")
+    finally:
+        if remote is not None:
+            context.report_log(f"Fetched {remote.bytes_fetched} of {remote.size} bytes in {remote.requests} requests")
+            remote.close()
+    
+    reporter.finish()
     
     return {
         "extracted_path": output_directory,
@@ -6,16 +6,95 @@ class Inputs(typing.TypedDict):
     create_subfolder: bool
     overwrite_existing: bool
     password: str | None
+    streaming_input: bool
+    sync: bool
+    delete_extraneous: bool
+    max_total_size_mb: float
+    max_entry_size_mb: float
+    max_compression_ratio: float
+    max_entries: int
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     extracted_path: typing.NotRequired[str]
     extracted_files_count: typing.NotRequired[float]
     extracted_files: typing.NotRequired[list[str]]
     total_size: typing.NotRequired[float]
+    unchanged_files_count: typing.NotRequired[float]
+    deleted_files: typing.NotRequired[list[str]]
 #endregion
 
 from oocana import Context
 import os
-import pyzipper
+import stat
+from zip_utils.progress import OperationCancelled, ProgressReporter, copy_stream, extract_member, remove_partial
+from zip_utils.budget import resources_from_params
+from zip_utils.guard import guard_from_params
+from zip_utils.streaming import GrowingFileReader, StreamingZipReader
+from zip_utils.handles import open_archive
+from zip_utils.planner import advise_sequential, plan_extraction
+from zip_utils.sync import plan_sync, remove_extraneous, sync_member
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
+
+def _extract_streaming(zip_path, extracted_path, overwrite_existing, password, guard, chunk_size, context):
+    """
+    Extract by walking local headers front to back, without the central directory.
+
+    ``zip_path`` may be a named pipe or a file that is still being downloaded;
+    every entry is written as soon as its bytes arrive. Unlike the seekable
+    path, an entry that fails to extract stops the whole run, because the
+    reader can't tell where the next entry starts. There is no central
+    directory to check ``guard`` against up front, so its limits apply to
+    the bytes each entry actually inflates to.
+    """
+    extracted_files = []
+    total_size = 0
+    reporter = ProgressReporter(context, label="Extracting")
+    pwd = password.encode('utf-8') if password else None
+    
+    if stat.S_ISFIFO(os.stat(zip_path).st_mode):
+        source = open(zip_path, 'rb')
+    else:
+        source = GrowingFileReader(zip_path)
+    
+    with source:
+        try:
+            for entry in StreamingZipReader(source, pwd):
+                # Skip directories
+                if entry.is_dir():
+                    continue
+                
+                file_path = os.path.join(extracted_path, entry.filename)
+                
+                # Check if file already exists; the reader skips its data
+                if os.path.exists(file_path) and not overwrite_existing:
+                    continue
+                
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                guard.start_entry(entry)
+                try:
+                    with open(file_path, 'wb') as target:
+                        copy_stream(guard.wrap(entry, entry), target, reporter, chunk_size)
+                except Exception:
+                    remove_partial(file_path)
+                    raise
+                reporter.advance(entries=1)
+                
+                extracted_files.append(file_path)
+                total_size += entry.file_size
+        except OperationCancelled:
+            # Remove everything extracted by this run
+            for partial_path in extracted_files:
+                remove_partial(partial_path)
+            raise
+    
+    reporter.finish()
+    return extracted_files, total_size
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -33,9 +112,18 @@ def main(params: Inputs, context: Context) -> Outputs:
     create_subfolder = params["create_subfolder"]
     overwrite_existing = params["overwrite_existing"]
     password = params.get("password")
+    streaming_input = params.get("streaming_input", False)
+    sync = params.get("sync", False)
+    delete_extraneous = params.get("delete_extraneous", False)
+    guard = guard_from_params(params)
+    resources = resources_from_params(params)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
+    if sync and streaming_input:
+        raise ValueError("sync compares files with the central directory and can't be used with streaming_input")
+    if delete_extraneous and not sync:
+        raise ValueError("delete_extraneous is only available in sync mode")
     
     # Determine extraction directory
     if create_subfolder:
@@ -47,47 +135,81 @@ def main(params: Inputs, context: Context) -> Outputs:
     # Ensure extraction directory exists
     os.makedirs(extracted_path, exist_ok=True)
     
+    if streaming_input:
+        extracted_files, total_size = _extract_streaming(
+            zip_path, extracted_path, overwrite_existing, password, guard, resources.chunk_size, context)
+        return {
+            "extracted_path": extracted_path,
+            "extracted_files_count": len(extracted_files),
+            "extracted_files": extracted_files,
+            "total_size": total_size
+        }
+    
     extracted_files = []
     extracted_files_count = 0
     total_size = 0
+    deleted_files = []
     
-    with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
+    with open_archive(zip_path) as zip_file:
         # Set password if provided
         if password:
             zip_file.setpassword(password.encode('utf-8'))
         # Get list of files in ZIP
         file_list = zip_file.namelist()
         
-        for file_info in zip_file.infolist():
-            # Skip directories
-            if file_info.is_dir():
-                continue
-            
-            file_path = os.path.join(extracted_path, file_info.filename)
-            
-            # Check if file already exists
-            if os.path.exists(file_path) and not overwrite_existing:
-                continue
-            
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
+        file_infos = [info for info in zip_file.infolist() if not info.is_dir()]
+        
+        # Plan once: archive offset order, existing files found per directory,
+        # every output directory created up front
+        targets = [(info, os.path.join(extracted_path, info.filename)) for info in file_infos]
+        if sync:
+            # Only entries whose file is missing or differs (size, mtime, then CRC-32) are written
+            plan = plan_sync(targets)
+        else:
+            plan = plan_extraction(targets, overwrite_existing)
+        # Declared sizes first: an archive already over the limits is refused before anything is written
+        guard.check_plan([info for info, _ in plan.entries])
+        reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info, _ in plan.entries),
+                                    total_entries=len(plan.entries), label="Extracting")
+        advise_sequential(zip_file)
+        
+        for file_info, file_path in plan.entries:
             # Extract file
             try:
-                with zip_file.open(file_info.filename) as source, open(file_path, 'wb') as target:
-                    target.write(source.read())
+                if sync:
+                    # Written next to the target and renamed over it
+                    sync_member(zip_file, file_info, file_path, reporter, resources.chunk_size, guard)
+                else:
+                    extract_member(zip_file, file_info, file_path, reporter, resources.chunk_size, guard)
                 
                 extracted_files.append(file_path)
                 extracted_files_count += 1
                 total_size += file_info.file_size
                 
+            except OperationCancelled:
+                # Remove everything extracted by this run; synced files replaced
+                # older versions, so they stay
+                if not sync:
+                    for partial_path in extracted_files:
+                        remove_partial(partial_path)
+                raise
             except Exception as e:
                 # Skip files that can't be extracted
                 continue
+        
+        if delete_extraneous:
+            archive_directories = [os.path.join(extracted_path, info.filename)
+                                   for info in zip_file.infolist() if info.is_dir()]
+            deleted_files = remove_extraneous(extracted_path, [file_path for _, file_path in targets],
+                                              archive_directories)
+    
+    reporter.finish()
     
     return {
         "extracted_path": extracted_path,
         "extracted_files_count": extracted_files_count,
         "extracted_files": extracted_files,
-        "total_size": total_size
+        "total_size": total_size,
+        "unchanged_files_count": len(plan.skipped) if sync else 0,
+        "deleted_files": deleted_files
     }
\ No newline at end of file
@@ -4,6 +4,8 @@ class Inputs(typing.TypedDict):
     zip_path: str
     password: str | None
     calculate_checksums: bool
+    result_format: typing.Literal["dataframe", "dict"]
+    quick_stats: bool
 class Outputs(typing.TypedDict):
     file_info: typing.NotRequired[dict]
     archive_stats: typing.NotRequired[dict]
@@ -18,8 +20,16 @@ from oocana import Context
 import os
 import hashlib
 import datetime
-import pandas as pd
-import pyzipper
+from zip_utils.results import make_table
+from zip_utils.handles import open_archive
+from zip_utils.eocd import WZ_AES_METHOD, read_tail_of
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -35,6 +45,8 @@ def main(params: Inputs, context: Context) -> Outputs:
     zip_path = params["zip_path"]
     password = params.get("password")
     calculate_checksums = params["calculate_checksums"]
+    result_format = params.get("result_format", "dataframe")
+    quick_stats = params.get("quick_stats", False)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -56,6 +68,18 @@ def main(params: Inputs, context: Context) -> Outputs:
                 "sha256": hashlib.sha256(content).hexdigest()
             }
     
+    quick_stats_error = None
+    if quick_stats:
+        try:
+            tail = read_tail_of(zip_path)
+        except Exception as e:
+            # The records at the end can't be trusted; read the whole central directory instead
+            quick_stats_error = str(e)
+            context.report_log(f"Quick stats unavailable ({e}); reading the full central directory")
+        else:
+            return _quick_stats(tail, zip_path, size_on_disk, created_time, modified_time, file_checksums,
+                                result_format)
+    
     is_encrypted = False
     total_entries = 0
     uncompressed_total_size = 0
@@ -66,7 +90,7 @@ def main(params: Inputs, context: Context) -> Outputs:
     newest_file = {"name": "", "date": None}
     
     try:
-        with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
+        with open_archive(zip_path) as zip_file:
             if password:
                 zip_file.setpassword(password.encode('utf-8'))
             
@@ -148,10 +172,12 @@ def main(params: Inputs, context: Context) -> Outputs:
             "date": newest_file["date"].strftime("%Y-%m-%d %H:%M:%S") if newest_file["date"] else "Unknown"
         }
     }
+    if quick_stats_error is not None:
+        archive_stats_data["quick_stats_error"] = quick_stats_error
     
-    # Convert to DataFrames
-    file_info_df = pd.DataFrame([file_info_data])
-    archive_stats_df = pd.DataFrame([archive_stats_data])
+    # Convert to tables
+    file_info_df = make_table([file_info_data], result_format)
+    archive_stats_df = make_table([archive_stats_data], result_format)
     
     # Determine primary compression method
     primary_compression = list(compression_methods)[0] if compression_methods else "Unknown"
@@ -166,12 +192,64 @@ def main(params: Inputs, context: Context) -> Outputs:
         "uncompressed_total_size": uncompressed_total_size
     }
 
+def _quick_stats(tail, zip_path, size_on_disk, created_time, modified_time, file_checksums, result_format):
+    """
+    Helper function for quick_stats: answer from the end-of-central-directory records (``tail``) only.
+
+    Takes the same time for ten entries or ten million. Encryption and
+    compression are hints taken from the first entry; uncompressed sizes
+    would need every record, so they're left out.
+    """
+    is_encrypted = False
+    compression_method = "Unknown"
+    if tail.first_flag_bits is not None:
+        is_encrypted = bool(tail.first_flag_bits & 0x1)
+        if tail.first_compress_type == WZ_AES_METHOD:
+            compression_method = "AES encrypted"
+        else:
+            compression_method = _get_compression_method(tail.first_compress_type)
+    total_entries = tail.total_entries
+    
+    file_info_data = {
+        "filename": os.path.basename(zip_path),
+        "full_path": zip_path,
+        "size_bytes": size_on_disk,
+        "size_mb": round(size_on_disk / 1024 / 1024, 3),
+        "created": created_time,
+        "modified": modified_time,
+        "is_encrypted": is_encrypted
+    }
+    file_info_data.update(file_checksums)
+    
+    archive_stats_data = {
+        "total_entries": total_entries,
+        "compressed_size_bytes": size_on_disk,
+        "compressed_size_mb": round(size_on_disk / 1024 / 1024, 3),
+        "central_directory_size_bytes": tail.central_directory_size,
+        "central_directory_offset": tail.central_directory_offset,
+        "prefix_bytes": tail.prefix_size,
+        "zip64": tail.zip64,
+        "comment": tail.comment.decode('utf-8', errors='replace'),
+        "first_entry_compression": compression_method,
+        "stats_mode": "quick"
+    }
+    
+    return {
+        "file_info": make_table([file_info_data], result_format),
+        "archive_stats": make_table([archive_stats_data], result_format),
+        "is_encrypted": is_encrypted,
+        "compression_method": compression_method,
+        "total_entries": total_entries,
+        "size_on_disk": size_on_disk
+    }
+
 def _get_compression_method(compress_type):
     """Helper function to map compression type to method name"""
     compression_map = {
         0: "Stored (no compression)",
         8: "DEFLATED",
         12: "BZIP2", 
-        14: "LZMA"
+        14: "LZMA",
+        93: "ZSTD"
     }
     return compression_map.get(compress_type, f"Unknown ({compress_type})")
\ No newline at end of file
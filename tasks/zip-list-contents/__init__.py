@@ -6,6 +6,7 @@ class Inputs(typing.TypedDict):
     show_directories: bool
     detailed_info: bool
     sort_by: typing.Literal["name", "size", "date", "type"]
+    result_format: typing.Literal["dataframe", "dict"]
 class Outputs(typing.TypedDict):
     file_list: typing.NotRequired[list[str]]
     detailed_contents: typing.NotRequired[dict]
@@ -18,8 +19,16 @@ class Outputs(typing.TypedDict):
 from oocana import Context
 import os
 import datetime
-import pandas as pd
-import pyzipper
+from zip_utils.results import make_table
+from zip_utils.handles import open_archive
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+from zip_utils.remote import RemoteFile, is_remote
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -37,8 +46,9 @@ def main(params: Inputs, context: Context) -> Outputs:
     show_directories = params["show_directories"]
     detailed_info = params["detailed_info"]
     sort_by = params["sort_by"]
+    result_format = params.get("result_format", "dataframe")
     
-    if not os.path.exists(zip_path):
+    if not is_remote(zip_path) and not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
     
     file_list = []
@@ -48,56 +58,62 @@ def main(params: Inputs, context: Context) -> Outputs:
     uncompressed_size = 0
     compressed_size = 0
     
-    with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
-        if password:
-            zip_file.setpassword(password.encode('utf-8'))
-        
-        for file_info in zip_file.infolist():
-            is_directory = file_info.is_dir()
-            
-            # Count files and directories
-            if is_directory:
-                total_directories += 1
-                if not show_directories:
-                    continue
-            else:
-                total_files += 1
-                uncompressed_size += file_info.file_size
-                compressed_size += file_info.compress_size
-            
-            # Add to file list
-            file_list.append(file_info.filename)
+    # Remote archives only need their central directory, read with range requests
+    remote = RemoteFile(zip_path) if is_remote(zip_path) else None
+    try:
+        with open_archive(remote or zip_path) as zip_file:
+            if password:
+                zip_file.setpassword(password.encode('utf-8'))
             
-            if detailed_info:
-                # Get modification time
-                try:
-                    mod_time = datetime.datetime(*file_info.date_time)
-                    mod_time_str = mod_time.strftime("%Y-%m-%d %H:%M:%S")
-                except (ValueError, TypeError):
-                    mod_time_str = "Unknown"
+            for file_info in zip_file.infolist():
+                is_directory = file_info.is_dir()
                 
-                # Determine file type
-                file_type = "Directory" if is_directory else _get_file_type(file_info.filename)
-                
-                # Calculate compression ratio
-                if file_info.file_size > 0 and not is_directory:
-                    compression_ratio = ((file_info.file_size - file_info.compress_size) / file_info.file_size) * 100
+                # Count files and directories
+                if is_directory:
+                    total_directories += 1
+                    if not show_directories:
+                        continue
                 else:
-                    compression_ratio = 0.0
+                    total_files += 1
+                    uncompressed_size += file_info.file_size
+                    compressed_size += file_info.compress_size
+                
+                # Add to file list
+                file_list.append(file_info.filename)
                 
-                detailed_item = {
-                    "filename": file_info.filename,
-                    "type": file_type,
-                    "size_bytes": file_info.file_size,
-                    "size_mb": round(file_info.file_size / 1024 / 1024, 3),
-                    "compressed_size_bytes": file_info.compress_size,
-                    "compressed_size_mb": round(file_info.compress_size / 1024 / 1024, 3),
-                    "compression_ratio": round(compression_ratio, 2),
-                    "modified_date": mod_time_str,
-                    "crc32": file_info.CRC,
-                    "is_directory": is_directory
-                }
-                detailed_contents.append(detailed_item)
+                if detailed_info:
+                    # Get modification time
+                    try:
+                        mod_time = datetime.datetime(*file_info.date_time)
+                        mod_time_str = mod_time.strftime("%Y-%m-%d %H:%M:%S")
+                    except (ValueError, TypeError):
+                        mod_time_str = "Unknown"
+                    
+                    # Determine file type
+                    file_type = "Directory" if is_directory else _get_file_type(file_info.filename)
+                    
+                    # Calculate compression ratio
+                    if file_info.file_size > 0 and not is_directory:
+                        compression_ratio = ((file_info.file_size - file_info.compress_size) / file_info.file_size) * 100
+                    else:
+                        compression_ratio = 0.0
+                    
+                    detailed_item = {
+                        "filename": file_info.filename,
+                        "type": file_type,
+                        "size_bytes": file_info.file_size,
+                        "size_mb": round(file_info.file_size / 1024 / 1024, 3),
+                        "compressed_size_bytes": file_info.compress_size,
+                        "compressed_size_mb": round(file_info.compress_size / 1024 / 1024, 3),
+                        "compression_ratio": round(compression_ratio, 2),
+                        "modified_date": mod_time_str,
+                        "crc32": file_info.CRC,
+                        "is_directory": is_directory
+                    }
+                    detailed_contents.append(detailed_item)
+    finally:
+        if remote is not None:
+            remote.close()
     
     # Sort results if detailed info requested
     if detailed_info and detailed_contents:
@@ -120,11 +136,8 @@ def main(params: Inputs, context: Context) -> Outputs:
     else:
         file_list.sort()
     
-    # Convert detailed contents to DataFrame if requested
-    if detailed_info and detailed_contents:
-        detailed_df = pd.DataFrame(detailed_contents)
-    else:
-        detailed_df = pd.DataFrame()
+    # Convert detailed contents to a table if requested
+    detailed_df = make_table(detailed_contents if detailed_info else [], result_format)
     
     return {
         "file_list": file_list,
@@ -5,8 +5,12 @@ class Inputs(typing.TypedDict):
     output_path: str
     passwords: list[str] | None
     output_password: str | None
-    handle_duplicates: typing.Literal["skip", "rename", "overwrite"]
+    handle_duplicates: typing.Literal["skip", "rename", "overwrite", "deduplicate"]
     compression_level: int
+    result_format: typing.Literal["dataframe", "dict"]
+    max_workers: int
+    compare_content_hashes: bool
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     merged_zip_path: typing.NotRequired[str]
     total_files_merged: typing.NotRequired[float]
@@ -17,8 +21,18 @@ class Outputs(typing.TypedDict):
 
 from oocana import Context
 import os
-import pandas as pd
 import pyzipper
+from zip_utils.progress import ProgressReporter, remove_partial
+from zip_utils.budget import resources_from_params
+from zip_utils.results import make_table
+from zip_utils.merge import MergeSource, merge_archives, plan_merge
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -37,6 +51,10 @@ def main(params: Inputs, context: Context) -> Outputs:
     output_password = params.get("output_password")
     handle_duplicates = params["handle_duplicates"]
     compression_level = params["compression_level"]
+    result_format = params.get("result_format", "dataframe")
+    # Workers, queue depth and buffers sized to max_memory_mb and the container's limits
+    resources = resources_from_params(params)
+    compare_content_hashes = params.get("compare_content_hashes", False)
     
     if not zip_files:
         raise ValueError("At least one ZIP file must be provided")
@@ -57,82 +75,48 @@ def main(params: Inputs, context: Context) -> Outputs:
     else:
         passwords = [None] * len(zip_files)
     
-    total_files_merged = 0
-    duplicate_files_count = 0
-    existing_files = set()
-    merge_details = []
-    
-    # Create output ZIP file
-    output_encryption = pyzipper.WZ_AES256 if output_password else None
+    # Entries are listed from the central directories first; duplicates are resolved as they are written
+    sources = plan_merge([MergeSource(path, password) for path, password in zip(zip_files, passwords)])
+    planned = [info for source in sources for info in source.entries]
+    reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info in planned),
+                                total_entries=len(planned), label="Merging")
     
-    with pyzipper.AESZipFile(output_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
-                            compresslevel=compression_level, encryption=output_encryption) as output_zip:
-        
-        if output_password:
-            output_zip.setpassword(output_password.encode('utf-8'))
-        
-        for i, zip_file in enumerate(zip_files):
-            zip_password = passwords[i]
-            files_from_this_zip = 0
-            duplicates_from_this_zip = 0
+    try:
+        with pyzipper.AESZipFile(output_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
+                                compresslevel=compression_level) as output_zip:
             
-            try:
-                with pyzipper.AESZipFile(zip_file, 'r') as input_zip:
-                    if zip_password:
-                        input_zip.setpassword(zip_password.encode('utf-8'))
-                    
-                    for file_info in input_zip.infolist():
-                        # Skip directories
-                        if file_info.is_dir():
-                            continue
-                        
-                        original_filename = file_info.filename
-                        final_filename = original_filename
-                        
-                        # Handle duplicate filenames
-                        if original_filename in existing_files:
-                            duplicate_files_count += 1
-                            duplicates_from_this_zip += 1
-                            
-                            if handle_duplicates == "skip":
-                                continue
-                            elif handle_duplicates == "rename":
-                                # Add suffix to avoid conflict
-                                base_name, extension = os.path.splitext(original_filename)
-                                counter = 1
-                                while final_filename in existing_files:
-                                    final_filename = f"{base_name}_{counter}{extension}"
-                                    counter += 1
-                            # If "overwrite", we use the original filename
-                        
-                        # Copy file to output ZIP
-                        file_data = input_zip.read(original_filename)
-                        output_zip.writestr(final_filename, file_data)
-                        
-                        existing_files.add(final_filename)
-                        files_from_this_zip += 1
-                        total_files_merged += 1
-                
-                merge_details.append({
-                    "source_zip": os.path.basename(zip_file),
-                    "files_added": files_from_this_zip,
-                    "duplicates_encountered": duplicates_from_this_zip,
-                    "status": "Success"
-                })
-                
-            except Exception as e:
-                merge_details.append({
-                    "source_zip": os.path.basename(zip_file),
-                    "files_added": 0,
-                    "duplicates_encountered": 0,
-                    "status": f"Error: {str(e)}"
-                })
+            if output_password:
+                output_zip.setpassword(output_password.encode('utf-8'))
+                output_zip.setencryption(pyzipper.WZ_AES, nbits=256)
+            
+            # Inputs are decoded on worker threads while entries are appended in order
+            merge_archives(output_zip, sources, reporter, resources.workers, resources.queue_depth_per_worker,
+                           resources.parallel_max_file_size, resources.chunk_size, handle_duplicates,
+                           compare_content_hashes)
+    except Exception:
+        # Don't leave a truncated archive behind on failure or cancellation
+        remove_partial(output_path)
+        raise
+    
+    merge_details = []
+    for source in sources:
+        merge_details.append({
+            "source_zip": os.path.basename(source.path),
+            "files_added": source.added,
+            "duplicates_encountered": source.duplicates,
+            "identical_dropped": source.identical,
+            "status": "Success" if source.error is None else f"Error: {str(source.error)}"
+        })
+    total_files_merged = sum(source.added for source in sources)
+    duplicate_files_count = sum(source.duplicates for source in sources)
+    
+    reporter.finish()
     
     # Get merged file size
     merged_size = os.path.getsize(output_path)
     
-    # Create summary DataFrame
-    summary_df = pd.DataFrame(merge_details)
+    # Create summary table
+    summary_df = make_table(merge_details, result_format)
     
     return {
         "merged_zip_path": output_path,
@@ -8,6 +8,8 @@ class Inputs(typing.TypedDict):
     output_password: str | None
     naming_pattern: typing.Literal["sequential", "size_based", "alphabetical"]
     compression_level: int
+    result_format: typing.Literal["dataframe", "dict"]
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     split_files: typing.NotRequired[list[str]]
     split_count: typing.NotRequired[float]
@@ -18,8 +20,18 @@ class Outputs(typing.TypedDict):
 
 from oocana import Context
 import os
-import pandas as pd
 import pyzipper
+from zip_utils.progress import ProgressReporter, remove_partial, transcode_member
+from zip_utils.budget import resources_from_params
+from zip_utils.results import make_table
+from zip_utils.handles import open_archive
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -39,6 +51,8 @@ def main(params: Inputs, context: Context) -> Outputs:
     output_password = params.get("output_password")
     naming_pattern = params["naming_pattern"]
     compression_level = params["compression_level"]
+    result_format = params.get("result_format", "dataframe")
+    resources = resources_from_params(params)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -59,55 +73,78 @@ def main(params: Inputs, context: Context) -> Outputs:
     current_zip = None
     total_split_size = 0
     
-    # Read original ZIP and get file list
-    with pyzipper.AESZipFile(zip_path, 'r') as source_zip:
-        if password:
-            source_zip.setpassword(password.encode('utf-8'))
-        
-        # Get all files and sort them based on naming pattern
-        file_list = [info for info in source_zip.infolist() if not info.is_dir()]
-        
-        if naming_pattern == "size_based":
-            # Sort by file size (largest first)
-            file_list.sort(key=lambda x: x.file_size, reverse=True)
-        elif naming_pattern == "alphabetical":
-            # Sort alphabetically
-            file_list.sort(key=lambda x: x.filename.lower())
-        # Sequential keeps original order
-        
-        def create_new_split():
-            nonlocal current_zip, current_split, current_size
-            if current_zip:
-                current_zip.close()
+    try:
+        # Read original ZIP and get file list
+        with open_archive(zip_path) as source_zip:
+            if password:
+                source_zip.setpassword(password.encode('utf-8'))
             
-            split_filename = f"{base_filename}_part{current_split:03d}.zip"
-            split_path = os.path.join(output_directory, split_filename)
+            # Get all files and sort them based on naming pattern
+            file_list = [info for info in source_zip.infolist() if not info.is_dir()]
             
-            # Handle encryption
-            output_encryption = pyzipper.WZ_AES256 if output_password else None
+            if naming_pattern == "size_based":
+                # Sort by file size (largest first)
+                file_list.sort(key=lambda x: x.file_size, reverse=True)
+            elif naming_pattern == "alphabetical":
+                # Sort alphabetically
+                file_list.sort(key=lambda x: x.filename.lower())
+            # Sequential keeps original order
             
-            current_zip = pyzipper.AESZipFile(split_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
-                                            compresslevel=compression_level, encryption=output_encryption)
+            reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info in file_list),
+                                        total_entries=len(file_list), label="Splitting")
             
-            if output_password:
-                current_zip.setpassword(output_password.encode('utf-8'))
+            def create_new_split():
+                nonlocal current_zip, current_split, current_size
+                if current_zip:
+                    current_zip.close()
+                
+                split_filename = f"{base_filename}_part{current_split:03d}.zip"
+                split_path = os.path.join(output_directory, split_filename)
+                
+                current_zip = pyzipper.AESZipFile(split_path, 'w', compression=pyzipper.ZIP_DEFLATED, 
+                                                compresslevel=compression_level)
+                
+                if output_password:
+                    current_zip.setpassword(output_password.encode('utf-8'))
+                    current_zip.setencryption(pyzipper.WZ_AES, nbits=256)
+                
+                split_files.append(split_path)
+                current_size = 0
+                return split_path
             
-            split_files.append(split_path)
-            current_size = 0
-            return split_path
-        
-        # Create first split
-        current_split_path = create_new_split()
-        files_in_current_split = 0
-        
-        for file_info in file_list:
-            # Read file data
-            file_data = source_zip.read(file_info.filename)
-            estimated_compressed_size = len(file_data)
+            # Create first split
+            current_split_path = create_new_split()
+            files_in_current_split = 0
             
-            # Check if adding this file would exceed size limit
-            if current_size + estimated_compressed_size > max_size_bytes and files_in_current_split > 0:
-                # Record details of current split
+            for file_info in file_list:
+                # The uncompressed size, from the central directory, bounds what the entry adds
+                estimated_compressed_size = file_info.file_size
+                
+                # Check if adding this file would exceed size limit
+                if current_size + estimated_compressed_size > max_size_bytes and files_in_current_split > 0:
+                    # Record details of current split
+                    actual_size = os.path.getsize(current_split_path)
+                    split_details.append({
+                        "split_file": os.path.basename(current_split_path),
+                        "files_count": files_in_current_split,
+                        "size_bytes": actual_size,
+                        "size_mb": round(actual_size / 1024 / 1024, 2)
+                    })
+                    total_split_size += actual_size
+                    
+                    # Create new split
+                    current_split += 1
+                    current_split_path = create_new_split()
+                    files_in_current_split = 0
+                
+                # Add file to current split, streamed in chunks rather than read whole
+                transcode_member(source_zip, file_info, current_zip, file_info.filename, reporter, resources.chunk_size)
+                current_size += estimated_compressed_size
+                files_in_current_split += 1
+            
+            # Close final split and record details
+            if current_zip:
+                current_zip.close()
                 actual_size = os.path.getsize(current_split_path)
                 split_details.append({
                     "split_file": os.path.basename(current_split_path),
@@ -116,34 +153,22 @@ def main(params: Inputs, context: Context) -> Outputs:
                     "size_mb": round(actual_size / 1024 / 1024, 2)
                 })
                 total_split_size += actual_size
-                
-                # Create new split
-                current_split += 1
-                current_split_path = create_new_split()
-                files_in_current_split = 0
-            
-            # Add file to current split
-            current_zip.writestr(file_info.filename, file_data)
-            current_size += estimated_compressed_size
-            files_in_current_split += 1
-        
-        # Close final split and record details
+    except Exception:
+        # Don't leave truncated split archives behind on failure or cancellation
         if current_zip:
-            current_zip.close()
-            actual_size = os.path.getsize(current_split_path)
-            split_details.append({
-                "split_file": os.path.basename(current_split_path),
-                "files_count": files_in_current_split,
-                "size_bytes": actual_size,
-                "size_mb": round(actual_size / 1024 / 1024, 2)
-            })
-            total_split_size += actual_size
+            try:
+                current_zip.close()
+            except Exception:
+                pass
+        for split_path in split_files:
+            remove_partial(split_path)
+        raise
     
-    # Create summary DataFrame
-    summary_df = pd.DataFrame(split_details)
+    reporter.finish()
     
-    # Add summary statistics
-    if not summary_df.empty:
+    # Summary statistics, added as a last row after a blank one
+    summary_stats = None
+    if split_details:
         summary_stats = {
             "original_file": os.path.basename(zip_path),
             "original_size_mb": round(original_size / 1024 / 1024, 2),
@@ -154,10 +179,9 @@ def main(params: Inputs, context: Context) -> Outputs:
             "total_split_size_mb": round(total_split_size / 1024 / 1024, 2),
             "size_efficiency": round((total_split_size / original_size) * 100, 2) if original_size > 0 else 0
         }
-        
-        # Add summary row
-        summary_row = pd.DataFrame([summary_stats])
-        summary_df = pd.concat([summary_df, pd.DataFrame([{}]), summary_row], ignore_index=True)
+    
+    # Create summary table
+    summary_df = make_table(split_details, result_format, summary=summary_stats)
     
     return {
         "split_files": split_files,
@@ -6,6 +6,13 @@ class Inputs(typing.TypedDict):
     test_extraction: bool
     check_crc: bool
     max_files_to_test: int
+    result_format: typing.Literal["dataframe", "dict"]
+    sampling: typing.Literal["first", "random", "stratified"]
+    sample_seed: int | None
+    always_test_last: int
+    max_mb_to_test: float
+    check_structure: bool
+    max_memory_mb: float
 class Outputs(typing.TypedDict):
     is_valid: typing.NotRequired[bool]
     validation_summary: typing.NotRequired[dict]
@@ -18,9 +25,20 @@ class Outputs(typing.TypedDict):
 from oocana import Context
 import os
 import tempfile
-import pandas as pd
-import pyzipper
 import zlib
+from zip_utils.progress import OperationCancelled, ProgressReporter, copy_stream
+from zip_utils.budget import resources_from_params
+from zip_utils.results import make_table
+from zip_utils.handles import open_archive
+from zip_utils.sampling import SAMPLING_STRATEGIES, sample_coverage, sample_entries
+from zip_utils.structure import check_structure as scan_structure
+from zip_utils.compression import register_zstd
+from zip_utils.crypto import register_crypto_backend
+
+# Register Zstandard (method 93) support with pyzipper
+register_zstd()
+# Use the OpenSSL-backed WinZip AES implementation when available
+register_crypto_backend()
 
 def main(params: Inputs, context: Context) -> Outputs:
     """
@@ -38,6 +56,21 @@ def main(params: Inputs, context: Context) -> Outputs:
     test_extraction = params["test_extraction"]
     check_crc = params["check_crc"]
     max_files_to_test = params["max_files_to_test"]
+    result_format = params.get("result_format", "dataframe")
+    sampling = params.get("sampling", "first")
+    sample_seed = params.get("sample_seed")
+    always_test_last = params.get("always_test_last", 0)
+    max_mb_to_test = params.get("max_mb_to_test", 0)
+    check_structure = params.get("check_structure", False)
+    
+    # Checked before the archive is opened: past that point errors mark the archive invalid
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
+    for name, value in (("max_files_to_test", max_files_to_test), ("always_test_last", always_test_last),
+                        ("max_mb_to_test", max_mb_to_test), ("max_memory_mb", params.get("max_memory_mb") or 0)):
+        if value < 0:
+            raise ValueError(f"{name} must not be negative: {value}")
+    resources = resources_from_params(params)
     
     if not os.path.exists(zip_path):
         raise FileNotFoundError(f"ZIP file does not exist: {zip_path}")
@@ -47,6 +80,8 @@ def main(params: Inputs, context: Context) -> Outputs:
     tested_files_count = 0
     can_open_archive = False
     is_valid = True
+    coverage = None
+    structure = None
     
     # Check if file is actually a ZIP file
     try:
@@ -61,29 +96,47 @@ def main(params: Inputs, context: Context) -> Outputs:
     
     if is_valid:
         try:
-            with pyzipper.AESZipFile(zip_path, 'r') as zip_file:
+            with open_archive(zip_path) as zip_file:
                 can_open_archive = True
                 
                 if password:
                     zip_file.setpassword(password.encode('utf-8'))
                 
+                if check_structure:
+                    # Headers only, before anything is decompressed
+                    with open(zip_path, 'rb') as raw_file:
+                        structure = scan_structure(raw_file, zip_file.infolist())
+                
                 # Get list of files to test
-                file_list = [info for info in zip_file.infolist() if not info.is_dir()]
+                all_files = [info for info in zip_file.infolist() if not info.is_dir()]
                 
-                # Limit number of files to test if specified
-                if max_files_to_test > 0 and len(file_list) > max_files_to_test:
-                    file_list = file_list[:max_files_to_test]
+                # Limit what is tested (entry count, stored bytes) with the chosen sampling
+                file_list, sample_seed = sample_entries(all_files, sampling, max_files_to_test,
+                                                        int(max_mb_to_test * 1024 * 1024), always_test_last,
+                                                        sample_seed)
+                coverage = sample_coverage(file_list, all_files)
+                coverage["sampling"] = sampling
+                if sampling != "first":
+                    coverage["seed"] = sample_seed
                 
                 tested_files_count = len(file_list)
+                reporter = ProgressReporter(context, total_bytes=sum(info.file_size for info in file_list),
+                                            total_entries=len(file_list), label="Validating")
                 
                 for file_info in file_list:
                     try:
                         # Test if file can be opened
                         with zip_file.open(file_info.filename) as test_file:
                             if check_crc:
-                                # Read file content and verify CRC
-                                content = test_file.read()
-                                calculated_crc = zlib.crc32(content) & 0xffffffff
+                                # Read file content in chunks and verify CRC
+                                calculated_crc = 0
+                                while True:
+                                    chunk = test_file.read(resources.chunk_size)
+                                    if not chunk:
+                                        break
+                                    calculated_crc = zlib.crc32(chunk, calculated_crc)
+                                    reporter.advance(len(chunk))
+                                calculated_crc &= 0xffffffff
                                 
                                 if calculated_crc != file_info.CRC:
                                     corrupted_files.append(file_info.filename)
@@ -93,24 +146,45 @@ def main(params: Inputs, context: Context) -> Outputs:
                             elif test_extraction:
                                 # Test extraction to temporary location
                                 with tempfile.NamedTemporaryFile() as temp_file:
-                                    temp_file.write(test_file.read())
+                                    copy_stream(test_file, temp_file, reporter, resources.chunk_size)
+                        
+                        reporter.advance(entries=1)
                     
+                    except OperationCancelled:
+                        raise
                     except Exception as e:
                         corrupted_files.append(file_info.filename)
                         validation_errors.append(f"Cannot extract {file_info.filename}: {str(e)}")
                         is_valid = False
                 
-                # Test ZIP file structure
-                try:
-                    zip_file.testzip()
-                except Exception as e:
-                    validation_errors.append(f"ZIP structure test failed: {str(e)}")
-                    is_valid = False
+                # Test ZIP file structure; it reads every entry, so only when nothing was left out
+                if len(file_list) == len(all_files):
+                    try:
+                        zip_file.testzip()
+                    except Exception as e:
+                        validation_errors.append(f"ZIP structure test failed: {str(e)}")
+                        is_valid = False
                 
+        except OperationCancelled:
+            raise
         except Exception as e:
             can_open_archive = False
             validation_errors.append(f"Cannot open ZIP archive: {str(e)}")
             is_valid = False
+            if check_structure:
+                # The central directory is unusable; the end records may still say why
+                with open(zip_path, 'rb') as raw_file:
+                    structure = scan_structure(raw_file)
+    
+    structure_issues = structure.issues if structure is not None else []
+    for issue in structure_issues:
+        validation_errors.append(f"Structure ({issue.kind}): {issue.filename + ': ' if issue.filename else ''}{issue.message}")
+        if issue.filename and issue.filename not in corrupted_files:
+            corrupted_files.append(issue.filename)
+        is_valid = False
+    
+    if can_open_archive:
+        reporter.finish()
     
     # Prepare validation summary
     validation_results = {
@@ -120,13 +194,22 @@ def main(params: Inputs, context: Context) -> Outputs:
         "total_errors": len(validation_errors),
         "corrupted_files_count": len(corrupted_files),
         "tested_files_count": tested_files_count,
+        "structure_issues_count": len(structure_issues),
         "validation_method": {
+            "structure_checked": check_structure,
             "crc_checked": check_crc,
             "extraction_tested": test_extraction,
-            "max_files_limit": max_files_to_test if max_files_to_test > 0 else "No limit"
+            "max_files_limit": max_files_to_test if max_files_to_test > 0 else "No limit",
+            "max_mb_limit": max_mb_to_test if max_mb_to_test > 0 else "No limit"
         }
     }
     
+    if coverage is not None:
+        validation_results["coverage"] = coverage
+    if structure is not None:
+        # Self-extracting and other prefixed archives are valid; worth knowing, not an error
+        validation_results["prefix_bytes"] = structure.prefix_bytes
+    
     if validation_errors:
         validation_results["errors"] = validation_errors[:10]  # Limit to first 10 errors
         if len(validation_errors) > 10:
@@ -137,7 +220,7 @@ def main(params: Inputs, context: Context) -> Outputs:
         if len(corrupted_files) > 10:
             validation_results["additional_corrupted_files"] = len(corrupted_files) - 10
     
-    validation_summary_df = pd.DataFrame([validation_results])
+    validation_summary_df = make_table([validation_results], result_format)
     
     return {
         "is_valid": is_valid,
@@ -0,0 +1,48 @@
+"""Shared fixtures: task blocks are loaded from their folders and run with a stand-in context."""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The OOMOL executor puts the package root on sys.path; do the same for zip_utils
+sys.path.insert(0, ROOT)
+
+
+class FakeContext:
+    """The parts of the OOMOL context the tasks use, recording what they report"""
+
+    def __init__(self, job_id="test-job", session_id="test-session"):
+        self.job_id = job_id
+        self.session_id = session_id
+        self.progress = []
+        self.logs = []
+
+    def report_progress(self, percent):
+        self.progress.append(percent)
+
+    def report_log(self, line, stdio="stdout"):
+        self.logs.append(line)
+
+
+def load_task(name):
+    """Import ``tasks/<name>/__init__.py`` as a module of its own"""
+    path = os.path.join(ROOT, "tasks", name, "__init__.py")
+    spec = importlib.util.spec_from_file_location(f"task_{name.replace('-', '_')}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def context():
+    return FakeContext()
+
+
+@pytest.fixture
+def run_task(context):
+    """Call a task's ``main`` with keyword parameters"""
+    def run(name, **params):
+        return load_task(name).main(params, context)
+    return run
@@ -0,0 +1,101 @@
+import os
+import zipfile
+
+
+def _make_folder(root, name, files):
+    folder = os.path.join(root, name)
+    os.makedirs(folder)
+    for filename, data in files.items():
+        with open(os.path.join(folder, filename), "wb") as f:
+            f.write(data)
+    return folder
+
+
+def test_parallel_stored_batch(tmp_path, run_task):
+    contents = {"a.bin": os.urandom(300_000), "b.txt": b"hello" * 1000}
+    folders = [_make_folder(str(tmp_path), f"folder{i}", contents) for i in range(3)]
+    output_directory = str(tmp_path / "out")
+
+    result = run_task("zip-batch-compress", source_folders=folders, output_directory=output_directory,
+                      compression_level=6, add_timestamp=False, password=None, include_subdirectories=True,
+                      compression_method="STORED", max_workers=2, result_format="dict", resume=False)
+
+    assert result["total_original_size"] == 3 * sum(len(data) for data in contents.values())
+    for i in range(3):
+        with zipfile.ZipFile(os.path.join(output_directory, f"folder{i}.zip")) as archive:
+            assert archive.testzip() is None
+            infos = archive.infolist()
+            assert {info.compress_type for info in infos} == {zipfile.ZIP_STORED}
+            assert {os.path.basename(info.filename): archive.read(info) for info in infos} == contents
+
+
+def test_sequential_by_default(tmp_path, run_task, monkeypatch):
+    from zip_utils import batch
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("the process pool is opt-in")
+
+    monkeypatch.setattr(batch, "compress_folders_parallel", no_pool)
+    folders = [_make_folder(str(tmp_path), f"folder{i}", {"a.txt": b"data"}) for i in range(3)]
+
+    result = run_task("zip-batch-compress", source_folders=folders, output_directory=str(tmp_path / "out"),
+                      compression_level=6, add_timestamp=False, password=None, include_subdirectories=True,
+                      result_format="dict", resume=False)
+
+    assert sorted(os.listdir(tmp_path / "out")) == ["folder0.zip", "folder1.zip", "folder2.zip"]
+    assert result["total_original_size"] == 12
+
+
+def test_resume_after_interrupted_run(tmp_path, run_task, context, monkeypatch):
+    import pytest
+    from zip_utils import batch
+    from zip_utils.journal import JOURNAL_PREFIX
+    from zip_utils.progress import OperationCancelled, request_cancel
+
+    folders = [_make_folder(str(tmp_path), f"folder{i}", {"a.txt": f"data {i}".encode() * 1000}) for i in range(3)]
+    output_directory = tmp_path / "out"
+    params = dict(source_folders=folders, output_directory=str(output_directory), compression_level=6,
+                  add_timestamp=False, password=None, include_subdirectories=True, result_format="dict",
+                  resume=True)
+
+    compress_folder = batch.compress_folder
+    built = []
+
+    def compress_then_cancel(*args, **kwargs):
+        # Interrupted once the first folder's archive is complete
+        result = compress_folder(*args, **kwargs)
+        built.append(os.path.basename(args[1]))
+        request_cancel(context.job_id)
+        return result
+
+    monkeypatch.setattr(batch, "compress_folder", compress_then_cancel)
+    with pytest.raises(OperationCancelled):
+        run_task("zip-batch-compress", **params)
+    assert built == ["folder0.zip"]
+    assert sorted(os.listdir(output_directory))[1:] == ["folder0.zip"]
+    journal_name = sorted(os.listdir(output_directory))[0]
+    assert journal_name.startswith(JOURNAL_PREFIX)
+    # A torn record from the crash, and a line that isn't a record at all
+    with open(output_directory / journal_name, "a") as journal:
+        journal.write("not json\n{\"event\": \"done\", \"key\"")
+
+    first = os.stat(output_directory / "folder0.zip")
+    built.clear()
+    monkeypatch.setattr(batch, "compress_folder", lambda *args, **kwargs: built.append(os.path.basename(args[1]))
+                        or compress_folder(*args, **kwargs))
+    result = run_task("zip-batch-compress", **params)
+
+    # The finished folder is skipped, the ones only planned are built under their planned names
+    assert built == ["folder1.zip", "folder2.zip"]
+    again = os.stat(output_directory / "folder0.zip")
+    assert (again.st_ino, again.st_mtime_ns) == (first.st_ino, first.st_mtime_ns)
+    summary = result["processing_summary"]
+    assert summary["folder_name"] == ["folder0", "folder1", "folder2"]
+    assert summary["status"] == ["Success"] * 3
+    assert summary["zip_path"] == [str(output_directory / f"folder{i}.zip") for i in range(3)]
+    assert result["total_original_size"] == sum(len(f"data {i}".encode() * 1000) for i in range(3))
+    for i in range(3):
+        with zipfile.ZipFile(output_directory / f"folder{i}.zip") as archive:
+            assert archive.read(f"folder{i}/a.txt") == f"data {i}".encode() * 1000
+    # Completed: nothing left to resume
+    assert sorted(os.listdir(output_directory)) == ["folder0.zip", "folder1.zip", "folder2.zip"]
@@ -0,0 +1,47 @@
+import os
+import zipfile
+
+import pytest
+
+from conftest import FakeContext, load_task
+from zip_utils.progress import OperationCancelled, running_jobs
+
+
+class CancellingContext(FakeContext):
+    """Runs the zip-cancel block, as another block of the same flow would, on the first progress report"""
+
+    def report_progress(self, percent):
+        super().report_progress(percent)
+        if len(self.progress) == 1:
+            load_task("zip-cancel").main({"job_ids": None, "all_sessions": False},
+                                         FakeContext(job_id="cancel-job", session_id=self.session_id))
+
+
+@pytest.mark.parametrize("compression", [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED])
+def test_cancel_removes_extracted_files(tmp_path, compression):
+    zip_path = str(tmp_path / "data.zip")
+    with zipfile.ZipFile(zip_path, "w", compression) as archive:
+        for i in range(5):
+            archive.writestr(f"file{i}.bin", os.urandom(200_000))
+    output_directory = str(tmp_path / "out")
+
+    with pytest.raises(OperationCancelled):
+        load_task("zip-extract").main({"zip_path": zip_path, "output_directory": output_directory,
+                                       "create_subfolder": False, "overwrite_existing": True},
+                                      CancellingContext())
+
+    assert os.listdir(output_directory) == []
+    assert running_jobs() == []
+
+
+def test_cancel_only_current_session(tmp_path):
+    from zip_utils.progress import ProgressReporter, cancel_running
+
+    ours = ProgressReporter(FakeContext(job_id="ours", session_id="a"))
+    theirs = ProgressReporter(FakeContext(job_id="theirs", session_id="b"))
+    assert cancel_running("a") == ["ours"]
+    with pytest.raises(OperationCancelled):
+        ours.advance(1)
+    theirs.advance(1)
+    theirs.finish()
+    assert running_jobs() == []
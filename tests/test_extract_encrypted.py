@@ -0,0 +1,28 @@
+import pyzipper
+import pytest
+
+
+@pytest.fixture
+def encrypted_zip(tmp_path):
+    path = str(tmp_path / "secret.zip")
+    with pyzipper.AESZipFile(path, "w", compression=pyzipper.ZIP_DEFLATED, encryption=pyzipper.WZ_AES) as archive:
+        archive.setpassword(b"right")
+        archive.writestr("secret.txt", b"contents")
+    return path
+
+
+@pytest.mark.parametrize("password, candidate_passwords, expected_index", [
+    ("right", None, 0),
+    (None, ["wrong", "right"], 2),
+    ("x", ["y", "y", "right"], 3),
+    ("", ["right"], 1),
+    ("wrong", ["right", "wrong"], 1),
+])
+def test_matched_password_index_counts_documented_positions(tmp_path, run_task, encrypted_zip, password,
+                                                             candidate_passwords, expected_index):
+    result = run_task("zip-extract-encrypted", zip_path=encrypted_zip, password=password,
+                      output_directory=str(tmp_path / "out"), create_subfolder=False, overwrite_existing=True,
+                      verify_password_first=True, candidate_passwords=candidate_passwords)
+
+    assert result["matched_password_index"] == expected_index
+    assert result["extracted_files_count"] == 1
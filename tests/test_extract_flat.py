@@ -0,0 +1,62 @@
+import os
+import zipfile
+
+import pytest
+
+from zip_utils.guard import ExtractionLimitExceeded
+
+
+@pytest.fixture
+def nested_zip(tmp_path):
+    zip_path = str(tmp_path / "nested.zip")
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for folder in ("a", "b", "c"):
+            archive.writestr(f"{folder}/report.txt", folder.encode())
+            archive.writestr(f"{folder}/image.png", b"png" * 1000)
+    return zip_path
+
+
+def _extract_flat(run_task, zip_path, output_directory, **params):
+    defaults = dict(password=None, handle_name_conflicts="rename", file_filter="", max_files=0)
+    return run_task("zip-extract-flat", zip_path=zip_path, output_directory=output_directory, **{**defaults, **params})
+
+
+def test_limits_apply_to_filtered_entries(nested_zip, tmp_path, run_task):
+    # Six entries in the archive, three of them selected by the filter
+    result = _extract_flat(run_task, nested_zip, str(tmp_path / "out"), file_filter="txt", max_entries=3)
+
+    assert sorted(os.listdir(tmp_path / "out")) == ["report.txt", "report_1.txt", "report_2.txt"]
+    assert result["extracted_files_count"] == 3
+
+
+@pytest.mark.parametrize("limits", [{"max_total_size_mb": 0.005}, {"max_entries": 5}])
+def test_limits_checked_before_extracting(nested_zip, tmp_path, run_task, context, limits):
+    with pytest.raises(ExtractionLimitExceeded, match="Archive"):
+        _extract_flat(run_task, nested_zip, str(tmp_path / "out"), **limits)
+
+    # Refused by check_plan: no entry was started
+    assert os.listdir(tmp_path / "out") == []
+    assert context.progress == []
+
+
+def test_skip_conflicts_within_archive(nested_zip, tmp_path, run_task):
+    result = _extract_flat(run_task, nested_zip, str(tmp_path / "out"), handle_name_conflicts="skip")
+
+    assert result["extracted_files_count"] == 2
+    assert result["skipped_files_count"] == 4
+    with open(tmp_path / "out" / "report.txt", "rb") as f:
+        assert f.read() == b"a"
+
+
+def test_rename_around_existing_files_in_archive_order(nested_zip, tmp_path, run_task):
+    output_directory = tmp_path / "out"
+    output_directory.mkdir()
+    (output_directory / "report.txt").write_bytes(b"old")
+
+    result = _extract_flat(run_task, str(nested_zip), str(output_directory), file_filter="txt", max_files=2)
+
+    assert result["extracted_files_count"] == 2
+    assert (output_directory / "report.txt").read_bytes() == b"old"
+    assert (output_directory / "report_1.txt").read_bytes() == b"a"
+    assert (output_directory / "report_2.txt").read_bytes() == b"b"
+    assert not (output_directory / "report_3.txt").exists()
@@ -0,0 +1,32 @@
+import zipfile
+
+
+def _get_info(run_task, zip_path):
+    return run_task("zip-get-info", zip_path=zip_path, password=None, calculate_checksums=False,
+                    result_format="dict", quick_stats=True)
+
+
+def test_quick_stats_from_tail(tmp_path, run_task):
+    zip_path = str(tmp_path / "data.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(3):
+            archive.writestr(f"file{i}.txt", b"data" * 100)
+
+    result = _get_info(run_task, zip_path)
+
+    assert result["total_entries"] == 3
+    assert result["archive_stats"]["stats_mode"] == ["quick"]
+    assert "quick_stats_error" not in result["archive_stats"]
+
+
+def test_quick_stats_failure_is_reported(tmp_path, run_task, context):
+    zip_path = str(tmp_path / "broken.zip")
+    with open(zip_path, "wb") as f:
+        f.write(b"not an archive" * 100)
+
+    result = _get_info(run_task, zip_path)
+
+    # Answered by the full read, with the reason the quick read failed
+    assert "stats_mode" not in result["archive_stats"]
+    assert result["archive_stats"]["quick_stats_error"] == ["File is not a zip file"]
+    assert any("Quick stats unavailable" in line for line in context.logs)
@@ -0,0 +1,71 @@
+import os
+import zipfile
+
+from zip_utils.handles import ArchivePool, archive_pool, discard_archive, open_archive
+
+
+def _make_archive(zip_path, data):
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.writestr("a.txt", data)
+
+
+def test_handle_reused(tmp_path):
+    zip_path = str(tmp_path / "data.zip")
+    _make_archive(zip_path, b"first")
+    pool = ArchivePool()
+
+    key, zip_file = pool.acquire(zip_path)
+    zip_file.setpassword(b"secret")
+    pool.release(key, zip_file)
+    again_key, again = pool.acquire(zip_path)
+
+    assert (again_key, again) == (key, zip_file)
+    assert (pool.hits, pool.misses) == (1, 1)
+    # The next caller doesn't inherit the previous one's password
+    assert again.pwd is None
+    # A concurrent caller gets a handle of its own
+    other_key, other = pool.acquire(zip_path)
+    assert other_key == key and other is not again
+    pool.release(key, again)
+    pool.release(key, other)
+    pool.clear()
+
+
+def test_changed_file_invalidates_handle(tmp_path):
+    zip_path = str(tmp_path / "data.zip")
+    _make_archive(zip_path, b"first")
+    pool = ArchivePool()
+    key, zip_file = pool.acquire(zip_path)
+    pool.release(key, zip_file)
+
+    # Same size, new mtime: still a different archive
+    _make_archive(zip_path, b"other")
+    os.utime(zip_path, ns=(key[2] + 10**9, key[2] + 10**9))
+    new_key, new_file = pool.acquire(zip_path)
+
+    assert new_key[1] == key[1] and new_key != key
+    assert new_file is not zip_file
+    assert zip_file.fp is None
+    assert new_file.read("a.txt") == b"other"
+    assert (pool.hits, pool.misses) == (0, 2)
+    pool.release(new_key, new_file)
+    pool.clear()
+
+
+def test_discard_archive(tmp_path):
+    zip_path = str(tmp_path / "data.zip")
+    _make_archive(zip_path, b"first")
+    pool = archive_pool()
+    pool.clear()
+
+    with open_archive(zip_path) as zip_file:
+        assert zip_file.read("a.txt") == b"first"
+    with open_archive(zip_path) as again:
+        assert again is zip_file
+
+    discard_archive(zip_path)
+    assert zip_file.fp is None
+    with open_archive(zip_path) as reopened:
+        assert reopened is not zip_file
+        assert reopened.read("a.txt") == b"first"
+    pool.clear()
@@ -0,0 +1,59 @@
+import zipfile
+
+import pyzipper
+import pytest
+
+
+def _write(path, files, password=None):
+    if password:
+        with pyzipper.AESZipFile(path, "w", compression=pyzipper.ZIP_DEFLATED, encryption=pyzipper.WZ_AES) as archive:
+            archive.setpassword(password)
+            for name, data in files.items():
+                archive.writestr(name, data)
+    else:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, data in files.items():
+                archive.writestr(name, data)
+    return str(path)
+
+
+def _merge(run_task, tmp_path, zip_files, handle_duplicates, passwords=None):
+    output_path = str(tmp_path / "merged.zip")
+    result = run_task("zip-merge", zip_files=zip_files, output_path=output_path, passwords=passwords or [],
+                      output_password=None, handle_duplicates=handle_duplicates, compression_level=6,
+                      result_format="dict", max_workers=2)
+    with zipfile.ZipFile(output_path) as archive:
+        contents = {name: archive.read(name) for name in archive.namelist()}
+    return result, contents
+
+
+@pytest.mark.parametrize("handle_duplicates", ["skip", "rename", "deduplicate"])
+def test_failed_input_does_not_reserve_names(tmp_path, run_task, handle_duplicates):
+    encrypted = _write(tmp_path / "a.zip", {"foo.txt": b"from a"}, password=b"right")
+    plain = _write(tmp_path / "b.zip", {"foo.txt": b"from b", "bar.txt": b"bar"})
+
+    result, contents = _merge(run_task, tmp_path, [encrypted, plain], handle_duplicates, passwords=["wrong"])
+
+    assert contents == {"foo.txt": b"from b", "bar.txt": b"bar"}
+    summary = result["merge_summary"]
+    assert summary["status"][0].startswith("Error")
+    assert summary["files_added"][1] == 2
+    assert result["duplicate_files_count"] == 0
+
+
+@pytest.mark.parametrize("handle_duplicates, expected", [
+    ("skip", {"foo.txt": b"one", "a.txt": b"a", "b.txt": b"b"}),
+    ("rename", {"foo.txt": b"one", "foo_1.txt": b"two", "foo_2.txt": b"one", "a.txt": b"a", "b.txt": b"b"}),
+    ("deduplicate", {"foo.txt": b"one", "foo_1.txt": b"two", "a.txt": b"a", "b.txt": b"b"}),
+])
+def test_duplicate_handling(tmp_path, run_task, handle_duplicates, expected):
+    zip_files = [
+        _write(tmp_path / "1.zip", {"foo.txt": b"one", "a.txt": b"a"}),
+        _write(tmp_path / "2.zip", {"foo.txt": b"two", "b.txt": b"b"}),
+        _write(tmp_path / "3.zip", {"foo.txt": b"one"}),
+    ]
+
+    result, contents = _merge(run_task, tmp_path, zip_files, handle_duplicates)
+
+    assert contents == expected
+    assert result["duplicate_files_count"] == 2
@@ -0,0 +1,59 @@
+import os
+import zipfile
+
+from zip_utils.planner import plan_extraction
+
+
+def _info(name, offset):
+    info = zipfile.ZipInfo(name)
+    info.header_offset = offset
+    return info
+
+
+def test_duplicate_targets_skipped_without_overwrite(tmp_path):
+    target = str(tmp_path / "out" / "report.txt")
+    first, second = _info("a/report.txt", 0), _info("b/report.txt", 100)
+
+    plan = plan_extraction([(second, target), (first, target)], overwrite_existing=False)
+
+    assert plan.entries == [(first, target)]
+    assert plan.skipped == [(second, target)]
+    assert os.path.isdir(tmp_path / "out")
+
+
+def test_duplicate_targets_kept_with_overwrite(tmp_path):
+    target = str(tmp_path / "report.txt")
+    first, second = _info("a/report.txt", 0), _info("b/report.txt", 100)
+
+    plan = plan_extraction([(first, target), (second, target)], overwrite_existing=True)
+
+    assert plan.entries == [(first, target), (second, target)]
+    assert plan.skipped == []
+
+
+def test_selective_flat_extraction_reports_duplicate_name(tmp_path, run_task):
+    zip_path = str(tmp_path / "data.zip")
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.writestr("a/report.txt", b"first")
+        archive.writestr("b/report.txt", b"second")
+
+    result = run_task("zip-extract-selective", zip_path=zip_path, files_to_extract=["a/report.txt", "b/report.txt"],
+                      output_directory=str(tmp_path / "out"), password=None, preserve_structure=False,
+                      overwrite_existing=False)
+
+    assert result["extracted_files_count"] == 1
+    assert result["skipped_files"] == ["Already exists: b/report.txt"]
+    with open(tmp_path / "out" / "report.txt", "rb") as f:
+        assert f.read() == b"first"
+
+
+def test_rename_existing_picks_free_names(tmp_path):
+    (tmp_path / "report.txt").write_bytes(b"old")
+    (tmp_path / "report_1.txt").write_bytes(b"old")
+    target = str(tmp_path / "report.txt")
+    first, second = _info("a/report.txt", 0), _info("b/report.txt", 100)
+
+    plan = plan_extraction([(second, target), (first, target)], overwrite_existing=False, rename_existing=True)
+
+    assert plan.entries == [(first, str(tmp_path / "report_2.txt")), (second, str(tmp_path / "report_3.txt"))]
+    assert plan.skipped == []
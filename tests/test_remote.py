@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from zip_utils.remote import BLOCK_SIZE, member_range
+
+_RANGE = re.compile(r"bytes=(\d+)-(\d+)")
+
+
+class _ArchiveHandler(BaseHTTPRequestHandler):
+    """Serves ``server.data`` with (or, when ``server.ranges`` is False, without) single-range support"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def _respond(self, body):
+        data = self.server.data
+        match = _RANGE.fullmatch(self.headers.get("Range", ""))
+        if self.server.ranges and match:
+            start, end = int(match.group(1)), min(int(match.group(2)) + 1, len(data))
+            self.server.served.append((start, end))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(data)}")
+            payload = data[start:end]
+        else:
+            if body:
+                self.server.served.append((0, len(data)))
+            self.send_response(200)
+            payload = data
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if body:
+            try:
+                self.wfile.write(payload)
+            except ConnectionError:
+                # The client dropped the connection instead of reading a full download
+                pass
+
+
+@pytest.fixture
+def archive_server(tmp_path):
+    """Start a server for an archive of 40 random 200 KB entries; yields ``serve(ranges=True) -> (url, server)``"""
+    zip_path = tmp_path / "remote.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as archive:
+        for i in range(40):
+            archive.writestr(f"dir/file{i:02d}.bin", os.urandom(200_000))
+    servers = []
+
+    def serve(ranges=True):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _ArchiveHandler)
+        server.data = zip_path.read_bytes()
+        server.ranges = ranges
+        server.served = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/remote.zip", server
+
+    yield serve, str(zip_path)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _blocks(start, end):
+    return set(range(start // BLOCK_SIZE, (end - 1) // BLOCK_SIZE + 1))
+
+
+def test_selective_fetches_only_central_directory_and_selected_entries(archive_server, tmp_path, run_task, context):
+    serve, zip_path = archive_server
+    url, server = serve()
+    selected = ["dir/file05.bin", "dir/file30.bin"]
+
+    result = run_task("zip-extract-selective", zip_path=url, files_to_extract=selected,
+                      output_directory=str(tmp_path / "out"), password=None, preserve_structure=False,
+                      overwrite_existing=True)
+
+    assert result["extracted_files_count"] == 2 and result["skipped_files"] == []
+    with zipfile.ZipFile(zip_path) as archive:
+        for name in selected:
+            with open(os.path.join(tmp_path, "out", os.path.basename(name)), "rb") as f:
+                assert f.read() == archive.read(name)
+        allowed = _blocks(archive.start_dir, len(server.data))
+        for name in selected:
+            allowed |= _blocks(*member_range(archive, archive.getinfo(name)))
+
+    # Every byte served lies in a block of the central directory or of a selected entry
+    for start, end in server.served:
+        assert _blocks(start, end) <= allowed
+    served_bytes = sum(end - start for start, end in server.served)
+    assert served_bytes <= len(allowed) * BLOCK_SIZE < len(server.data) // 4
+    # The task's own counters agree with what the server sent; one extra request is the HEAD probe
+    fetched, _, requests = re.search(r"Fetched (\d+) of (\d+) bytes in (\d+) requests", "\n".join(context.logs)).groups()
+    assert int(fetched) == served_bytes
+    assert int(requests) == len(server.served) + 1 <= 5
+
+
+def test_server_without_range_support_is_refused(archive_server, tmp_path, run_task):
+    serve, _ = archive_server
+    url, server = serve(ranges=False)
+
+    with pytest.raises(OSError, match="does not support range requests"):
+        run_task("zip-extract-selective", zip_path=url, files_to_extract=["dir/file05.bin"],
+                 output_directory=str(tmp_path / "out"), password=None, preserve_structure=False,
+                 overwrite_existing=True)
+    assert os.listdir(tmp_path / "out") == []
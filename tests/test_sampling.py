@@ -0,0 +1,92 @@
+import zipfile
+
+from zip_utils.sampling import OFFSET_STRATA, sample_coverage, sample_entries
+
+
+def _infos(sizes):
+    """ZipInfos laid out back to back with the given stored sizes"""
+    infos, offset = [], 0
+    for i, size in enumerate(sizes):
+        info = zipfile.ZipInfo(f"file{i:03d}")
+        info.header_offset = offset
+        info.compress_size = info.file_size = size
+        infos.append(info)
+        offset += 30 + len(info.filename) + size
+    return infos
+
+
+def _names(sample):
+    return [info.filename for info in sample]
+
+
+def test_first_keeps_archive_order():
+    infos = _infos([100] * 20)
+
+    sample, _ = sample_entries(infos, "first", max_entries=5)
+
+    assert _names(sample) == _names(infos[:5])
+
+
+def test_random_is_repeatable_with_its_seed():
+    infos = _infos([100] * 200)
+
+    sample, seed = sample_entries(infos, "random", max_entries=10)
+    again, same_seed = sample_entries(infos, "random", max_entries=10, seed=seed)
+
+    assert seed == same_seed and _names(sample) == _names(again)
+    assert _names(sample) != _names(infos[:10])
+    # Returned in offset order, so the archive is read front to back
+    assert [info.header_offset for info in sample] == sorted(info.header_offset for info in sample)
+    assert _names(sample_entries(infos, "random", max_entries=10, seed=seed + 1)[0]) != _names(sample)
+
+
+def test_stratified_covers_every_offset_range():
+    infos = _infos([100] * 500)
+
+    sample, _ = sample_entries(infos, "stratified", max_entries=OFFSET_STRATA, seed=1)
+
+    coverage = sample_coverage(sample, infos)
+    assert coverage["offset_ranges_covered"] == f"{OFFSET_STRATA}/{OFFSET_STRATA}"
+    # Random sampling of the same size usually leaves some ranges out; "first" always does
+    first = sample_coverage(sample_entries(infos, "first", max_entries=OFFSET_STRATA)[0], infos)
+    assert first["offset_ranges_covered"] == f"1/{OFFSET_STRATA}"
+
+
+def test_stratified_samples_every_size_class():
+    infos = _infos([10] * 300 + [1_000_000] * 3)
+
+    sample, _ = sample_entries(infos, "stratified", max_entries=10, seed=3)
+
+    assert any(info.compress_size == 1_000_000 for info in sample)
+
+
+def test_always_test_last_is_kept_past_the_limits():
+    infos = _infos([100] * 50)
+
+    sample, _ = sample_entries(infos, "random", max_entries=3, max_bytes=250, tail_count=3, seed=5)
+
+    assert _names(sample) == _names(infos[-3:])
+    coverage = sample_coverage(sample, infos)
+    assert coverage["includes_last_entry"] is True
+
+
+def test_byte_budget_skips_entries_that_do_not_fit():
+    infos = _infos([600, 600, 100, 100, 600, 100])
+
+    sample, _ = sample_entries(infos, "first", max_bytes=900)
+
+    # 600 + 100 + 100 + 100; the later 600 would go over, smaller entries still fit
+    assert [info.compress_size for info in sample] == [600, 100, 100, 100]
+
+
+def test_coverage_numbers():
+    infos = _infos([100, 300, 100, 500])
+
+    coverage = sample_coverage([infos[1], infos[3]], infos)
+
+    assert coverage["entries_tested"] == 2 and coverage["entries_total"] == 4
+    assert coverage["entry_coverage_percent"] == 50.0
+    assert coverage["bytes_tested"] == 800 and coverage["bytes_total"] == 1000
+    assert coverage["byte_coverage_percent"] == 80.0
+    assert coverage["includes_last_entry"] is True
+    assert sample_coverage([], [])["entry_coverage_percent"] == 100.0
@@ -0,0 +1,85 @@
+import io
+import os
+import zipfile
+
+import pyzipper
+import pytest
+
+from zip_utils.streaming import StreamingZipReader, StreamSink
+
+
+class TricklingReader:
+    """A pipe that hands out one byte per read"""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def read(self, n=-1):
+        return self._data.read(1 if n != 0 else 0)
+
+
+def _archive(files, **kwargs):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", **kwargs) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_reads_archive_one_byte_at_a_time():
+    files = {"a.txt": b"hello" * 100, "dir/b.bin": os.urandom(5000), "empty": b""}
+    for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        data = _archive(files, compression=compression)
+
+        extracted = {entry.filename: entry.read() for entry in StreamingZipReader(TricklingReader(data))}
+
+        assert extracted == files
+
+
+def _streamed_aes_archive(files, password):
+    buffer = io.BytesIO()
+    with pyzipper.AESZipFile(StreamSink(buffer, close_raw=False), "w", compression=pyzipper.ZIP_STORED) as archive:
+        archive.setpassword(password)
+        archive.setencryption(pyzipper.WZ_AES, nbits=256)
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_reads_encrypted_stored_entries_with_data_descriptor():
+    # Includes a descriptor signature inside the data, which must not end the entry early
+    files = {"a.txt": b"hello PK\x07\x08 world" * 50, "b.bin": os.urandom(70000), "empty": b""}
+    data = _streamed_aes_archive(files, b"secret")
+
+    assert all(entry.use_datadescripter for entry in StreamingZipReader(io.BytesIO(data), b"secret"))
+    for reader in (io.BytesIO(data), TricklingReader(data)):
+        extracted = {entry.filename: entry.read() for entry in StreamingZipReader(reader, b"secret")}
+        assert extracted == files
+
+
+def test_tampered_encrypted_stored_entry_fails_hmac():
+    data = bytearray(_streamed_aes_archive({"a.txt": b"x" * 1000}, b"secret"))
+    # Flip a ciphertext byte well inside the entry's data
+    data[200] ^= 0xFF
+
+    with pytest.raises(pyzipper.BadZipFile, match="HMAC"):
+        for entry in StreamingZipReader(io.BytesIO(bytes(data)), b"secret"):
+            entry.read()
+
+
+def test_streamed_encrypted_stored_archive_round_trip(tmp_path, run_task):
+    source = tmp_path / "photos"
+    source.mkdir()
+    (source / "a.jpg").write_bytes(os.urandom(200000))
+    (source / "notes.txt").write_bytes(b"notes " * 1000)
+    zip_path = str(tmp_path / "photos.zip")
+    run_task("zip-create", source_path=str(source), output_path=zip_path, include_subdirectories=True,
+             password="secret", compression_method="DEFLATED", streaming_output=True, store_patterns=["*.jpg"])
+
+    output_directory = tmp_path / "out"
+    result = run_task("zip-extract", zip_path=zip_path, output_directory=str(output_directory),
+                      create_subfolder=False, overwrite_existing=True, password="secret", streaming_input=True)
+
+    assert result["extracted_files_count"] == 2
+    for name in ("a.jpg", "notes.txt"):
+        assert (output_directory / "photos" / name).read_bytes() == (source / name).read_bytes()
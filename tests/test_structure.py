@@ -0,0 +1,94 @@
+import zipfile
+
+from zip_utils.structure import check_structure
+
+
+def _write_archive(path, entries):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        for name, data in entries.items():
+            archive.writestr(name, data)
+
+
+def _scan(path):
+    with zipfile.ZipFile(path) as archive:
+        infos = archive.infolist()
+    with open(path, "rb") as fp:
+        return check_structure(fp, infos)
+
+
+def test_prefixed_archive_is_not_an_issue(tmp_path):
+    inner = tmp_path / "inner.zip"
+    _write_archive(inner, {"a.txt": b"a" * 100, "b.txt": b"b" * 100})
+    sfx = tmp_path / "sfx.zip"
+    sfx.write_bytes(b"MZ stub" * 100 + inner.read_bytes())
+
+    report = _scan(sfx)
+
+    assert report.issues == []
+    assert report.prefix_bytes == 700
+
+
+def test_validate_reports_prefix_bytes(tmp_path, run_task):
+    zip_path = tmp_path / "data.zip"
+    _write_archive(zip_path, {"a.txt": b"a" * 100})
+
+    result = run_task("zip-validate", zip_path=str(zip_path), password=None, test_extraction=False, check_crc=True,
+                      max_files_to_test=0, result_format="dict", sampling="first", sample_seed=None,
+                      always_test_last=0, max_mb_to_test=0, check_structure=True)
+
+    assert result["is_valid"]
+    assert result["validation_summary"]["prefix_bytes"] == [0]
+
+
+def _kinds(report):
+    return {issue.kind for issue in report.issues}
+
+
+def test_clean_archive(tmp_path):
+    zip_path = tmp_path / "clean.zip"
+    _write_archive(zip_path, {"a.txt": b"a" * 100, "b.txt": b"b" * 100})
+
+    assert _scan(zip_path) == ([], 0)
+
+
+def test_truncated_archive(tmp_path):
+    zip_path = tmp_path / "truncated.zip"
+    _write_archive(zip_path, {"a.txt": b"a" * 1000, "b.txt": b"b" * 1000})
+    data = zip_path.read_bytes()
+    zip_path.write_bytes(data[:len(data) // 2])
+
+    with open(zip_path, "rb") as fp:
+        report = check_structure(fp)
+
+    assert _kinds(report) == {"eocd"}
+
+
+def test_local_header_disagreeing_with_central_record(tmp_path):
+    zip_path = tmp_path / "mismatch.zip"
+    _write_archive(zip_path, {"a.txt": b"a" * 100, "b.txt": b"b" * 100})
+    with zipfile.ZipFile(zip_path) as archive:
+        offset = archive.getinfo("b.txt").header_offset
+    data = bytearray(zip_path.read_bytes())
+    # CRC-32 field of b.txt's local header
+    data[offset + 14:offset + 18] = b"\0\0\0\0"
+    zip_path.write_bytes(bytes(data))
+
+    report = _scan(zip_path)
+
+    assert [(issue.kind, issue.filename) for issue in report.issues] == [("mismatch", "b.txt")]
+    assert "CRC-32" in report.issues[0].message
+
+
+def test_overlapping_entries(tmp_path):
+    zip_path = tmp_path / "overlap.zip"
+    _write_archive(zip_path, {"a.txt": b"a" * 100, "b.txt": b"b" * 100})
+    with zipfile.ZipFile(zip_path) as archive:
+        infos = archive.infolist()
+    # A second central record pointing into the first entry's bytes, as overlapping-entry bombs do
+    infos[1].header_offset = infos[0].header_offset
+
+    with open(zip_path, "rb") as fp:
+        report = check_structure(fp, infos)
+
+    assert "overlap" in _kinds(report)
+    assert any(issue.kind == "overlap" and "a.txt" in issue.message for issue in report.issues)
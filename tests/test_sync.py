@@ -0,0 +1,71 @@
+import os
+import zipfile
+
+import pytest
+
+from zip_utils.sync import entry_mtime
+
+
+def _make_archive(zip_path, files):
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for name, data in files.items():
+            info = zipfile.ZipInfo(name, date_time=(2024, 5, 17, 12, 30, 0))
+            archive.writestr(info, data)
+
+
+def _sync(run_task, zip_path, output_directory, delete_extraneous):
+    return run_task("zip-extract", zip_path=zip_path, output_directory=output_directory, create_subfolder=False,
+                    overwrite_existing=True, sync=True, delete_extraneous=delete_extraneous)
+
+
+@pytest.mark.parametrize("delete_extraneous", [False, True])
+def test_sync_rewrites_only_stale_files(tmp_path, run_task, delete_extraneous):
+    zip_path = str(tmp_path / "data.zip")
+    files = {"unchanged.txt": b"same" * 100, "touched.txt": b"kept" * 100, "docs/stale.txt": b"new content"}
+    _make_archive(zip_path, files)
+    output_directory = tmp_path / "out"
+    _sync(run_task, zip_path, str(output_directory), delete_extraneous=False)
+
+    # Same size, other content and time: caught by the CRC-32
+    stale = output_directory / "docs" / "stale.txt"
+    stale.write_bytes(b"old content")
+    # Same content, other time: the CRC-32 matches, the file stays
+    touched = output_directory / "touched.txt"
+    os.utime(touched, (1_000_000_000, 1_000_000_000))
+    extra = output_directory / "docs" / "extra.txt"
+    extra.write_bytes(b"not in the archive")
+    before = {name: os.stat(output_directory / name) for name in ("unchanged.txt", "touched.txt", "docs/stale.txt")}
+
+    result = _sync(run_task, zip_path, str(output_directory), delete_extraneous)
+
+    assert result["extracted_files"] == [str(stale)]
+    assert result["unchanged_files_count"] == 2
+    for name, data in files.items():
+        assert (output_directory / name).read_bytes() == data
+    unchanged = os.stat(output_directory / "unchanged.txt")
+    assert (unchanged.st_ino, unchanged.st_mtime_ns) == (before["unchanged.txt"].st_ino,
+                                                         before["unchanged.txt"].st_mtime_ns)
+    # Not rewritten, only restamped with the entry's time
+    assert os.stat(touched).st_ino == before["touched.txt"].st_ino
+    mtime = entry_mtime(zipfile.ZipFile(zip_path).getinfo("touched.txt"))
+    assert os.stat(touched).st_mtime == mtime
+    assert os.stat(stale).st_ino != before["docs/stale.txt"].st_ino
+    assert os.stat(stale).st_mtime == mtime
+    if delete_extraneous:
+        assert result["deleted_files"] == [str(extra)]
+        assert not extra.exists()
+    else:
+        assert result["deleted_files"] == []
+        assert extra.read_bytes() == b"not in the archive"
+    # No temporary files left next to the targets
+    assert sorted(os.listdir(output_directory / "docs")) == (["stale.txt"] if delete_extraneous
+                                                            else ["extra.txt", "stale.txt"])
+
+
+def test_delete_extraneous_requires_sync(tmp_path, run_task):
+    zip_path = str(tmp_path / "data.zip")
+    _make_archive(zip_path, {"a.txt": b"a"})
+
+    with pytest.raises(ValueError):
+        run_task("zip-extract", zip_path=zip_path, output_directory=str(tmp_path / "out"), create_subfolder=False,
+                 overwrite_existing=True, delete_extraneous=True)
@@ -0,0 +1,39 @@
+import zipfile
+
+import pytest
+
+
+@pytest.fixture
+def small_zip(tmp_path):
+    zip_path = str(tmp_path / "data.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(5):
+            archive.writestr(f"file{i}.txt", f"content {i}".encode() * 100)
+    return zip_path
+
+
+def _validate(run_task, zip_path, **params):
+    defaults = dict(password=None, test_extraction=False, check_crc=True, max_files_to_test=0,
+                    result_format="dict", sampling="first", sample_seed=None, always_test_last=0,
+                    max_mb_to_test=0, check_structure=False)
+    return run_task("zip-validate", zip_path=zip_path, **{**defaults, **params})
+
+
+def test_valid_archive(small_zip, run_task):
+    result = _validate(run_task, small_zip, sampling="stratified", sample_seed=7, max_files_to_test=3)
+
+    assert result["is_valid"] and result["can_open_archive"]
+    assert result["tested_files_count"] == 3
+
+
+@pytest.mark.parametrize("params, message", [
+    ({"sampling": "everything"}, "Unknown sampling strategy"),
+    ({"max_files_to_test": -1}, "max_files_to_test"),
+    ({"always_test_last": -2}, "always_test_last"),
+    ({"max_mb_to_test": -0.5}, "max_mb_to_test"),
+    ({"max_memory_mb": -1}, "max_memory_mb"),
+])
+def test_bad_inputs_are_input_errors(small_zip, run_task, params, message):
+    # Not reported as "Cannot open ZIP archive", which would mark a valid archive invalid
+    with pytest.raises(ValueError, match=message):
+        _validate(run_task, small_zip, **params)
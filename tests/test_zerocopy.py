@@ -0,0 +1,54 @@
+import errno
+import os
+import zipfile
+
+import pyzipper
+import pytest
+
+from zip_utils import zerocopy
+from zip_utils.progress import extract_member, write_file
+
+
+def _unsupported(src_fd, dst_fd, offset, count):
+    raise OSError(errno.EXDEV, "cross-device copy")
+
+
+@pytest.fixture(params=["kernel", "unsupported"])
+def copy_methods(request, monkeypatch):
+    """Run each test with the platform's copy primitives, then with none that work"""
+    if request.param == "unsupported":
+        monkeypatch.setattr(zerocopy, "_copy_methods", lambda: [_unsupported])
+
+
+def test_copy_range_never_copies_through_user_space(tmp_path, monkeypatch):
+    monkeypatch.setattr(zerocopy, "_copy_methods", lambda: [_unsupported])
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"data" * 1000)
+    with open(source, "rb") as src, open(tmp_path / "target.bin", "wb") as dst:
+        assert zerocopy.copy_range(src.fileno(), 0, 4000, dst.fileno()) is None
+    assert (tmp_path / "target.bin").read_bytes() == b""
+
+
+def test_extract_stored(tmp_path, copy_methods):
+    data = os.urandom(300_000)
+    zip_path = str(tmp_path / "stored.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("a.bin", data)
+
+    with pyzipper.AESZipFile(zip_path) as archive:
+        assert extract_member(archive, archive.getinfo("a.bin"), str(tmp_path / "a.bin")) == len(data)
+    assert (tmp_path / "a.bin").read_bytes() == data
+
+
+def test_write_stored(tmp_path, copy_methods):
+    source = tmp_path / "source.bin"
+    source.write_bytes(os.urandom(300_000))
+    zip_path = str(tmp_path / "out.zip")
+    with pyzipper.AESZipFile(zip_path, "w", compression=pyzipper.ZIP_STORED) as archive:
+        write_file(archive, str(source), "first.bin")
+        write_file(archive, str(source), "second.bin")
+
+    with zipfile.ZipFile(zip_path) as archive:
+        assert archive.testzip() is None
+        assert [info.filename for info in archive.infolist()] == ["first.bin", "second.bin"]
+        assert archive.read("second.bin") == source.read_bytes()
@@ -0,0 +1,33 @@
+import struct
+
+import pyzipper
+from pyzipper import zipfile as _zipfile
+
+from zip_utils.compression import ZIP_ZSTANDARD, ZSTD_VERSION, ZstdCompressor, limit_zstd_threads, register_zstd
+
+
+def test_zstd_entries_need_version_63(tmp_path):
+    register_zstd()
+    zip_path = str(tmp_path / "data.zip")
+    data = b"zstd " * 10000
+    with pyzipper.AESZipFile(zip_path, "w", compression=ZIP_ZSTANDARD) as archive:
+        archive.writestr("a.txt", data)
+        archive.writestr("b.txt", b"stored", compress_type=pyzipper.ZIP_STORED)
+
+    with pyzipper.AESZipFile(zip_path) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+        assert archive.read("a.txt") == data
+        with open(zip_path, "rb") as f:
+            f.seek(infos["a.txt"].header_offset)
+            local_version = struct.unpack(_zipfile.structFileHeader, f.read(_zipfile.sizeFileHeader))[1]
+    assert infos["a.txt"].extract_version == local_version == ZSTD_VERSION
+    assert infos["b.txt"].extract_version == _zipfile.DEFAULT_VERSION
+
+
+def test_zstd_threads_capped_per_thread():
+    with limit_zstd_threads(2):
+        assert ZstdCompressor()._threads == 2
+        with limit_zstd_threads(0):
+            assert ZstdCompressor()._threads == 1
+        assert ZstdCompressor(threads=3)._threads == 3
+    assert ZstdCompressor()._threads >= 1
@@ -0,0 +1,5 @@
+"""Shared helpers for the ZIP task blocks.
+
+The package root is on ``sys.path`` when the OOMOL executor loads a task, so
+tasks import from here directly, e.g. ``from zip_utils.progress import ...``.
+"""
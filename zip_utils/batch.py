@@ -0,0 +1,145 @@
+"""Build one archive per folder, in-process or on a process pool."""
+import os
+import typing
+
+import pyzipper
+
+from .compression import limit_zstd_threads, register_zstd, zstd_threads
+from .crypto import register_crypto_backend
+from .progress import OperationCancelled, remove_partial, write_file
+from .scanner import scan_source, tree_fingerprint
+
+# Archives are written under this suffix and renamed into place once complete
+PARTIAL_SUFFIX = '.part'
+
+# State handed to each pool worker by _init_worker
+_worker_state = {}
+
+
+class FolderResult(typing.NamedTuple):
+    """What compressing one folder produced"""
+    original_size: int
+    compressed_size: int
+    # tree_fingerprint of the files archived
+    fingerprint: str
+
+
+def compress_folder(folder_path, zip_path, compression_type, compression_level, password,
+                    include_subdirectories, include=None, exclude=None, stat_workers=0,
+                    reporter=None, io_limit=None):
+    """
+    Write ``folder_path`` to a new archive at ``zip_path``, with the folder name as the archive root.
+
+    Returns a ``FolderResult``. The archive is written as
+    ``<zip_path>.part`` and only renamed to ``zip_path`` once complete, so
+    ``zip_path`` never holds a truncated archive; the partial file is
+    removed if anything fails, including cancellation.
+    """
+    entries = scan_source(folder_path, include_subdirectories, include, exclude, stat_workers)
+    original_size = sum(entry.size for entry in entries)
+    if reporter is not None:
+        reporter.add_total(original_size, len(entries))
+
+    partial_path = zip_path + PARTIAL_SUFFIX
+    encryption = {'encryption': pyzipper.WZ_AES} if password else {}
+    try:
+        with pyzipper.AESZipFile(partial_path, 'w', compression=compression_type,
+                                 compresslevel=compression_level, **encryption) as zip_file:
+            if password:
+                zip_file.setpassword(password.encode('utf-8'))
+            for entry in entries:
+                write_file(zip_file, entry.path, entry.arcname, reporter, io_limit=io_limit, file_stat=entry.stat)
+        os.replace(partial_path, zip_path)
+    except Exception:
+        remove_partial(partial_path)
+        raise
+
+    return FolderResult(original_size, os.path.getsize(zip_path), tree_fingerprint(entries))
+
+
+class _SharedProgress:
+    """Reporter stand-in for pool workers: publishes byte counts to the parent and honours cancellation"""
+
+    def __init__(self, cancel_event, bytes_done, bytes_total):
+        self._cancel_event = cancel_event
+        self._bytes_done = bytes_done
+        self._bytes_total = bytes_total
+
+    def add_total(self, nbytes=0, entries=0):
+        with self._bytes_total.get_lock():
+            self._bytes_total.value += nbytes
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise OperationCancelled("Batch compressing cancelled")
+
+    def advance(self, nbytes=0, entries=0):
+        if nbytes:
+            with self._bytes_done.get_lock():
+                self._bytes_done.value += nbytes
+        self.check_cancelled()
+
+
+def _init_worker(cancel_event, bytes_done, bytes_total, io_limit, zstd_thread_count):
+    """Helper function run once in every pool process"""
+    register_zstd()
+    register_crypto_backend()
+    _worker_state['progress'] = _SharedProgress(cancel_event, bytes_done, bytes_total)
+    _worker_state['io_limit'] = io_limit
+    _worker_state['zstd_threads'] = zstd_thread_count
+
+
+def _compress_folder_in_worker(*args):
+    """Helper function: compress_folder with the worker's shared progress, I/O limit and zstd thread share"""
+    with limit_zstd_threads(_worker_state['zstd_threads']):
+        return compress_folder(*args, reporter=_worker_state['progress'], io_limit=_worker_state['io_limit'])
+
+
+def compress_folders_parallel(jobs, reporter, max_workers, max_io_concurrency=0, on_result=None):
+    """
+    Run ``compress_folder(*job)`` for every job on a process pool.
+
+    Returns one item per job, in input order: the ``FolderResult``, or the
+    exception that job raised. ``on_result(index, result)`` is called in
+    this process as each job finishes, in completion order. At most
+    ``max_io_concurrency`` source reads run at once across all workers
+    (0 = unlimited). Each worker's zstd compressors share the CPUs evenly.
+    Progress is reported by bytes through ``reporter``; cancelling it stops
+    every worker at its next chunk.
+    """
+    # Imported here so serial batches and other tasks don't pay for loading multiprocessing
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    mp_context = multiprocessing.get_context()
+    cancel_event = mp_context.Event()
+    bytes_done = mp_context.Value('q', 0)
+    bytes_total = mp_context.Value('q', 0)
+    io_limit = mp_context.BoundedSemaphore(max_io_concurrency) if max_io_concurrency > 0 else None
+
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=_init_worker,
+                             initargs=(cancel_event, bytes_done, bytes_total, io_limit,
+                                       zstd_threads(max_workers))) as executor:
+        futures = {executor.submit(_compress_folder_in_worker, *job): index for index, job in enumerate(jobs)}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=reporter.interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        results[futures[future]] = future.result()
+                    except Exception as e:
+                        results[futures[future]] = e
+                    if on_result is not None:
+                        on_result(futures[future], results[futures[future]])
+                reporter.total_bytes = bytes_total.value
+                reporter.advance(bytes_done.value - reporter.bytes_done, entries=len(done))
+        except BaseException:
+            # Stop running workers at their next chunk and drop queued folders
+            cancel_event.set()
+            for future in pending:
+                future.cancel()
+            raise
+
+    return results
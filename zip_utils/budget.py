@@ -0,0 +1,85 @@
+"""Sizing chunk buffers, queues and worker pools to a memory budget."""
+import typing
+
+from . import cgroups
+from .pipeline import PARALLEL_MAX_FILE_SIZE, QUEUE_DEPTH_PER_WORKER
+from .progress import CHUNK_SIZE
+
+# Smallest a budget can shrink a copy chunk or an entry held in memory to
+MIN_CHUNK_SIZE = 64 * 1024
+MIN_PARALLEL_FILE_SIZE = 256 * 1024
+
+# Share of a cgroup memory limit used as the budget; the interpreter and libraries need the rest
+CGROUP_MEMORY_SHARE = 0.5
+
+# What one more batch-compress process costs before it reads any data
+PROCESS_MEMORY = 48 * 1024 * 1024
+
+
+class ResourcePlan(typing.NamedTuple):
+    """How large a task's buffers, queues and pools may get"""
+    chunk_size: int
+    workers: int
+    queue_depth_per_worker: int
+    # Entries at least this large are streamed by the writer instead of prepared in memory
+    parallel_max_file_size: int
+    # The budget in bytes these were sized for, 0 when unbounded
+    memory_bytes: int
+
+
+# What every task used before budgets existed
+DEFAULT_RESOURCES = ResourcePlan(CHUNK_SIZE, 0, QUEUE_DEPTH_PER_WORKER, PARALLEL_MAX_FILE_SIZE, 0)
+
+
+def memory_budget(max_memory_mb=0):
+    """``max_memory_mb`` in bytes, capped by a share of the cgroup memory limit (0 = unbounded)"""
+    budget = int(max_memory_mb * 1024 * 1024) if max_memory_mb else 0
+    limit = cgroups.memory_limit()
+    if limit is not None:
+        share = int(limit * CGROUP_MEMORY_SHARE)
+        budget = min(budget, share) if budget else share
+    return budget
+
+
+def plan_resources(max_memory_mb=0, max_workers=0):
+    """
+    Size a task's chunks, queues and workers to stay under ``max_memory_mb``.
+
+    ``max_memory_mb`` 0 leaves only the container's memory limit, if any.
+    ``max_workers`` 0 means one worker per CPU the cgroup allows. Under a
+    budget, copies use chunks of a sixteenth of it (between
+    ``MIN_CHUNK_SIZE`` and ``CHUNK_SIZE``) and the rest pays for the
+    entries workers hold in memory, each counted twice (data and
+    compressed payload). Those entries shrink first, down to
+    ``MIN_PARALLEL_FILE_SIZE``, then the queue to one entry per worker,
+    then the worker count.
+    """
+    workers = max_workers or cgroups.available_cpus()
+    budget = memory_budget(max_memory_mb)
+    if not budget:
+        return DEFAULT_RESOURCES._replace(workers=workers)
+
+    chunk_size = min(CHUNK_SIZE, max(MIN_CHUNK_SIZE, budget // 16))
+    # The writer's chunk, the compressor's output and read-ahead come off the top
+    in_flight = max(budget - 4 * chunk_size, 0)
+    depth = QUEUE_DEPTH_PER_WORKER
+    if in_flight // (workers * depth * 2) < MIN_PARALLEL_FILE_SIZE:
+        depth = 1
+    if in_flight // (workers * depth * 2) < MIN_PARALLEL_FILE_SIZE:
+        workers = max(1, in_flight // (depth * 2 * MIN_PARALLEL_FILE_SIZE))
+    parallel_max_file_size = max(MIN_PARALLEL_FILE_SIZE,
+                                 min(PARALLEL_MAX_FILE_SIZE, in_flight // (workers * depth * 2)))
+    return ResourcePlan(chunk_size, workers, depth, parallel_max_file_size, budget)
+
+
+def process_workers(max_memory_mb=0, max_workers=0):
+    """Worker processes for batch compression: ``plan_resources`` workers, capped by ``PROCESS_MEMORY`` each"""
+    plan = plan_resources(max_memory_mb, max_workers)
+    if not plan.memory_bytes:
+        return plan.workers
+    return max(1, min(plan.workers, plan.memory_bytes // PROCESS_MEMORY))
+
+
+def resources_from_params(params):
+    """``plan_resources`` for a task's ``max_memory_mb`` and (where it has one) ``max_workers`` inputs"""
+    return plan_resources(params.get("max_memory_mb") or 0, params.get("max_workers") or 0)
@@ -0,0 +1,64 @@
+"""The CPU and memory limits a container (cgroup v2 or v1) puts on this process."""
+import math
+import os
+
+_CGROUP_ROOT = '/sys/fs/cgroup'
+
+# cgroup v1 reports "no limit" as a huge page-aligned number instead of "max"
+_UNLIMITED = 1 << 60
+
+
+def _read_values(path):
+    """Helper function returning the whitespace-separated fields of a cgroup file, or None"""
+    try:
+        with open(path) as f:
+            return f.read().split()
+    except (OSError, ValueError):
+        return None
+
+
+def memory_limit(root=_CGROUP_ROOT):
+    """This process's cgroup memory limit in bytes, or None when unlimited"""
+    for path in (os.path.join(root, 'memory.max'), os.path.join(root, 'memory', 'memory.limit_in_bytes')):
+        values = _read_values(path)
+        if not values:
+            continue
+        try:
+            limit = int(values[0])
+        except ValueError:
+            # "max"
+            return None
+        return limit if 0 < limit < _UNLIMITED else None
+    return None
+
+
+def cpu_limit(root=_CGROUP_ROOT):
+    """This process's cgroup CPU quota as a number of CPUs (may be fractional), or None when unlimited"""
+    values = _read_values(os.path.join(root, 'cpu.max'))
+    if not values:
+        quota = _read_values(os.path.join(root, 'cpu', 'cpu.cfs_quota_us'))
+        period = _read_values(os.path.join(root, 'cpu', 'cpu.cfs_period_us'))
+        if not quota or not period:
+            return None
+        values = quota + period
+    try:
+        quota, period = int(values[0]), int(values[1])
+    except (ValueError, IndexError):
+        # "max", or v1's -1
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return quota / period
+
+
+def available_cpus():
+    """CPUs this process can actually use: its affinity mask, capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # Not available on this platform
+        cpus = os.cpu_count() or 1
+    quota = cpu_limit()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(cpus, 1)
@@ -0,0 +1,150 @@
+"""Compression method lookup and Zstandard (ZIP method 93) support for pyzipper."""
+import contextlib
+import threading
+
+import pyzipper
+from pyzipper import zipfile as _zipfile
+
+from .cgroups import available_cpus
+
+try:
+    import zstandard
+except ImportError:  # zstd entries are reported as unsupported instead
+    zstandard = None
+
+ZIP_ZSTANDARD = 93
+
+# "Version needed to extract" for zstd entries, as APPNOTE 4.4.3.2 gives for LZMA and later methods
+ZSTD_VERSION = 63
+
+# Entries at least this large are compressed with zstd worker threads
+ZSTD_MULTITHREAD_THRESHOLD = 8 * 1024 * 1024
+
+# Maps the task-level method names to ZIP compression constants
+COMPRESSION_METHODS = {
+    "DEFLATED": pyzipper.ZIP_DEFLATED,
+    "STORED": pyzipper.ZIP_STORED,
+    "BZIP2": pyzipper.ZIP_BZIP2,
+    "LZMA": pyzipper.ZIP_LZMA,
+    "ZSTD": ZIP_ZSTANDARD,
+}
+
+_registered = False
+
+# Per-thread cap set by limit_zstd_threads
+_thread_limit = threading.local()
+
+
+def compression_from_name(name, default=pyzipper.ZIP_DEFLATED):
+    """Map a method name such as "DEFLATED" or "ZSTD" to its ZIP constant"""
+    return COMPRESSION_METHODS.get(name, default)
+
+
+def zstd_threads(workers=1):
+    """zstd worker threads for one large entry when ``workers`` entries are compressed side by side"""
+    return max(1, available_cpus() // workers)
+
+
+@contextlib.contextmanager
+def limit_zstd_threads(threads):
+    """
+    Cap the zstd worker threads of compressors created on this thread.
+
+    pyzipper builds compressors itself, from the method and level only, so
+    pools set this around each worker's work instead of passing a count.
+    """
+    previous = getattr(_thread_limit, 'threads', None)
+    _thread_limit.threads = max(1, threads)
+    try:
+        yield
+    finally:
+        _thread_limit.threads = previous
+
+
+class ZstdCompressor:
+    """
+    Streaming zstd compressor with the ``compress``/``flush`` interface pyzipper expects.
+
+    The first ``ZSTD_MULTITHREAD_THRESHOLD`` bytes are buffered: entries that
+    end before that are compressed in one single-threaded call, larger ones
+    switch to a multi-threaded compressor, so small files don't pay for
+    spinning up worker threads. ``threads`` defaults to the cap set with
+    ``limit_zstd_threads`` on the creating thread, else every CPU.
+    """
+
+    def __init__(self, level=None, threads=None):
+        # ZIP tasks use 0-9 levels; zstd treats 0 as its default level (3)
+        self._level = level if level is not None else 0
+        self._threads = threads or getattr(_thread_limit, 'threads', None) or zstd_threads()
+        self._pending = bytearray()
+        self._compressobj = None
+
+    def compress(self, data):
+        if self._compressobj is None:
+            self._pending += data
+            if len(self._pending) < ZSTD_MULTITHREAD_THRESHOLD:
+                return b''
+            compressor = zstandard.ZstdCompressor(level=self._level, threads=self._threads)
+            self._compressobj = compressor.compressobj()
+            data = bytes(self._pending)
+            self._pending = bytearray()
+        return self._compressobj.compress(data)
+
+    def flush(self):
+        if self._compressobj is None:
+            return zstandard.ZstdCompressor(level=self._level).compress(bytes(self._pending))
+        return self._compressobj.flush()
+
+
+def register_zstd():
+    """
+    Teach pyzipper to read and write ZIP method 93 (Zstandard).
+
+    Safe to call from every task; only the first call patches pyzipper.
+    Without the ``zstandard`` module installed, reading zstd entries fails
+    with pyzipper's usual "compression type 93 (zstd)" error and writing
+    them raises RuntimeError.
+    """
+    global _registered
+    if _registered:
+        return
+    _registered = True
+
+    _zipfile.compressor_names[ZIP_ZSTANDARD] = 'zstd'
+    check_compression = _zipfile._check_compression
+
+    def _check_compression(compression):
+        if compression == ZIP_ZSTANDARD:
+            if zstandard is None:
+                raise RuntimeError("Compression requires the (missing) zstandard module")
+            return
+        check_compression(compression)
+
+    _zipfile._check_compression = _check_compression
+    if zstandard is None:
+        return
+
+    get_compressor = _zipfile._get_compressor
+    file_header = _zipfile.ZipInfo.FileHeader
+    get_decompressor = _zipfile.ZipExtFile.get_decompressor
+
+    def _get_compressor(compress_type, compresslevel=None):
+        if compress_type == ZIP_ZSTANDARD:
+            return ZstdCompressor(compresslevel)
+        return get_compressor(compress_type, compresslevel)
+
+    def _get_decompressor(self, compress_type):
+        if compress_type == ZIP_ZSTANDARD:
+            return zstandard.ZstdDecompressor().decompressobj()
+        return get_decompressor(self, compress_type)
+
+    def _file_header(self, zip64=None):
+        # pyzipper only raises the version needed to extract for BZIP2 and LZMA;
+        # the central directory record reuses the value set here
+        if self.compress_type == ZIP_ZSTANDARD:
+            self.extract_version = max(self.extract_version, ZSTD_VERSION)
+        return file_header(self, zip64)
+
+    _zipfile._get_compressor = _get_compressor
+    _zipfile.ZipInfo.FileHeader = _file_header
+    _zipfile.ZipExtFile.get_decompressor = _get_decompressor
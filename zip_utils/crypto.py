@@ -0,0 +1,166 @@
+"""Pluggable crypto backend for WinZip AES (AE-1/AE-2) entries."""
+import hashlib
+import hmac
+import os
+
+from Cryptodome.Cipher import AES
+from Cryptodome.Util import Counter
+from pyzipper import zipfile as _zipfile
+from pyzipper import zipfile_aes
+
+from .zerocopy import local_data_offset
+
+try:
+    import _hashlib  # noqa: F401 - present when hashlib/hmac are backed by OpenSSL
+except ImportError:  # pyzipper's pure pycryptodome path is used instead
+    _hashlib = None
+
+_PYCRYPTODOME_ENCRYPTER = zipfile_aes.AESZipEncrypter
+_PYCRYPTODOME_DECRYPTER = zipfile_aes.AESZipDecrypter
+
+_KEY_LENGTHS = {1: 16, 2: 24, 3: 32}
+_SALT_LENGTHS = {1: 8, 2: 12, 3: 16}
+
+_active_backend = None
+
+
+def available_backends():
+    """Names of the usable backends, fastest first"""
+    if _hashlib is None:
+        return ["pycryptodome"]
+    return ["openssl", "pycryptodome"]
+
+
+def active_backend():
+    """Name of the backend pyzipper currently uses"""
+    return _active_backend or "pycryptodome"
+
+
+def _derive_keys(pwd, salt, key_length):
+    """Helper function for the WinZip AES key derivation (PBKDF2-HMAC-SHA1, 1000 rounds)"""
+    keymaterial = hashlib.pbkdf2_hmac('sha1', pwd, salt, 1000, 2 * key_length + 2)
+    return keymaterial[:key_length], keymaterial[key_length:2 * key_length], keymaterial[2 * key_length:]
+
+
+def _winzip_ctr(key):
+    """
+    Helper function for AES-CTR with the WinZip counter (128-bit little-endian, starting at 1).
+
+    OpenSSL's CTR mode only increments big-endian counters, so the cipher
+    stays on pycryptodome's AES-NI code, which supports this counter natively.
+    """
+    return AES.new(key, AES.MODE_CTR, counter=Counter.new(nbits=128, little_endian=True))
+
+
+class OpenSSLAESZipEncrypter(_PYCRYPTODOME_ENCRYPTER):
+    """AESZipEncrypter with OpenSSL HMAC-SHA1 and PBKDF2 (through hashlib)"""
+
+    def __init__(self, pwd, nbits=256, force_wz_aes_version=None):
+        if not pwd:
+            raise RuntimeError('%s encryption requires a password.' % zipfile_aes.WZ_AES)
+        if nbits not in (128, 192, 256):
+            raise RuntimeError("`nbits` must be one of 128, 192, 256. Got '%s'" % nbits)
+
+        self.force_wz_aes_version = force_wz_aes_version
+        self.aes_strength = {128: 1, 192: 2, 256: 3}[nbits]
+        self.salt_length = _SALT_LENGTHS[self.aes_strength]
+        self.salt = os.urandom(self.salt_length)
+
+        enckey, mackey, self.encpwdverify = _derive_keys(pwd, self.salt, _KEY_LENGTHS[self.aes_strength])
+        self.encrypter = _winzip_ctr(enckey)
+        self.hmac = hmac.new(mackey, digestmod=hashlib.sha1)
+
+
+class OpenSSLAESZipDecrypter(_PYCRYPTODOME_DECRYPTER):
+    """AESZipDecrypter with OpenSSL HMAC-SHA1 and PBKDF2 (through hashlib)"""
+
+    def __init__(self, zinfo, pwd, encryption_header):
+        self.filename = zinfo.filename
+        salt_length = _SALT_LENGTHS[zinfo.wz_aes_strength]
+        salt = encryption_header[:salt_length]
+        enckey, mackey, pwd_verify = _derive_keys(pwd, salt, _KEY_LENGTHS[zinfo.wz_aes_strength])
+        if pwd_verify != encryption_header[salt_length:]:
+            raise RuntimeError("Bad password for file %r" % zinfo.filename)
+
+        # pyzipper's attribute name, kept so callers can use either backend
+        self.decypter = _winzip_ctr(enckey)
+        self.hmac = hmac.new(mackey, digestmod=hashlib.sha1)
+
+
+def register_crypto_backend(name=None):
+    """
+    Point pyzipper's WinZip AES encrypter/decrypter at the chosen backend.
+
+    Without ``name`` the fastest available backend is used: OpenSSL when
+    Python's hashlib is built on it (the usual case), pyzipper's own
+    pycryptodome implementation otherwise. HMAC-SHA1 is the bottleneck of
+    the pycryptodome path; both backends produce identical archives.
+    """
+    global _active_backend
+    if name is None:
+        if _active_backend is not None:
+            return
+        name = available_backends()[0]
+    if name not in available_backends():
+        raise ValueError(f"Crypto backend not available: {name}")
+
+    if name == "openssl":
+        zipfile_aes.AESZipEncrypter = OpenSSLAESZipEncrypter
+        zipfile_aes.AESZipDecrypter = OpenSSLAESZipDecrypter
+    else:
+        zipfile_aes.AESZipEncrypter = _PYCRYPTODOME_ENCRYPTER
+        zipfile_aes.AESZipDecrypter = _PYCRYPTODOME_DECRYPTER
+    _active_backend = name
+
+
+# Encrypted entries checked when verifying a password; every extra entry has its own
+# salt (AES) or check byte (ZipCrypto), making a false match far less likely
+VERIFY_ENTRIES = 3
+
+
+def read_encryption_header(zip_file, zinfo):
+    """Read the bytes between an entry's local header and its encrypted data"""
+    if getattr(zinfo, 'wz_aes_version', None) is not None:
+        length = _SALT_LENGTHS[zinfo.wz_aes_strength] + 2
+    else:
+        length = 12
+    offset = local_data_offset(zip_file, zinfo)
+    with zip_file._lock:
+        zip_file.fp.seek(offset)
+        header = zip_file.fp.read(length)
+    if len(header) != length:
+        raise _zipfile.BadZipFile(f"Truncated encryption header for {zinfo.filename!r}")
+    return header
+
+
+def _password_matches(zinfo, header, pwd):
+    """Helper function to test one password against an entry's encryption header, without decrypting data"""
+    if getattr(zinfo, 'wz_aes_version', None) is not None:
+        # The last two header bytes are the PBKDF2 password verification value
+        salt_length = _SALT_LENGTHS[zinfo.wz_aes_strength]
+        verifier = _derive_keys(pwd, header[:salt_length], _KEY_LENGTHS[zinfo.wz_aes_strength])[2]
+        return verifier == header[salt_length:]
+    try:
+        # Decrypts only the 12-byte header and compares its check byte
+        _zipfile.CRCZipDecrypter(zinfo, pwd, header)
+    except RuntimeError:
+        return False
+    return True
+
+
+def find_password(zip_file, candidates):
+    """
+    Return the first of ``candidates`` (bytes) that unlocks the archive, or None.
+
+    Only encryption headers are used: the WinZip AES 2-byte verifier (one
+    PBKDF2 per candidate and entry) or the ZipCrypto check byte. Up to
+    ``VERIFY_ENTRIES`` encrypted entries must all agree, so a wrong password
+    slipping past the 1/65536 (AES) or 1/256 (ZipCrypto) chance is unlikely.
+    An archive without encrypted entries accepts the first candidate.
+    """
+    encrypted = [info for info in zip_file.infolist() if info.flag_bits & _zipfile._MASK_ENCRYPTED]
+    samples = [(info, read_encryption_header(zip_file, info)) for info in encrypted[:VERIFY_ENTRIES]]
+    for pwd in candidates:
+        if all(_password_matches(info, header, pwd) for info, header in samples):
+            return pwd
+    return None
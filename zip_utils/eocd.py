@@ -0,0 +1,74 @@
+"""Archive facts read from the end-of-central-directory records alone, in constant time."""
+import struct
+import typing
+
+from pyzipper import zipfile as _zipfile
+
+# WinZip AES entries use this compression method, with the real one in an extra field
+WZ_AES_METHOD = 99
+
+
+class ArchiveTail(typing.NamedTuple):
+    """What the EOCD (and Zip64 EOCD) records say about an archive"""
+    total_entries: int
+    central_directory_size: int
+    central_directory_offset: int
+    comment: bytes
+    zip64: bool
+    # Bytes in front of the archive proper (self-extractor stubs, prepended data)
+    prefix_size: int
+    # Flags and method of the first central directory record; None for an empty archive
+    first_flag_bits: typing.Optional[int]
+    first_compress_type: typing.Optional[int]
+
+
+def read_tail(fp):
+    """
+    Read the end-of-central-directory records of the archive open as ``fp``.
+
+    Only the file tail is read (at most 64 KiB plus the record sizes, for
+    the comment search) and the first central directory record, so the cost
+    doesn't depend on the entry count. Raises ``BadZipFile`` when there is
+    no EOCD record.
+    """
+    fp.seek(0, 2)
+    file_size = fp.tell()
+    endrec = _zipfile._EndRecData(fp)
+    if endrec is None:
+        raise _zipfile.BadZipFile("File is not a zip file")
+
+    zip64 = endrec[_zipfile._ECD_SIGNATURE] == _zipfile.stringEndArchive64
+    size_cd = endrec[_zipfile._ECD_SIZE]
+    offset_cd = endrec[_zipfile._ECD_OFFSET]
+    # Same arithmetic as ZipFile: where the central directory really starts
+    prefix_size = endrec[_zipfile._ECD_LOCATION] - size_cd - offset_cd
+    if zip64:
+        prefix_size -= _zipfile.sizeEndCentDir64 + _zipfile.sizeEndCentDir64Locator
+    if prefix_size < 0 or offset_cd + prefix_size + size_cd > file_size:
+        raise _zipfile.BadZipFile("Central directory lies outside the file")
+
+    first_flag_bits = first_compress_type = None
+    if endrec[_zipfile._ECD_ENTRIES_TOTAL] and size_cd >= _zipfile.sizeCentralDir:
+        fp.seek(offset_cd + prefix_size)
+        record = fp.read(_zipfile.sizeCentralDir)
+        if len(record) == _zipfile.sizeCentralDir and record[:4] == _zipfile.stringCentralDir:
+            fields = struct.unpack(_zipfile.structCentralDir, record)
+            first_flag_bits = fields[_zipfile._CD_FLAG_BITS]
+            first_compress_type = fields[_zipfile._CD_COMPRESS_TYPE]
+
+    return ArchiveTail(
+        total_entries=endrec[_zipfile._ECD_ENTRIES_TOTAL],
+        central_directory_size=size_cd,
+        central_directory_offset=offset_cd,
+        comment=endrec[_zipfile._ECD_COMMENT],
+        zip64=zip64,
+        prefix_size=prefix_size,
+        first_flag_bits=first_flag_bits,
+        first_compress_type=first_compress_type,
+    )
+
+
+def read_tail_of(path):
+    """``read_tail`` for an archive on disk"""
+    with open(path, 'rb') as fp:
+        return read_tail(fp)
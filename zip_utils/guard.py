@@ -0,0 +1,108 @@
+"""Limits on what extracting an untrusted archive may produce, enforced while it decompresses."""
+from .progress import OperationCancelled
+
+# Highly compressible small entries are normal; the ratio only counts past this many output bytes
+RATIO_GRACE_BYTES = 1024 * 1024
+
+
+class ExtractionLimitExceeded(OperationCancelled):
+    """
+    Raised when an archive would produce more than the extraction limits allow.
+
+    A kind of ``OperationCancelled``: the run stops at once, and the tasks
+    remove what it has extracted so far, as they do on cancellation.
+    """
+
+
+class _GuardedReader:
+    """Helper class: a member stream that reports every chunk it produces to the guard"""
+
+    def __init__(self, guard, source, zinfo):
+        self._guard = guard
+        self._source = source
+        self._zinfo = zinfo
+        self.produced = 0
+
+    def read(self, n=-1):
+        data = self._source.read(n)
+        if data:
+            self.produced += len(data)
+            self._guard.account(self._zinfo, self.produced, len(data))
+        return data
+
+
+class ExtractionGuard:
+    """
+    Caps on total output, entry size, compression ratio and entry count (0 = no limit).
+
+    Declared sizes are checked before an entry is opened, which stops
+    honest-looking bombs without decompressing anything; the bytes
+    actually produced are checked chunk by chunk while it inflates, which
+    stops archives whose headers lie (or have no sizes, as with streamed
+    entries) after at most one chunk over the limit.
+    """
+
+    def __init__(self, max_total_bytes=0, max_entry_bytes=0, max_ratio=0, max_entries=0):
+        self.max_total_bytes = max_total_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.max_ratio = max_ratio
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self.entries = 0
+
+    @property
+    def active(self):
+        """True when any limit is set"""
+        return any((self.max_total_bytes, self.max_entry_bytes, self.max_ratio, self.max_entries))
+
+    def check_plan(self, infos):
+        """Reject an extraction up front when its entry count or declared total is already over the limits"""
+        if self.max_entries and len(infos) > self.max_entries:
+            raise ExtractionLimitExceeded(
+                f"Archive has {len(infos)} entries to extract, more than the limit of {self.max_entries}")
+        declared = sum(zinfo.file_size for zinfo in infos)
+        if self.max_total_bytes and declared > self.max_total_bytes:
+            raise ExtractionLimitExceeded(
+                f"Archive declares {declared} bytes, more than the limit of {self.max_total_bytes}")
+
+    def start_entry(self, zinfo):
+        """Count an entry about to be extracted and check its declared size and ratio"""
+        self.entries += 1
+        if self.max_entries and self.entries > self.max_entries:
+            raise ExtractionLimitExceeded(f"More than {self.max_entries} entries extracted")
+        self._check(zinfo, zinfo.file_size, self.total_bytes + zinfo.file_size)
+
+    def wrap(self, source, zinfo):
+        """Return ``source`` (an open member) with every read checked against the limits"""
+        if not self.active:
+            return source
+        return _GuardedReader(self, source, zinfo)
+
+    def account(self, zinfo, entry_bytes, nbytes):
+        """Add ``nbytes`` just produced for ``zinfo`` (``entry_bytes`` so far) and check the limits"""
+        self.total_bytes += nbytes
+        self._check(zinfo, entry_bytes, self.total_bytes)
+
+    def _check(self, zinfo, entry_bytes, total_bytes):
+        name = zinfo.filename
+        if self.max_entry_bytes and entry_bytes > self.max_entry_bytes:
+            raise ExtractionLimitExceeded(f"{name!r} exceeds the entry size limit of {self.max_entry_bytes} bytes")
+        if self.max_total_bytes and total_bytes > self.max_total_bytes:
+            raise ExtractionLimitExceeded(f"Extracting {name!r} exceeds the total limit of {self.max_total_bytes} bytes")
+        # Streamed entries may not know their compressed size before the data descriptor;
+        # what has been read of it so far is a lower bound, which only makes the ratio stricter
+        compressed = zinfo.compress_size or getattr(zinfo, 'raw_read', 0)
+        if (self.max_ratio and entry_bytes > RATIO_GRACE_BYTES
+                and entry_bytes > self.max_ratio * max(compressed, 1)):
+            raise ExtractionLimitExceeded(f"{name!r} expands more than {self.max_ratio}x")
+
+
+def guard_from_params(params):
+    """Build the guard from the extract tasks' shared limit inputs (sizes in MB)"""
+    megabyte = 1024 * 1024
+    return ExtractionGuard(
+        max_total_bytes=int((params.get("max_total_size_mb") or 0) * megabyte),
+        max_entry_bytes=int((params.get("max_entry_size_mb") or 0) * megabyte),
+        max_ratio=params.get("max_compression_ratio") or 0,
+        max_entries=params.get("max_entries") or 0,
+    )
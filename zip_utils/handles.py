@@ -0,0 +1,131 @@
+"""Process-wide pool of parsed read-only archives, shared by the tasks of a flow."""
+import collections
+import contextlib
+import os
+import threading
+
+import pyzipper
+
+# Idle archives kept open; each holds one file descriptor
+MAX_POOLED_HANDLES = 8
+
+
+class ArchivePool:
+    """
+    LRU cache of open ``AESZipFile`` readers keyed by (path, size, mtime).
+
+    Opening an archive parses its whole central directory, which dominates
+    short tasks on archives with many entries. Tasks that run one after the
+    other in the same worker process (e.g. list, then validate, then extract)
+    reuse the parsed reader instead. A handle is lent to one caller at a
+    time; a second concurrent caller gets its own, and both are kept when
+    returned, up to ``max_handles`` idle handles (and file descriptors).
+    A changed size or mtime makes the key miss, and stale handles for that
+    path are closed.
+    """
+
+    def __init__(self, max_handles=MAX_POOLED_HANDLES):
+        self.max_handles = max_handles
+        self.hits = 0
+        self.misses = 0
+        self._idle = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        """Helper function to build the pool key for a path on disk"""
+        file_stat = os.stat(path)
+        return os.path.realpath(path), file_stat.st_size, file_stat.st_mtime_ns
+
+    def acquire(self, path):
+        """Return ``(key, zip_file)``: a pooled reader for ``path``, or a newly opened one"""
+        key = self._key(path)
+        stale = []
+        with self._lock:
+            for idle_key in list(self._idle):
+                if idle_key[0] == key[0] and idle_key != key:
+                    stale.extend(self._idle.pop(idle_key))
+            handles = self._idle.get(key)
+            zip_file = handles.pop() if handles else None
+            if handles is not None and not handles:
+                del self._idle[key]
+            if zip_file is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        for handle in stale:
+            handle.close()
+        if zip_file is None:
+            zip_file = pyzipper.AESZipFile(path, 'r')
+        return key, zip_file
+
+    def release(self, key, zip_file):
+        """Give a handle back: keep it for reuse, evicting the least recently used ones"""
+        # Passwords are per caller; the next one sets its own
+        zip_file.pwd = None
+        evicted = []
+        with self._lock:
+            self._idle.setdefault(key, []).append(zip_file)
+            self._idle.move_to_end(key)
+            while sum(len(handles) for handles in self._idle.values()) > self.max_handles:
+                oldest_key = next(iter(self._idle))
+                handles = self._idle[oldest_key]
+                evicted.append(handles.pop(0))
+                if not handles:
+                    del self._idle[oldest_key]
+        for handle in evicted:
+            handle.close()
+
+    def discard(self, path):
+        """Close every idle handle for ``path``, e.g. before the archive is replaced"""
+        real_path = os.path.realpath(path)
+        with self._lock:
+            stale = [key for key in self._idle if key[0] == real_path]
+            handles = [handle for key in stale for handle in self._idle.pop(key)]
+        for handle in handles:
+            handle.close()
+
+    def clear(self):
+        """Close all idle handles"""
+        with self._lock:
+            handles = [handle for key_handles in self._idle.values() for handle in key_handles]
+            self._idle.clear()
+        for handle in handles:
+            handle.close()
+
+
+_pool = ArchivePool()
+
+
+def archive_pool():
+    """The pool shared by all tasks in this process"""
+    return _pool
+
+
+@contextlib.contextmanager
+def open_archive(source):
+    """
+    Open an archive for reading through the shared pool.
+
+    Use instead of ``with pyzipper.AESZipFile(path, 'r')``; the handle goes
+    back to the pool, not closed, when the block exits. File-like sources
+    (remote or streamed archives) are not pooled and are closed as usual.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        with pyzipper.AESZipFile(source, 'r') as zip_file:
+            yield zip_file
+        return
+
+    key, zip_file = _pool.acquire(source)
+    try:
+        yield zip_file
+    except BaseException:
+        # The handle may be mid-read in an unknown state; don't hand it to the next task
+        zip_file.close()
+        raise
+    _pool.release(key, zip_file)
+
+
+def discard_archive(path):
+    """Drop pooled handles for ``path`` before it is overwritten or replaced"""
+    _pool.discard(path)
@@ -0,0 +1,93 @@
+"""Append-only journal that lets an interrupted batch pick up where it stopped."""
+import hashlib
+import json
+import os
+
+# Journals are hidden files in the output directory, one per distinct batch
+JOURNAL_PREFIX = '.zip-batch-'
+JOURNAL_SUFFIX = '.journal'
+
+
+def batch_signature(*values):
+    """Short stable digest of a batch's inputs; runs with the same inputs share a journal"""
+    encoded = json.dumps(values, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class BatchJournal:
+    """
+    Record of the archives a batch planned and finished, kept next to its outputs.
+
+    Each line is one JSON record, appended and synced before the batch moves
+    on, so a crash loses at most the record being written (a torn last line
+    is ignored on load). ``planned`` records pin every job's output name up
+    front; ``done`` records add the sizes and the fingerprint of the source
+    tree the archive was built from. A rerun of the same batch reuses the
+    names and skips jobs whose tree still has the recorded fingerprint.
+    """
+
+    def __init__(self, output_directory, signature, resume=True):
+        self.path = os.path.join(output_directory, f"{JOURNAL_PREFIX}{signature}{JOURNAL_SUFFIX}")
+        # Job key -> output path, and job key -> "done" record
+        self.planned = {}
+        self.done = {}
+        if resume:
+            self._load()
+        else:
+            self.remove()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as journal:
+                lines = journal.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn write from a crash; everything before it is intact
+                continue
+            if record.get('event') == 'planned':
+                self.planned[record['key']] = record['zip_path']
+            elif record.get('event') == 'done':
+                self.done[record['key']] = record
+
+    def _append(self, record):
+        with open(self.path, 'a', encoding='utf-8') as journal:
+            journal.write(json.dumps(record) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def plan(self, key, zip_path):
+        """Pin the output path of job ``key`` (no-op if already recorded)"""
+        if self.planned.get(key) == zip_path:
+            return
+        self.planned[key] = zip_path
+        self._append({'event': 'planned', 'key': key, 'zip_path': zip_path})
+
+    def complete(self, key, zip_path, original_size, compressed_size, fingerprint):
+        """Record that job ``key`` produced ``zip_path`` from a tree with ``fingerprint``"""
+        record = {'event': 'done', 'key': key, 'zip_path': zip_path, 'original_size': original_size,
+                  'compressed_size': compressed_size, 'fingerprint': fingerprint}
+        self.done[key] = record
+        self._append(record)
+
+    def finished(self, key, fingerprint):
+        """The ``done`` record of job ``key`` if its archive is intact and its source unchanged, else None"""
+        record = self.done.get(key)
+        if record is None or record['fingerprint'] != fingerprint:
+            return None
+        try:
+            if os.path.getsize(record['zip_path']) != record['compressed_size']:
+                return None
+        except OSError:
+            return None
+        return record
+
+    def remove(self):
+        """Delete the journal, once the batch has completed"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,307 @@
+"""Pipelined archive merging: workers decode entries ahead of a single in-order writer."""
+import collections
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .compression import limit_zstd_threads, zstd_threads
+from .handles import archive_pool, open_archive
+from .pipeline import (PARALLEL_MAX_FILE_SIZE, QUEUE_DEPTH_PER_WORKER, default_workers, encryption_settings,
+                       prepare_data, write_prepared)
+from .progress import CHUNK_SIZE, OperationCancelled, entry_info, rollback_entries, transcode_member
+
+
+class MergeSource:
+    """One input archive of a merge: its entries and how copying them went"""
+
+    def __init__(self, path, password=None):
+        self.path = path
+        self.password = password
+        # ZipInfo of every file entry, in input order
+        self.entries = []
+        self.duplicates = 0
+        # Duplicates dropped because an identical copy was already written
+        self.identical = 0
+        self.added = 0
+        self.error = None
+
+
+def _renamed(name, taken):
+    """Helper function returning ``name`` with the first free ``_<n>`` suffix"""
+    base_name, extension = os.path.splitext(name)
+    final_name = name
+    counter = 1
+    while final_name in taken:
+        final_name = f"{base_name}_{counter}{extension}"
+        counter += 1
+    return final_name
+
+
+def _fingerprint(info):
+    """
+    Helper function returning an entry's ``(CRC-32, size)`` from the central directory.
+
+    None when the CRC says nothing about the content: WinZip AES (AE-2)
+    entries store 0 there instead of the real CRC.
+    """
+    if info.CRC == 0 and info.file_size > 0:
+        return None
+    return info.CRC, info.file_size
+
+
+class _ContentHashes:
+    """Helper class: SHA-256 of entry contents, read on demand and remembered for the merge"""
+
+    def __init__(self):
+        self._digests = {}
+
+    def digest(self, source, info):
+        key = (source.path, info.filename, info.header_offset)
+        if key not in self._digests:
+            sha256 = hashlib.sha256()
+            with open_archive(source.path) as input_zip:
+                if source.password:
+                    input_zip.setpassword(source.password.encode('utf-8'))
+                with input_zip.open(info) as stream:
+                    for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                        sha256.update(chunk)
+            self._digests[key] = sha256.digest()
+        return self._digests[key]
+
+
+class _OutputNames:
+    """
+    Helper class deciding output names against the entries actually written.
+
+    Entries are resolved in write order, so the outcome is the same as
+    merging one archive after the other, and an input that fails gives up
+    nothing it didn't write: a later entry of that name is treated as the
+    first one.
+    """
+
+    def __init__(self, handle_duplicates, compare_hashes=False):
+        self.handle_duplicates = handle_duplicates
+        self._taken = set()
+        # Original name -> (source, info) of each differing copy written under it
+        self._variants = collections.defaultdict(list)
+        self._hashes = _ContentHashes() if compare_hashes else None
+
+    def skipped(self, source, info):
+        """True for a name already written in ``"skip"`` mode; nothing more needs deciding then"""
+        if self.handle_duplicates != "skip" or info.filename not in self._taken:
+            return False
+        source.duplicates += 1
+        return True
+
+    def resolve(self, source, info):
+        """The name to write ``info`` under, or None to drop it; counts duplicates on ``source``"""
+        final_name = info.filename
+        if final_name not in self._taken:
+            return final_name
+        source.duplicates += 1
+        if self.handle_duplicates == "skip":
+            return None
+        if (self.handle_duplicates == "deduplicate"
+                and any(self._identical(source, info, *variant) for variant in self._variants[info.filename])):
+            source.identical += 1
+            return None
+        if self.handle_duplicates in ("rename", "deduplicate"):
+            final_name = _renamed(final_name, self._taken)
+        return final_name
+
+    def written(self, source, info, final_name):
+        """Record that ``info`` now sits in the output as ``final_name``"""
+        self._taken.add(final_name)
+        self._variants[info.filename].append((source, info))
+
+    def _identical(self, source, info, other_source, other_info):
+        """Helper function telling whether two same-named entries hold the same bytes"""
+        fingerprint, other_fingerprint = _fingerprint(info), _fingerprint(other_info)
+        if info.file_size != other_info.file_size:
+            return False
+        if fingerprint is not None and other_fingerprint is not None and fingerprint != other_fingerprint:
+            return False
+        if self._hashes is None:
+            return fingerprint is not None and fingerprint == other_fingerprint
+        try:
+            return self._hashes.digest(source, info) == self._hashes.digest(other_source, other_info)
+        except Exception:
+            # Unreadable content is kept as a conflict; copying it reports the actual error
+            return False
+
+
+def plan_merge(sources):
+    """
+    List the file entries of every input, from the central directories alone.
+
+    Inputs that can't be opened get their ``error`` set and contribute
+    nothing. What happens to duplicate names is decided while writing, by
+    ``merge_archives``.
+    """
+    for source in sources:
+        try:
+            with open_archive(source.path) as input_zip:
+                source.entries = [info for info in input_zip.infolist() if not info.is_dir()]
+        except Exception as e:
+            source.error = e
+    return sources
+
+
+class _OpenInputs:
+    """Helper class: input archives are opened on first use and closed once their last entry is written"""
+
+    def __init__(self):
+        self._handles = {}
+        self._in_flight = collections.Counter()
+        self._submitting = None
+
+    def acquire(self, source):
+        if source is not self._submitting:
+            previous, self._submitting = self._submitting, source
+            if previous is not None and not self._in_flight[previous]:
+                self._close(previous)
+        if source not in self._handles:
+            key, zip_file = archive_pool().acquire(source.path)
+            if source.password:
+                zip_file.setpassword(source.password.encode('utf-8'))
+            self._handles[source] = (key, zip_file)
+        self._in_flight[source] += 1
+        return self._handles[source][1]
+
+    def handle(self, source):
+        return self._handles[source][1]
+
+    def done(self, source):
+        self._in_flight[source] -= 1
+        if not self._in_flight[source] and source is not self._submitting:
+            self._close(source)
+
+    def _close(self, source):
+        key, zip_file = self._handles.pop(source, (None, None))
+        if zip_file is None:
+            return
+        if source.error is None:
+            archive_pool().release(key, zip_file)
+        else:
+            zip_file.close()
+
+    def close_all(self):
+        self._submitting = None
+        for source in list(self._handles):
+            self._close(source)
+
+
+def _decode(input_zip, info, zinfo, compress_type, compresslevel, pwd, nbits):
+    """Helper function run on workers: read (decrypt, inflate, CRC-check) one entry and re-encode it"""
+    return prepare_data(zinfo, input_zip.read(info), compress_type, compresslevel, pwd, nbits)
+
+
+def merge_archives(output_zip, sources, reporter=None, max_workers=None, queue_depth_per_worker=QUEUE_DEPTH_PER_WORKER,
+                   max_file_size=PARALLEL_MAX_FILE_SIZE, chunk_size=CHUNK_SIZE, handle_duplicates="rename",
+                   compare_hashes=False):
+    """
+    Copy the entries of ``sources`` into ``output_zip``, in order.
+
+    Worker threads read and inflate entries, then deflate (and encrypt) them
+    with the output's settings, running up to ``queue_depth_per_worker``
+    entries per worker ahead of the writer, across archive boundaries, so
+    the next input is being decoded while the current one is written. The
+    calling thread appends finished entries in input order; entries of
+    ``max_file_size`` or more are streamed by it directly, ``chunk_size``
+    bytes at a time, instead of being held in memory. An input that fails
+    midway keeps the entries already copied and gets its ``error`` set; the
+    merge goes on with the next one. Per-source ``added`` counts are
+    updated as entries land.
+
+    A name that was already written is skipped (``"skip"``), given the
+    first free ``name_<n>.ext`` (``"rename"``) or written again
+    (``"overwrite"``). With ``"deduplicate"`` an entry whose CRC-32 and size
+    match a copy already written under that name (renamed or not) is
+    dropped, and only different content is renamed; ``compare_hashes``
+    confirms matches (and compares AES entries, which carry no CRC) by the
+    SHA-256 of both contents. Names are decided by the writer, against what
+    actually made it into the output.
+    """
+    pwd, nbits = encryption_settings(output_zip)
+    compress_type, compresslevel = output_zip.compression, output_zip.compresslevel
+    max_workers = max_workers or default_workers()
+    # Streamed entries are compressed while the workers run: zstd gets a worker's share of the CPUs
+    writer_zstd_threads = zstd_threads(max_workers)
+    date_time = time.localtime(time.time())[:6]
+    names = _OutputNames(handle_duplicates, compare_hashes)
+
+    work = ((source, info) for source in sources if source.error is None for info in source.entries)
+    pending = collections.deque()
+    inputs = _OpenInputs()
+
+    def submit_next(executor):
+        """Helper function to schedule the next entry (None means the writer streams it)"""
+        for source, info in work:
+            if source.error is not None:
+                continue
+            if names.skipped(source, info):
+                # Already written under that name: no need to decode it at all
+                if reporter is not None:
+                    reporter.advance(info.file_size, entries=1)
+                continue
+            try:
+                input_zip = inputs.acquire(source)
+            except Exception as e:
+                source.error = e
+                continue
+            zinfo = entry_info(output_zip, info.filename, date_time)
+            if executor is None or info.file_size >= max_file_size:
+                pending.append((source, info, zinfo, None))
+            else:
+                future = executor.submit(_decode, input_zip, info, zinfo, compress_type, compresslevel, pwd, nbits)
+                pending.append((source, info, zinfo, future))
+            return True
+        return False
+
+    def write_next():
+        """Helper function to append the oldest scheduled entry under the name it gets now"""
+        source, info, zinfo, future = pending.popleft()
+        try:
+            if source.error is not None:
+                return
+            final_name = names.resolve(source, info)
+            if final_name is None:
+                if reporter is not None:
+                    reporter.advance(info.file_size, entries=1)
+                return
+            zinfo.filename = zinfo.orig_filename = final_name
+            start_dir, entry_count = output_zip.start_dir, len(output_zip.filelist)
+            try:
+                if future is None:
+                    with limit_zstd_threads(writer_zstd_threads):
+                        transcode_member(inputs.handle(source), info, output_zip, zinfo, reporter, chunk_size)
+                else:
+                    write_prepared(output_zip, future.result())
+                    if reporter is not None:
+                        reporter.advance(info.file_size, entries=1)
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                rollback_entries(output_zip, start_dir, entry_count)
+                source.error = e
+                return
+            names.written(source, info, final_name)
+            source.added += 1
+        finally:
+            inputs.done(source)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    queue_depth = max_workers * queue_depth_per_worker
+    try:
+        while len(pending) < queue_depth and submit_next(executor):
+            pass
+        while pending:
+            write_next()
+            submit_next(executor)
+    finally:
+        if executor is not None:
+            # On failure or cancellation, drop queued work instead of finishing it
+            executor.shutdown(wait=True, cancel_futures=True)
+        inputs.close_all()
+    return sources
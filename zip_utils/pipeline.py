@@ -0,0 +1,167 @@
+"""Parallel compress+encrypt pipeline: entries are prepared on a worker pool and written in order."""
+import collections
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from pyzipper import zipfile as _zipfile
+from pyzipper import zipfile_aes
+
+from .cgroups import available_cpus
+from .compression import limit_zstd_threads, zstd_threads
+from .progress import CHUNK_SIZE, write_file
+from .scanner import zipinfo_from_stat
+
+# Files at least this large are streamed by the writer instead of being held in memory
+PARALLEL_MAX_FILE_SIZE = 4 * 1024 * 1024
+
+# Entries prepared ahead of the writer, per worker
+QUEUE_DEPTH_PER_WORKER = 2
+
+
+def default_workers():
+    """Worker count used when a task leaves it on automatic: the CPUs the container allows"""
+    return available_cpus()
+
+
+class PreparedEntry:
+    """An entry whose compressed (and encrypted) bytes are ready to be appended"""
+
+    def __init__(self, zinfo, payload, encrypter=None):
+        self.zinfo = zinfo
+        self.payload = payload
+        self.encrypter = encrypter
+
+
+def prepare_data(zinfo, data, compress_type, compresslevel=None, pwd=None, nbits=256):
+    """
+    Compress and optionally WinZip-AES-encrypt ``data`` for ``zinfo`` in memory.
+
+    Safe to run on worker threads: zlib, bz2, lzma, hashlib and the AES code
+    release the GIL. Each entry gets its own encrypter, i.e. a fresh random
+    salt and its own PBKDF2-derived keys, exactly as pyzipper's serial path.
+    zstd stays on the calling thread, since the pool already has one per CPU.
+    """
+    zinfo.compress_type = compress_type
+    zinfo._compresslevel = compresslevel
+    with limit_zstd_threads(1):
+        compressor = _zipfile._get_compressor(compress_type, compresslevel)
+    payload = compressor.compress(data) + compressor.flush() if compressor else data
+
+    encrypter = None
+    if pwd is not None:
+        # Looked up at call time so the active crypto backend is used
+        encrypter = zipfile_aes.AESZipEncrypter(pwd=pwd, nbits=nbits)
+        payload = encrypter.encryption_header() + encrypter.encrypt(payload) + encrypter.flush()
+
+    zinfo.file_size = len(data)
+    zinfo.compress_size = len(payload)
+    zinfo.CRC = zlib.crc32(data)
+    return PreparedEntry(zinfo, payload, encrypter)
+
+
+def prepare_entry(zinfo_cls, entry, compress_type, compresslevel=None, pwd=None, nbits=256):
+    """Read one scanned ``FileEntry`` and prepare it with ``prepare_data``"""
+    zinfo = zipinfo_from_stat(zinfo_cls, entry.arcname, entry.stat)
+    with open(entry.path, 'rb') as source:
+        data = source.read()
+    return prepare_data(zinfo, data, compress_type, compresslevel, pwd, nbits)
+
+
+def encryption_settings(zip_file):
+    """``(pwd, nbits)`` entries written to ``zip_file`` are encrypted with; pwd is None when unencrypted"""
+    if getattr(zip_file, 'encryption', None) != zipfile_aes.WZ_AES:
+        return None, 256
+    if not zip_file.pwd:
+        raise RuntimeError('%s encryption requires a password.' % zipfile_aes.WZ_AES)
+    return zip_file.pwd, (zip_file.encryption_kwargs or {}).get('nbits', 256)
+
+
+def write_prepared(zip_file, entry):
+    """
+    Append a prepared entry to an archive opened for writing.
+
+    Sizes and CRC are known up front, so the local header is final and no data
+    descriptor is needed, even on non-seekable (streaming) outputs.
+    """
+    zinfo = entry.zinfo
+    zinfo.flag_bits = 0
+    if entry.encrypter is not None:
+        zinfo.flag_bits |= _zipfile._MASK_ENCRYPTED
+        entry.encrypter.update_zipinfo(zinfo)
+    if zinfo.compress_type == _zipfile.ZIP_LZMA:
+        zinfo.flag_bits |= _zipfile._MASK_COMPRESS_OPTION_1
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+
+    zip64 = zip_file._allowZip64 and max(zinfo.file_size, zinfo.compress_size) > _zipfile.ZIP64_LIMIT
+    if zip_file._seekable:
+        zip_file.fp.seek(zip_file.start_dir)
+    zinfo.header_offset = zip_file.fp.tell()
+    zip_file._writecheck(zinfo)
+    zip_file._didModify = True
+
+    zip_file.fp.write(zinfo.FileHeader(zip64))
+    zip_file.fp.write(entry.payload)
+    zip_file.start_dir = zip_file.fp.tell()
+    zip_file.filelist.append(zinfo)
+    zip_file.NameToInfo[zinfo.filename] = zinfo
+
+
+def write_files_parallel(zip_file, entries, reporter=None, max_workers=None, queue_depth_per_worker=QUEUE_DEPTH_PER_WORKER,
+                         max_file_size=PARALLEL_MAX_FILE_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Add scanned ``FileEntry`` items to ``zip_file`` using a worker pool.
+
+    Workers compress and encrypt small files concurrently while the calling
+    thread writes finished entries in input order, so the archive is identical
+    in layout to a serial run. At most ``queue_depth_per_worker`` entries per
+    worker wait in memory; files of ``max_file_size`` or more are streamed
+    by the writer itself through ``write_file``, ``chunk_size`` bytes at a
+    time. Progress and cancellation are handled on the calling thread only.
+
+    Encryption follows the archive's own settings (``setpassword`` and
+    ``encryption``/``setencryption``), as with ``write_file``.
+    """
+    pwd, nbits = encryption_settings(zip_file)
+    max_workers = max_workers or default_workers()
+    if max_workers <= 1:
+        for entry in entries:
+            write_file(zip_file, entry.path, entry.arcname, reporter, chunk_size, file_stat=entry.stat)
+        return
+
+    queue_depth = max_workers * queue_depth_per_worker
+    pending = collections.deque()
+    remaining = iter(entries)
+
+    def submit_next(executor):
+        """Helper function to schedule the next entry (None means stream it inline)"""
+        entry = next(remaining, None)
+        if entry is None:
+            return False
+        if entry.size >= max_file_size:
+            pending.append((entry, None))
+        else:
+            future = executor.submit(prepare_entry, zip_file.zipinfo_cls, entry,
+                                     zip_file.compression, zip_file.compresslevel, pwd, nbits)
+            pending.append((entry, future))
+        return True
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    # Streamed entries are compressed while the workers run: zstd gets a worker's share of the CPUs
+    writer_zstd_threads = zstd_threads(max_workers)
+    try:
+        while len(pending) < queue_depth and submit_next(executor):
+            pass
+        while pending:
+            entry, future = pending.popleft()
+            if future is None:
+                with limit_zstd_threads(writer_zstd_threads):
+                    write_file(zip_file, entry.path, entry.arcname, reporter, chunk_size, file_stat=entry.stat)
+            else:
+                write_prepared(zip_file, future.result())
+                if reporter is not None:
+                    reporter.advance(entry.size, entries=1)
+            submit_next(executor)
+    finally:
+        # On failure or cancellation, drop queued work instead of finishing it
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,107 @@
+"""Extraction planning: archive-offset order, one listing and one mkdir per directory, OS I/O hints."""
+import errno
+import os
+import typing
+
+# Smaller files are written without preallocation; it isn't worth the extra syscall
+PREALLOCATE_MIN_SIZE = 1024 * 1024
+
+
+class ExtractionPlan(typing.NamedTuple):
+    """``(zinfo, file_path)`` pairs to extract, in archive order, and those skipped as already present"""
+    entries: list
+    skipped: list
+
+
+def create_directories(directories):
+    """Create every directory in ``directories`` (and its parents) with one makedirs call each at most"""
+    created = set()
+    # Sorted, parents come before their children, whose makedirs then has nothing to do
+    for directory in sorted(directories):
+        if not directory or directory in created:
+            continue
+        os.makedirs(directory, exist_ok=True)
+        while directory and directory not in created:
+            created.add(directory)
+            directory = os.path.dirname(directory)
+
+
+def plan_extraction(items, overwrite_existing=True, rename_existing=False):
+    """
+    Order ``(zinfo, file_path)`` pairs for extraction and prepare their directories.
+
+    Entries are sorted by local header offset, so the archive is read front
+    to back even when the central directory lists them in another order.
+    Existing files are found by listing each target directory once instead
+    of one ``os.path.exists`` per entry; with ``overwrite_existing=False``
+    they are skipped, and so is every entry after the first that targets
+    the same path (e.g. same-named files flattened into one directory).
+    With ``rename_existing`` such entries are kept under the first free
+    ``name_<n>.ext`` instead. Directories for the remaining entries are
+    created up front, each once.
+    """
+    listings = {}
+
+    def exists(file_path):
+        directory, name = os.path.split(file_path)
+        if directory not in listings:
+            try:
+                listings[directory] = set(os.listdir(directory or '.'))
+            except (FileNotFoundError, NotADirectoryError):
+                listings[directory] = set()
+        return name in listings[directory]
+
+    def free_path(file_path):
+        directory, name = os.path.split(file_path)
+        base_name, extension = os.path.splitext(name)
+        counter = 1
+        while exists(file_path):
+            file_path = os.path.join(directory, f"{base_name}_{counter}{extension}")
+            counter += 1
+        return file_path
+
+    entries = []
+    skipped = []
+    for zinfo, file_path in sorted(items, key=lambda item: item[0].header_offset):
+        if rename_existing:
+            file_path = free_path(file_path)
+        elif overwrite_existing:
+            entries.append((zinfo, file_path))
+            continue
+        elif exists(file_path):
+            skipped.append((zinfo, file_path))
+            continue
+        entries.append((zinfo, file_path))
+        # Will exist once extracted
+        directory, name = os.path.split(file_path)
+        listings[directory].add(name)
+
+    create_directories({os.path.dirname(file_path) for _, file_path in entries})
+    return ExtractionPlan(entries, skipped)
+
+
+def advise_sequential(zip_file):
+    """Tell the OS the archive will be read front to back, so it reads ahead aggressively"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(zip_file.fp.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except (AttributeError, OSError, ValueError):
+        # Not a regular local file (remote, pipe, in-memory); nothing to advise
+        pass
+
+
+def preallocate(fd, size):
+    """
+    Reserve ``size`` bytes for a file about to be written, to keep it contiguous on disk.
+
+    Best effort: skipped for small files, platforms without
+    ``posix_fallocate`` and filesystems that refuse it.
+    """
+    if size < PREALLOCATE_MIN_SIZE or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as e:
+        if e.errno not in (errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOSYS):
+            raise
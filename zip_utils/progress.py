@@ -0,0 +1,359 @@
+"""Throttled progress reporting and cooperative cancellation for long-running tasks."""
+import contextlib
+import os
+import threading
+import time
+import weakref
+
+from .planner import preallocate
+from .scanner import zipinfo_from_stat
+from .zerocopy import can_copy_raw, can_write_raw, extract_stored, write_stored
+
+# Size of the chunks copied between archive members and files
+CHUNK_SIZE = 1024 * 1024
+
+_cancel_requests = set()
+_cancel_lock = threading.Lock()
+# Job id -> reporter of every task still running in this process; entries go away with their reporter
+_running = weakref.WeakValueDictionary()
+
+
+class OperationCancelled(Exception):
+    """Raised from a hot loop when the running job has been asked to stop"""
+
+
+def request_cancel(job_id):
+    """Ask the task running as ``job_id`` to stop at its next chunk boundary"""
+    with _cancel_lock:
+        _cancel_requests.add(job_id)
+
+
+def running_jobs(session_id=None):
+    """Job ids of the tasks reporting progress in this process, optionally only those of one session"""
+    with _cancel_lock:
+        reporters = list(_running.items())
+    return [job_id for job_id, reporter in reporters if session_id is None or reporter.session_id == session_id]
+
+
+def cancel_running(session_id=None, job_ids=None):
+    """
+    Ask running tasks to stop: ``job_ids`` if given, else every task of ``session_id`` (None = all).
+
+    Task blocks run in one executor process, so another block of the flow
+    (see the zip-cancel task) can stop them. Returns the job ids asked.
+    """
+    running = running_jobs(session_id)
+    targets = [job_id for job_id in running if job_id in job_ids] if job_ids else running
+    for job_id in targets:
+        request_cancel(job_id)
+    return targets
+
+
+def clear_cancel(job_id):
+    """Forget a cancellation request once the job has stopped"""
+    with _cancel_lock:
+        _cancel_requests.discard(job_id)
+
+
+def _format_bytes(num_bytes):
+    """Helper function to render a byte count for progress logs"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def _format_eta(seconds):
+    """Helper function to render an ETA in h/m/s"""
+    if seconds is None:
+        return "unknown"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressReporter:
+    """
+    Report bytes/entries done and ETA through the OOMOL context.
+
+    ``advance`` is cheap enough to call once per chunk: it checks for
+    cancellation every time but only talks to the context every
+    ``interval`` seconds (progress bar) and ``log_interval`` seconds (log line).
+    """
+
+    def __init__(self, context, total_bytes=0, total_entries=0, label="Processing",
+                 interval=0.5, log_interval=5.0):
+        self.context = context
+        self.total_bytes = total_bytes
+        self.total_entries = total_entries
+        self.label = label
+        self.interval = interval
+        self.log_interval = log_interval
+        self.bytes_done = 0
+        self.entries_done = 0
+        self._start = time.monotonic()
+        self._last_report = 0.0
+        self._last_log = self._start
+        try:
+            self.job_id = context.job_id
+        except Exception:
+            self.job_id = None
+        try:
+            self.session_id = context.session_id
+        except Exception:
+            self.session_id = None
+        if self.job_id is not None:
+            with _cancel_lock:
+                _running[self.job_id] = self
+
+    def add_total(self, nbytes=0, entries=0):
+        """Grow the expected totals when they are only discovered while running"""
+        self.total_bytes += nbytes
+        self.total_entries += entries
+
+    def check_cancelled(self):
+        """Raise OperationCancelled if cancellation was requested for this job"""
+        if self.job_id is not None and self.job_id in _cancel_requests:
+            self._unregister()
+            raise OperationCancelled(f"{self.label} cancelled")
+
+    def advance(self, nbytes=0, entries=0):
+        """Record finished work, check for cancellation and report if due"""
+        self.bytes_done += nbytes
+        self.entries_done += entries
+        self.check_cancelled()
+
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.context.report_progress(self.percent())
+        if now - self._last_log >= self.log_interval:
+            self._last_log = now
+            self.context.report_log(self.describe())
+
+    def percent(self):
+        """Completion in [0, 100], by bytes when known and by entries otherwise"""
+        if self.total_bytes > 0:
+            done = self.bytes_done / self.total_bytes
+        elif self.total_entries > 0:
+            done = self.entries_done / self.total_entries
+        else:
+            return 0
+        return round(min(done, 1.0) * 100, 1)
+
+    def eta(self):
+        """Estimated seconds remaining, or None before there is a usable rate"""
+        elapsed = time.monotonic() - self._start
+        fraction = self.percent() / 100
+        if elapsed <= 0 or fraction <= 0:
+            return None
+        return elapsed * (1 - fraction) / fraction
+
+    def describe(self):
+        """One-line human readable progress summary"""
+        entries = f"{self.entries_done}/{self.total_entries}" if self.total_entries else str(self.entries_done)
+        size = _format_bytes(self.bytes_done)
+        if self.total_bytes:
+            size += f" / {_format_bytes(self.total_bytes)}"
+        return f"{self.label}: {entries} entries, {size}, ETA {_format_eta(self.eta())}"
+
+    def finish(self):
+        """Report completion"""
+        self._unregister()
+        self.context.report_progress(100)
+        self.context.report_log(self.describe())
+
+    def _unregister(self):
+        """Helper function: this job no longer takes cancellation requests"""
+        if self.job_id is None:
+            return
+        with _cancel_lock:
+            if _running.get(self.job_id) is self:
+                del _running[self.job_id]
+        clear_cancel(self.job_id)
+
+
+def copy_stream(source, target, reporter=None, chunk_size=CHUNK_SIZE, io_limit=None):
+    """
+    Copy a file-like object in chunks, reporting progress after each chunk.
+
+    ``io_limit`` (e.g. a semaphore shared by several workers) is held around
+    each source read, capping how many reads run at once.
+    """
+    io_limit = io_limit or contextlib.nullcontext()
+    copied = 0
+    while True:
+        with io_limit:
+            chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        target.write(chunk)
+        copied += len(chunk)
+        if reporter is not None:
+            reporter.advance(len(chunk))
+    return copied
+
+
+def extract_member(zip_file, member, file_path, reporter=None, chunk_size=CHUNK_SIZE, guard=None):
+    """
+    Stream one archive member to ``file_path``.
+
+    If the copy fails or is cancelled midway the half-written file is removed;
+    a failure to open the member leaves any existing file untouched. STORED,
+    unencrypted members of local archives are copied in-kernel instead.
+    An ``ExtractionGuard`` checks the entry before it is opened and every
+    chunk it inflates to.
+    """
+    zinfo = zip_file.getinfo(member) if isinstance(member, str) else member
+    if guard is not None:
+        guard.start_entry(zinfo)
+    if can_copy_raw(zip_file, zinfo):
+        try:
+            copied = extract_stored(zip_file, zinfo, file_path, reporter)
+            if copied is not None:
+                if guard is not None:
+                    # Stored: exactly the declared size, which start_entry has let through
+                    guard.account(zinfo, copied, copied)
+                if reporter is not None:
+                    reporter.advance(entries=1)
+        except Exception:
+            remove_partial(file_path)
+            raise
+        if copied is not None:
+            return copied
+
+    with zip_file.open(member) as source:
+        try:
+            with open(file_path, 'wb') as target:
+                preallocate(target.fileno(), zinfo.file_size)
+                reader = guard.wrap(source, zinfo) if guard is not None else source
+                copied = copy_stream(reader, target, reporter, chunk_size)
+                if copied < zinfo.file_size:
+                    # Don't leave preallocated space past the real end of the data
+                    target.truncate(copied)
+            if reporter is not None:
+                # May raise OperationCancelled, which must not leave the finished file behind either
+                reporter.advance(entries=1)
+        except Exception:
+            remove_partial(file_path)
+            raise
+    return copied
+
+
+def write_file(zip_file, file_path, arcname, reporter=None, chunk_size=CHUNK_SIZE, io_limit=None, file_stat=None,
+               compress_type=None):
+    """
+    Chunked equivalent of ``zip_file.write(file_path, arcname)``.
+
+    Uses the archive's compression and level like ``ZipFile.write`` does,
+    unless ``compress_type`` overrides it for this file, but streams through
+    ``copy_stream`` so progress and cancellation are handled between chunks
+    instead of once per file. Passing the ``file_stat`` a scan already took
+    avoids stat'ing the file again. STORED, unencrypted entries of a
+    seekable archive are copied in-kernel instead.
+    """
+    if file_stat is not None:
+        zinfo = zipinfo_from_stat(zip_file.zipinfo_cls, arcname, file_stat)
+    else:
+        zinfo = zip_file.zipinfo_cls.from_file(file_path, arcname)
+    if zinfo.is_dir():
+        zip_file.write(file_path, arcname)
+        return 0
+
+    zinfo.compress_type = zip_file.compression if compress_type is None else compress_type
+    zinfo._compresslevel = zip_file.compresslevel
+    if can_write_raw(zip_file, zinfo):
+        with io_limit or contextlib.nullcontext():
+            written = write_stored(zip_file, zinfo, file_path, reporter)
+        if written is not None:
+            if reporter is not None:
+                reporter.advance(entries=1)
+            return written
+
+    with open(file_path, 'rb') as source, zip_file.open(zinfo, 'w') as target:
+        copy_stream(source, target, reporter, chunk_size, io_limit)
+    if reporter is not None:
+        reporter.advance(entries=1)
+    return zinfo.file_size
+
+
+def entry_info(zip_file, arcname, date_time=None):
+    """
+    ZipInfo for a new entry named ``arcname``, set up the way ``ZipFile.writestr`` does.
+
+    Dated now unless ``date_time`` is given, with the archive's compression
+    and level.
+    """
+    zinfo = zip_file.zipinfo_cls(arcname, date_time or time.localtime(time.time())[:6])
+    zinfo.compress_type = zip_file.compression
+    zinfo._compresslevel = zip_file.compresslevel
+    if zinfo.filename.endswith('/'):
+        zinfo.external_attr = 0o40775 << 16  # drwxrwxr-x
+        zinfo.external_attr |= 0x10  # MS-DOS directory flag
+    else:
+        zinfo.external_attr = 0o600 << 16  # ?rw-------
+    return zinfo
+
+
+def transcode_member(source_zip, member, target_zip, target, reporter=None, chunk_size=CHUNK_SIZE):
+    """
+    Copy one entry into another archive, re-encoding it chunk by chunk.
+
+    Chunked equivalent of ``target_zip.writestr(target, source_zip.read(member))``:
+    the entry is decrypted and inflated from ``source_zip``, then deflated
+    and encrypted with ``target_zip``'s settings, ``chunk_size`` bytes at a
+    time, so memory stays flat whatever the entry size. ``target`` is the
+    new entry's name or a ready ZipInfo.
+    """
+    zinfo = member if isinstance(member, source_zip.zipinfo_cls) else source_zip.getinfo(member)
+    if isinstance(target, str):
+        target = entry_info(target_zip, target)
+    # Known up front so the local header gets Zip64 sizes when the entry needs them
+    target.file_size = zinfo.file_size
+    start_dir, entry_count = target_zip.start_dir, len(target_zip.filelist)
+    try:
+        with source_zip.open(zinfo) as source, target_zip.open(target, 'w') as dest:
+            copied = copy_stream(source, dest, reporter, chunk_size)
+    except BaseException:
+        # Closing the entry on the way out recorded it with partial data; drop it
+        rollback_entries(target_zip, start_dir, entry_count)
+        raise
+    if reporter is not None:
+        reporter.advance(entries=1)
+    return copied
+
+
+def rollback_entries(zip_file, start_dir, entry_count):
+    """
+    Forget the entries written to ``zip_file`` since it had ``entry_count`` of them.
+
+    Their bytes are cut off at ``start_dir``, where the next entry (or the
+    central directory) is written instead.
+    """
+    removed = zip_file.filelist[entry_count:]
+    del zip_file.filelist[entry_count:]
+    for zinfo in removed:
+        if zip_file.NameToInfo.get(zinfo.filename) is zinfo:
+            # A duplicate name maps back to the copy written before it, as it did
+            earlier = [info for info in zip_file.filelist if info.filename == zinfo.filename]
+            if earlier:
+                zip_file.NameToInfo[zinfo.filename] = earlier[-1]
+            else:
+                del zip_file.NameToInfo[zinfo.filename]
+    zip_file.start_dir = start_dir
+    if zip_file._seekable:
+        zip_file.fp.seek(start_dir)
+        zip_file.fp.truncate()
+
+
+def remove_partial(path):
+    """Remove a partially written output, ignoring files that are already gone"""
+    try:
+        if os.path.isfile(path):
+            os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,272 @@
+"""Read-only, seekable access to archives served over HTTP(S) with range requests."""
+import collections
+import re
+import urllib.parse
+
+# Granularity of the block cache and of every range request
+BLOCK_SIZE = 64 * 1024
+
+# Upper bound for blocks kept in memory
+CACHE_SIZE = 64 * 1024 * 1024
+
+# Sequential reads grow their read-ahead up to this many bytes per request
+MAX_READAHEAD = 8 * 1024 * 1024
+
+_MAX_REDIRECTS = 5
+_MAX_RETRIES = 3
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+def is_remote(path):
+    """True for http:// and https:// locations"""
+    return urllib.parse.urlsplit(path).scheme in ('http', 'https')
+
+
+class RemoteFile:
+    """
+    File-like view of a remote archive that fetches only the bytes it is asked for.
+
+    pyzipper only needs ``seek``/``tell``/``read``: opening an archive reads the
+    EOCD and central directory, and extracting a member reads its local header
+    and data, so listing or pulling a few entries out of a huge archive
+    transfers little more than those bytes.
+
+    Reads go through a block cache of ``BLOCK_SIZE`` blocks (LRU, capped at
+    ``cache_size`` bytes). All missing blocks of one read are coalesced into a
+    single range request, and sequential reads grow a read-ahead window up to
+    ``MAX_READAHEAD``, never past the limit set with ``limit_readahead``.
+    """
+
+    def __init__(self, url, headers=None, cache_size=CACHE_SIZE, timeout=60):
+        self.url = url
+        self.headers = dict(headers or {})
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._connection = None
+        self._blocks = collections.OrderedDict()
+        self._position = 0
+        self._readahead = BLOCK_SIZE
+        self._readahead_limit = None
+        self._last_end = None
+        self.closed = False
+        self.size, self.etag = self._probe()
+
+    # -- HTTP -----------------------------------------------------------------
+
+    def _connect(self):
+        """Helper function to (re)open the keep-alive connection for the current URL"""
+        # Imported here: http.client (with email parsing) is slow to load and most archives are local
+        import http.client
+
+        if self._connection is not None:
+            self._connection.close()
+        parts = urllib.parse.urlsplit(self.url)
+        connection_cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._connection = connection_cls(parts.netloc, timeout=self.timeout)
+
+    def _request(self, method, headers):
+        """Helper function to send one request, following redirects and retrying dropped connections"""
+        import http.client
+
+        for _ in range(_MAX_REDIRECTS):
+            parts = urllib.parse.urlsplit(self.url)
+            target = parts.path or '/'
+            if parts.query:
+                target += '?' + parts.query
+            for attempt in range(_MAX_RETRIES):
+                if self._connection is None:
+                    self._connect()
+                try:
+                    self._connection.request(method, target, headers={**self.headers, **headers})
+                    response = self._connection.getresponse()
+                    break
+                except (http.client.HTTPException, ConnectionError, TimeoutError):
+                    self._connection.close()
+                    self._connection = None
+                    if attempt == _MAX_RETRIES - 1:
+                        raise
+            self.requests += 1
+            if response.status in (301, 302, 303, 307, 308):
+                response.read()
+                self.url = urllib.parse.urljoin(self.url, response.getheader('Location'))
+                self._connect()
+                continue
+            return response
+        raise OSError(f"Too many redirects for {self.url}")
+
+    def _probe(self):
+        """Helper function to learn the archive size (and ETag) without downloading it"""
+        response = self._request('HEAD', {})
+        response.read()
+        length = response.getheader('Content-Length')
+        if response.status == 200 and length is not None and response.getheader('Accept-Ranges') == 'bytes':
+            return int(length), response.getheader('ETag')
+
+        # Some servers don't answer HEAD usefully, or don't say whether they take ranges;
+        # ask for the first byte instead, so a server that ignores Range fails here and not
+        # inside pyzipper, which would report it as "not a zip file"
+        response = self._request('GET', {'Range': 'bytes=0-0'})
+        self._check_partial(response)
+        response.read()
+        match = _CONTENT_RANGE.match(response.getheader('Content-Range') or '')
+        if match is None or match.group(3) == '*':
+            raise OSError(f"Server does not support range requests: {self.url} (HTTP {response.status})")
+        return int(match.group(3)), response.getheader('ETag')
+
+    def _check_partial(self, response):
+        """Helper function to fail on anything but a 206 answer, without downloading its body"""
+        if response.status == 206:
+            return
+        # A server that ignores Range sends the whole archive: drop the connection instead of reading it
+        self._connection.close()
+        self._connection = None
+        if response.status == 412:
+            raise OSError(f"Remote archive changed while reading: {self.url}")
+        if response.status == 200:
+            raise OSError(f"Server does not support range requests: {self.url} (HTTP 200)")
+        raise OSError(f"Range request failed for {self.url}: HTTP {response.status}")
+
+    def _fetch(self, start, end):
+        """Helper function to download bytes [start, end) with one range request"""
+        headers = {'Range': f'bytes={start}-{end - 1}'}
+        if self.etag:
+            # Fail instead of mixing bytes from two versions of the object
+            headers['If-Match'] = self.etag
+        response = self._request('GET', headers)
+        self._check_partial(response)
+        data = response.read()
+        match = _CONTENT_RANGE.match(response.getheader('Content-Range') or '')
+        if match is None or int(match.group(1)) != start or len(data) != end - start:
+            raise OSError(f"Unexpected range response for {self.url}")
+        self.bytes_fetched += len(data)
+        return data
+
+    # -- block cache ------------------------------------------------------------
+
+    def _load(self, first_block, last_block):
+        """Helper function to make blocks [first_block, last_block] available, one request per missing run"""
+        block = first_block
+        while block <= last_block:
+            if block in self._blocks:
+                self._blocks.move_to_end(block)
+                block += 1
+                continue
+            run_end = block
+            while run_end + 1 <= last_block and run_end + 1 not in self._blocks:
+                run_end += 1
+            start = block * BLOCK_SIZE
+            end = min((run_end + 1) * BLOCK_SIZE, self.size)
+            data = self._fetch(start, end)
+            for index in range(block, run_end + 1):
+                offset = (index - block) * BLOCK_SIZE
+                self._blocks[index] = data[offset:offset + BLOCK_SIZE]
+            block = run_end + 1
+
+        while len(self._blocks) * BLOCK_SIZE > self.cache_size and len(self._blocks) > last_block - first_block + 1:
+            self._blocks.popitem(last=False)
+
+    def prefetch(self, ranges, max_gap=BLOCK_SIZE):
+        """
+        Fetch several byte ranges up front with as few requests as possible.
+
+        Ranges closer than ``max_gap`` are merged into one request; merged
+        ranges that wouldn't fit in the cache are left to be read on demand.
+        """
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start - merged[-1][1] <= max_gap:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        budget = self.cache_size
+        for start, end in merged:
+            if end <= start or end - start > budget:
+                continue
+            budget -= end - start
+            self._load(start // BLOCK_SIZE, (min(end, self.size) - 1) // BLOCK_SIZE)
+
+    def limit_readahead(self, end=None):
+        """Don't read ahead past byte ``end`` (e.g. the end of the entry being extracted)"""
+        self._readahead_limit = end
+
+    # -- file interface -----------------------------------------------------------
+
+    def read(self, n=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if n is None or n < 0:
+            n = self.size - self._position
+        end = min(self._position + n, self.size)
+        if end <= self._position:
+            return b''
+
+        if self._last_end == self._position:
+            self._readahead = min(self._readahead * 2, MAX_READAHEAD)
+        else:
+            self._readahead = BLOCK_SIZE
+        fetch_end = max(end, min(self._position + self._readahead, self.size))
+        if self._readahead_limit is not None:
+            fetch_end = max(end, min(fetch_end, self._readahead_limit))
+
+        first_block = self._position // BLOCK_SIZE
+        self._load(first_block, (fetch_end - 1) // BLOCK_SIZE)
+        parts = []
+        for block in range(first_block, (end - 1) // BLOCK_SIZE + 1):
+            parts.append(self._blocks[block])
+        data = b''.join(parts)
+        offset = self._position - first_block * BLOCK_SIZE
+        data = data[offset:offset + end - self._position]
+
+        self._position = end
+        self._last_end = end
+        return data
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            position = offset
+        elif whence == 1:
+            position = self._position + offset
+        elif whence == 2:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self):
+        return self._position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+        self._blocks.clear()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def member_range(zip_file, info):
+    """
+    Byte range [start, end) that extracting ``info`` reads from the archive.
+
+    The local header's extra field can differ from the central one, so the
+    end allows for a little slack; it only bounds read-ahead.
+    """
+    start = info.header_offset
+    end = start + 30 + len(info.orig_filename.encode('utf-8')) + len(info.extra) + info.compress_size + 1024
+    return start, min(end, zip_file.start_dir)
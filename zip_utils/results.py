@@ -0,0 +1,35 @@
+"""Summary tables returned by the tasks, as pandas DataFrames or plain column dicts."""
+
+# Values of the tasks' ``result_format`` input
+RESULT_FORMATS = ("dataframe", "dict")
+
+
+def make_table(rows, result_format="dataframe", summary=None):
+    """
+    Turn a list of row dicts into the table a task returns.
+
+    ``"dataframe"`` gives a pandas DataFrame. pandas is imported here, on first
+    use, because importing it takes longer than most tasks spend on real work.
+    ``"dict"`` skips pandas and gives ``{column: [values...]}``, with columns
+    in first-seen order and None where a row lacks a column, i.e. what
+    ``DataFrame(rows).to_dict("list")`` would hold.
+
+    ``summary`` is appended after a blank row when there is at least one row.
+    """
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"Unsupported result format: {result_format}")
+
+    rows = list(rows)
+    if summary is not None and rows:
+        rows += [{}, summary]
+
+    if result_format == "dict":
+        columns = {}
+        for row in rows:
+            for column in row:
+                columns.setdefault(column, None)
+        return {column: [row.get(column) for row in rows] for column in columns}
+
+    import pandas as pd
+
+    return pd.DataFrame(rows)
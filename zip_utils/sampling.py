@@ -0,0 +1,109 @@
+"""Choosing which entries of a large archive to test, and how much of it that covers."""
+import collections
+import random
+
+SAMPLING_STRATEGIES = ("first", "random", "stratified")
+
+# The archive's data area is split into this many equal ranges for stratifying and coverage
+OFFSET_STRATA = 10
+
+
+def _stratum(zinfo, data_end):
+    """Helper function: which of the ``OFFSET_STRATA`` ranges an entry's header falls in"""
+    if data_end <= 0:
+        return 0
+    return min(zinfo.header_offset * OFFSET_STRATA // data_end, OFFSET_STRATA - 1)
+
+
+def _size_class(zinfo):
+    """Helper function grouping entries by order of magnitude (x16) of their stored size"""
+    return zinfo.compress_size.bit_length() // 4
+
+
+def _stratified_order(infos, data_end, rng):
+    """
+    Helper function ordering entries round-robin across (offset range, size class) groups.
+
+    Taking a prefix of the result gives every part of the archive and every
+    size class a share of the sample, instead of many small entries from
+    one region.
+    """
+    groups = collections.defaultdict(list)
+    for zinfo in infos:
+        groups[(_stratum(zinfo, data_end), _size_class(zinfo))].append(zinfo)
+    queues = []
+    for key in sorted(groups):
+        rng.shuffle(groups[key])
+        queues.append(collections.deque(groups[key]))
+    ordered = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.popleft())
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+def sample_entries(infos, strategy="first", max_entries=0, max_bytes=0, tail_count=0, seed=None):
+    """
+    Pick the entries to test out of ``infos``; returns ``(sample, seed)``.
+
+    ``"first"`` keeps archive order (the old behaviour), ``"random"`` draws
+    uniformly, and ``"stratified"`` spreads the sample over offset ranges
+    and size classes. The last ``tail_count`` entries by offset, where
+    truncated uploads break first, are always included. The sample stops
+    at ``max_entries`` entries and ``max_bytes`` stored bytes (0 = no
+    limit); the tail counts towards both but is never dropped for them.
+    ``seed`` makes random picks repeatable; when None one is drawn and
+    returned so the run can be reproduced. The sample is in offset order,
+    so the archive is read front to back.
+    """
+    if strategy not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {strategy}")
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    rng = random.Random(seed)
+
+    by_offset = sorted(infos, key=lambda zinfo: zinfo.header_offset)
+    tail = by_offset[len(by_offset) - tail_count:] if tail_count > 0 else []
+    tail_ids = {id(zinfo) for zinfo in tail}
+    rest = [zinfo for zinfo in infos if id(zinfo) not in tail_ids]
+
+    if strategy == "random":
+        rng.shuffle(rest)
+    elif strategy == "stratified":
+        data_end = by_offset[-1].header_offset + by_offset[-1].compress_size + 1 if by_offset else 0
+        rest = _stratified_order(rest, data_end, rng)
+
+    sample = list(tail)
+    sampled_bytes = sum(zinfo.compress_size for zinfo in tail)
+    for zinfo in rest:
+        if max_entries > 0 and len(sample) >= max_entries:
+            break
+        if max_bytes > 0 and sampled_bytes + zinfo.compress_size > max_bytes:
+            # Too big for what's left of the budget; a smaller one may still fit
+            continue
+        sample.append(zinfo)
+        sampled_bytes += zinfo.compress_size
+
+    sample.sort(key=lambda zinfo: zinfo.header_offset)
+    return sample, seed
+
+
+def sample_coverage(sample, infos):
+    """How much of the archive ``sample`` covers: entries, stored bytes and offset ranges"""
+    total_bytes = sum(zinfo.compress_size for zinfo in infos)
+    sampled_bytes = sum(zinfo.compress_size for zinfo in sample)
+    last = max(infos, key=lambda zinfo: zinfo.header_offset, default=None)
+    data_end = last.header_offset + last.compress_size + 1 if last is not None else 0
+    strata = {_stratum(zinfo, data_end) for zinfo in sample}
+    populated = {_stratum(zinfo, data_end) for zinfo in infos}
+    return {
+        "entries_tested": len(sample),
+        "entries_total": len(infos),
+        "entry_coverage_percent": round(len(sample) / len(infos) * 100, 2) if infos else 100.0,
+        "bytes_tested": sampled_bytes,
+        "bytes_total": total_bytes,
+        "byte_coverage_percent": round(sampled_bytes / total_bytes * 100, 2) if total_bytes else 100.0,
+        "offset_ranges_covered": f"{len(strata)}/{len(populated)}",
+        "includes_last_entry": last is not None and any(zinfo is last for zinfo in sample),
+    }
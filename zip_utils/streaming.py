@@ -0,0 +1,414 @@
+"""Streaming ZIP I/O: output to non-seekable sinks and reading archives front to back."""
+import struct
+import time
+import zlib
+
+from pyzipper import zipfile as _zipfile
+from pyzipper import zipfile_aes
+from pyzipper.zipfile_aes import WZ_AES_V2, EXTRA_WZ_AES
+
+
+class StreamSink:
+    """
+    Write-only, non-seekable view of a file-like sink.
+
+    pyzipper falls back to streaming mode when the output has no ``tell``/``seek``:
+    every entry gets a data descriptor (bit 3) after its data instead of
+    a rewritten local header, and Zip64 records are used when sizes or offsets
+    need them. Nothing is buffered beyond the chunk being written, so memory
+    stays bounded and no temp file is needed.
+    """
+
+    def __init__(self, raw, close_raw=True):
+        self._raw = raw
+        self._close_raw = close_raw
+        self.bytes_written = 0
+        self.closed = False
+
+    @classmethod
+    def open(cls, path):
+        """Open a path (regular file, FIFO or device) as a streaming sink"""
+        return cls(open(path, 'wb'))
+
+    def write(self, data):
+        self._raw.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        self._raw.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.flush()
+        if self._close_raw:
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+_DATA_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+# Records that follow the last local entry
+_END_SIGNATURES = (b'PK\x01\x02', b'PK\x05\x06', b'PK\x06\x06')
+
+_EXTRA_ZIP64 = 0x0001
+_MASK_ENCRYPTED = 0x0001
+_MASK_USE_DATA_DESCRIPTOR = 0x0008
+_MASK_UTF_FILENAME = 0x0800
+
+# Raw bytes read from the input per step
+STREAM_READ_SIZE = 64 * 1024
+
+
+class GrowingFileReader:
+    """
+    Read a file that is still being written, e.g. a download in progress.
+
+    Like a pipe, ``read`` returns whatever is available; only when nothing is
+    left does it wait for the file to grow, giving up (EOF) once nothing has
+    been appended for ``idle_timeout`` seconds. Because the streaming reader
+    stops at the central directory, a complete archive never waits.
+    """
+
+    def __init__(self, path, idle_timeout=30.0, poll_interval=0.2):
+        self._file = open(path, 'rb')
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+
+    def read(self, n):
+        data = self._file.read(n)
+        waited = 0.0
+        while not data and waited < self.idle_timeout:
+            time.sleep(self.poll_interval)
+            waited += self.poll_interval
+            data = self._file.read(n)
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _PushbackInput:
+    """Forward-only reader over the raw stream with room to push bytes back"""
+
+    def __init__(self, fp):
+        self._fp = fp
+        self._pending = b''
+
+    def read(self, n):
+        if self._pending:
+            data, self._pending = self._pending[:n], self._pending[n:]
+            return data
+        return self._fp.read(n)
+
+    def read_exact(self, n, what):
+        data = b''
+        while len(data) < n:
+            chunk = self.read(n - len(data))
+            if not chunk:
+                raise _zipfile.BadZipFile(f"Truncated {what}")
+            data += chunk
+        return data
+
+    def unread(self, data):
+        if data:
+            self._pending = data + self._pending
+
+
+class StreamEntry:
+    """
+    One archive member found while walking local headers.
+
+    Mirrors the ZipInfo attributes the tasks use (``filename``, ``file_size``,
+    ``compress_size``, ``CRC``, ``date_time``, ``is_dir()``). The member data
+    can only be read once, with ``read``, before the reader moves on to the
+    next entry; unread data is skipped automatically. ``raw_read`` counts
+    the compressed bytes consumed so far, which is all there is to go on
+    before a data descriptor gives the sizes.
+    """
+
+    def __init__(self, reader, header, filename, extra):
+        (_, self.extract_version, self.extract_system, self.flag_bits, self.compress_type,
+         self._raw_time, raw_date, self.CRC, self.compress_size, self.file_size, _, _) = header
+        self.filename = filename
+        self.date_time = ((raw_date >> 9) + 1980, (raw_date >> 5) & 0xF, raw_date & 0x1F,
+                          self._raw_time >> 11, (self._raw_time >> 5) & 0x3F, (self._raw_time & 0x1F) * 2)
+        self.zip64 = False
+        self.wz_aes_version = None
+        self.wz_aes_strength = None
+        self._reader = reader
+        self._decode_extra(extra)
+        self._chunks = self._iter_data()
+        self._buffer = b''
+        self.consumed = False
+        self.raw_read = 0
+
+    def _decode_extra(self, extra):
+        """Helper function to apply Zip64 sizes and WinZip AES fields from the extra block"""
+        offset = 0
+        while offset + 4 <= len(extra):
+            field_id, length = struct.unpack('<HH', extra[offset:offset + 4])
+            body = extra[offset + 4:offset + 4 + length]
+            if field_id == _EXTRA_ZIP64:
+                # The local Zip64 field holds both sizes, uncompressed first
+                self.zip64 = True
+                values = [struct.unpack('<Q', body[i:i + 8])[0] for i in range(0, len(body) - 7, 8)]
+                if self.file_size == 0xFFFFFFFF and values:
+                    self.file_size = values.pop(0)
+                if self.compress_size == 0xFFFFFFFF and values:
+                    self.compress_size = values.pop(0)
+            elif field_id == EXTRA_WZ_AES and length == 7:
+                self.wz_aes_version, _, self.wz_aes_strength, self.compress_type = struct.unpack('<H2sBH', body)
+            offset += 4 + length
+
+    @property
+    def is_encrypted(self):
+        return bool(self.flag_bits & _MASK_ENCRYPTED)
+
+    @property
+    def use_datadescripter(self):
+        return bool(self.flag_bits & _MASK_USE_DATA_DESCRIPTOR)
+
+    def is_dir(self):
+        return self.filename.endswith('/')
+
+    def read(self, n=-1):
+        """Read up to n bytes of decompressed member data (all remaining data if n < 0)"""
+        while n < 0 or len(self._buffer) < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if n < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+    def skip(self):
+        """Consume the rest of the member without keeping it"""
+        for _ in self._chunks:
+            pass
+        self._buffer = b''
+
+    def _iter_data(self):
+        """Decrypt and decompress the member, yielding plaintext chunks"""
+        source = self._reader._input
+        pwd = self._reader.pwd
+        decrypter = None
+        aes = None
+        header_length = 0
+        raw_left = None if self.use_datadescripter and self.compress_size == 0 else self.compress_size
+
+        if self.is_encrypted:
+            if not pwd:
+                raise RuntimeError(f"File {self.filename!r} is encrypted, password required for extraction")
+            if self.wz_aes_version is not None:
+                # Looked up at call time so the active crypto backend is used
+                decrypter_cls = zipfile_aes.AESZipDecrypter
+                header_length = decrypter_cls.encryption_header_length(self)
+                aes = decrypter_cls(self, pwd, source.read_exact(header_length, "encryption header"))
+                if raw_left is not None:
+                    raw_left -= header_length + decrypter_cls.hmac_size
+            else:
+                header_length = _zipfile.CRCZipDecrypter.encryption_header_length
+                decrypter = _zipfile.CRCZipDecrypter(self, pwd, source.read_exact(header_length, "encryption header"))
+                if raw_left is not None:
+                    raw_left -= header_length
+
+        if self.compress_type == _zipfile.ZIP_STORED:
+            decompressor = None
+            if raw_left is None:
+                yield from self._iter_stored_until_descriptor(header_length, decrypter, aes)
+                return
+        else:
+            # Unbound call: the lookup doesn't use the ZipExtFile instance
+            decompressor = _zipfile.ZipExtFile.get_decompressor(None, self.compress_type)
+
+        running_crc = 0
+        produced = 0
+        while raw_left is None or raw_left > 0:
+            size = STREAM_READ_SIZE if raw_left is None else min(STREAM_READ_SIZE, raw_left)
+            raw = source.read(size)
+            if not raw:
+                raise _zipfile.BadZipFile(f"Truncated data for {self.filename!r}")
+            if raw_left is not None:
+                raw_left -= len(raw)
+
+            data = raw
+            if aes is not None:
+                data = aes.decypter.decrypt(raw)
+            elif decrypter is not None:
+                data = decrypter.decrypt(raw)
+
+            if decompressor is not None:
+                data = decompressor.decompress(data)
+                if decompressor.eof:
+                    # Bytes past the end of the compressed stream belong to the
+                    # trailer (HMAC, data descriptor) or the next header
+                    unused = _unused_data(decompressor)
+                    if unused:
+                        source.unread(raw[len(raw) - len(unused):])
+                        raw = raw[:len(raw) - len(unused)]
+                    raw_left = 0
+            self.raw_read += len(raw)
+
+            if aes is not None:
+                aes.hmac.update(raw)
+            if data:
+                running_crc = zlib.crc32(data, running_crc)
+                produced += len(data)
+                yield data
+
+        if aes is not None:
+            aes.check_hmac(source.read_exact(aes.hmac_size, "HMAC"))
+        if self.use_datadescripter:
+            self._read_data_descriptor()
+        self._check(running_crc, produced)
+
+    def _iter_stored_until_descriptor(self, header_length=0, decrypter=None, aes=None):
+        """
+        Helper function to stream a stored entry whose size is only in its data descriptor.
+
+        The descriptor is the one whose compressed size matches the bytes read
+        so far. For an encrypted entry that size also counts the encryption
+        header (``header_length``, already read) and, for WinZip AES, the HMAC
+        just before the descriptor, which is checked along with the CRC-32.
+        """
+        source = self._reader._input
+        size_format = '<QQ' if self.zip64 else '<LL'
+        # signature + CRC + compressed size + uncompressed size
+        descriptor_length = 4 + 4 + struct.calcsize(size_format)
+        trailer_length = aes.hmac_size if aes is not None else 0
+        window = b''
+        emitted = 0
+        running_crc = 0
+
+        def decrypt(raw):
+            if aes is not None:
+                aes.hmac.update(raw)
+                return aes.decypter.decrypt(raw)
+            if decrypter is not None:
+                return decrypter.decrypt(raw)
+            return raw
+
+        while True:
+            chunk = source.read(STREAM_READ_SIZE)
+            if not chunk:
+                raise _zipfile.BadZipFile(f"No data descriptor found for {self.filename!r}")
+            window += chunk
+            search_from = trailer_length
+            while True:
+                index = window.find(_DATA_DESCRIPTOR_SIGNATURE, search_from)
+                if index < 0 or index + descriptor_length > len(window):
+                    break
+                crc, compress_size, file_size = struct.unpack(
+                    '<L' + size_format[1:], window[index + 4:index + descriptor_length])
+                data_end = index - trailer_length
+                if (compress_size == header_length + emitted + index
+                        and file_size == compress_size - header_length - trailer_length):
+                    data = decrypt(window[:data_end])
+                    self.raw_read = emitted + data_end
+                    running_crc = zlib.crc32(data, running_crc)
+                    if data:
+                        yield data
+                    if aes is not None:
+                        aes.check_hmac(window[data_end:index])
+                    source.unread(window[index + descriptor_length:])
+                    self.CRC, self.compress_size, self.file_size = crc, compress_size, file_size
+                    self._check(running_crc, file_size)
+                    return
+                search_from = index + 1
+            # Keep enough of the tail to recognise a descriptor (and the HMAC before it) split across reads
+            keep = descriptor_length - 1 + trailer_length
+            if len(window) > keep:
+                raw, window = window[:-keep], window[-keep:]
+                data = decrypt(raw)
+                running_crc = zlib.crc32(data, running_crc)
+                emitted += len(raw)
+                self.raw_read = emitted
+                yield data
+
+    def _read_data_descriptor(self):
+        """Helper function to read CRC and sizes that follow the member data"""
+        source = self._reader._input
+        size_format = '<QQ' if self.zip64 else '<LL'
+        head = source.read_exact(4, "data descriptor")
+        if head == _DATA_DESCRIPTOR_SIGNATURE:
+            head = source.read_exact(4, "data descriptor")
+        self.CRC = struct.unpack('<L', head)[0]
+        self.compress_size, self.file_size = struct.unpack(
+            size_format, source.read_exact(struct.calcsize(size_format), "data descriptor"))
+
+    def _check(self, running_crc, produced):
+        """Helper function to verify size and CRC once the member has been read"""
+        self.consumed = True
+        if produced != self.file_size:
+            raise _zipfile.BadZipFile(f"Size mismatch for {self.filename!r}")
+        # WinZip AES v2 entries store a CRC of 0 on purpose
+        if self.wz_aes_version == WZ_AES_V2 and self.CRC == 0:
+            return
+        if running_crc != self.CRC:
+            raise _zipfile.BadZipFile(f"Bad CRC-32 for file {self.filename!r}")
+
+
+def _unused_data(decompressor):
+    """Helper function to get bytes a decompressor read past the end of its stream"""
+    # pyzipper's LZMA wrapper keeps the real decompressor in _decomp
+    inner = getattr(decompressor, '_decomp', None) or decompressor
+    return getattr(inner, 'unused_data', b'')
+
+
+class StreamingZipReader:
+    """
+    Walk a ZIP archive front to back through its local file headers.
+
+    Works on any readable object, including pipes and files that are still
+    being downloaded (see GrowingFileReader): each entry can be extracted as
+    soon as its bytes arrive, without the central directory at the end.
+    """
+
+    def __init__(self, fp, pwd=None):
+        self._input = _PushbackInput(fp)
+        self.pwd = pwd
+
+    def __iter__(self):
+        entry = None
+        while True:
+            if entry is not None and not entry.consumed:
+                entry.skip()
+
+            signature = self._input.read(4)
+            if not signature:
+                return
+            if len(signature) < 4:
+                # A pipe or a download mid-write can return part of it; only no bytes at all is the end
+                signature += self._input.read_exact(4 - len(signature), "file header signature")
+            if signature in _END_SIGNATURES:
+                return
+            if signature == _DATA_DESCRIPTOR_SIGNATURE:
+                # Split-archive marker at the very start of the stream
+                continue
+            if signature != _LOCAL_HEADER_SIGNATURE:
+                raise _zipfile.BadZipFile("Bad magic number for file header")
+
+            header = _LOCAL_HEADER.unpack(signature + self._input.read_exact(_LOCAL_HEADER.size - 4, "file header"))
+            raw_name = self._input.read_exact(header[10], "file name")
+            extra = self._input.read_exact(header[11], "extra field")
+            encoding = 'utf-8' if header[3] & _MASK_UTF_FILENAME else 'cp437'
+            entry = StreamEntry(self, header, raw_name.decode(encoding), extra)
+            yield entry
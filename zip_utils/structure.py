@@ -0,0 +1,139 @@
+"""Structural checks of an archive from its headers alone, without decompressing anything."""
+import struct
+import typing
+
+from pyzipper import zipfile as _zipfile
+
+from .eocd import WZ_AES_METHOD, read_tail
+
+# Flag bit 3: CRC and sizes follow the data in a descriptor, the local header has zeros
+_MASK_DATA_DESCRIPTOR = 0x08
+# Smallest data descriptor: CRC-32 and two 32-bit sizes, without the optional signature
+_MIN_DESCRIPTOR_SIZE = 12
+_ZIP64_EXTRA_ID = 0x0001
+
+
+class StructureIssue(typing.NamedTuple):
+    """One structural problem: its kind, the entry concerned ("" for the archive) and a description"""
+    kind: str
+    filename: str
+    message: str
+
+
+class StructureReport(typing.NamedTuple):
+    """What ``check_structure`` found: the problems, and bytes before the archive (self-extractor stubs)"""
+    issues: list
+    # Informational: pyzipper reads prefixed archives fine
+    prefix_bytes: int
+
+
+def _local_zip64_sizes(extra):
+    """Helper function returning (file_size, compress_size) from a local header's Zip64 extra field, or None"""
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, data_size = struct.unpack_from('<HH', extra, position)
+        if header_id == _ZIP64_EXTRA_ID and data_size >= 16:
+            return struct.unpack_from('<QQ', extra, position + 4)
+        position += 4 + data_size
+    return None
+
+
+def _check_local_header(fp, zinfo, central_directory_start):
+    """
+    Helper function comparing an entry's local header with its central directory record.
+
+    Returns ``(issues, data_end)``, ``data_end`` being where the entry's
+    bytes stop (None when the header can't be read).
+    """
+    name = zinfo.orig_filename
+    if zinfo.header_offset + _zipfile.sizeFileHeader > central_directory_start:
+        return [StructureIssue("out_of_bounds", name, "Local header offset points past the entry data area")], None
+
+    fp.seek(zinfo.header_offset)
+    header = fp.read(_zipfile.sizeFileHeader)
+    if len(header) != _zipfile.sizeFileHeader or header[:4] != _zipfile.stringFileHeader:
+        return [StructureIssue("local_header", name, "Bad magic number for local file header")], None
+    fields = struct.unpack(_zipfile.structFileHeader, header)
+    name_length = fields[_zipfile._FH_FILENAME_LENGTH]
+    extra_length = fields[_zipfile._FH_EXTRA_FIELD_LENGTH]
+    local_name = fp.read(name_length)
+    local_extra = fp.read(extra_length)
+
+    issues = []
+    flag_bits = fields[_zipfile._FH_GENERAL_PURPOSE_FLAG_BITS]
+    encoding = 'utf-8' if flag_bits & _zipfile._MASK_UTF_FILENAME else 'cp437'
+    if local_name.decode(encoding, errors='replace') != name:
+        issues.append(StructureIssue("mismatch", name, "File name differs between local header and central directory"))
+
+    method = fields[_zipfile._FH_COMPRESSION_METHOD]
+    # AES entries say 99 in both headers; pyzipper replaces it with the real method when parsing
+    if method != zinfo.compress_type and not (method == WZ_AES_METHOD and zinfo.flag_bits & _zipfile._MASK_ENCRYPTED):
+        issues.append(StructureIssue("mismatch", name,
+                                     f"Compression method {method} in local header, {zinfo.compress_type} in central directory"))
+
+    if not flag_bits & _MASK_DATA_DESCRIPTOR:
+        crc = fields[_zipfile._FH_CRC]
+        compress_size = fields[_zipfile._FH_COMPRESSED_SIZE]
+        file_size = fields[_zipfile._FH_UNCOMPRESSED_SIZE]
+        if compress_size == 0xFFFFFFFF or file_size == 0xFFFFFFFF:
+            zip64_sizes = _local_zip64_sizes(local_extra)
+            if zip64_sizes is None:
+                issues.append(StructureIssue("zip64", name, "Local header has Zip64 size markers but no Zip64 extra field"))
+            else:
+                file_size, compress_size = zip64_sizes
+        if crc != zinfo.CRC:
+            issues.append(StructureIssue("mismatch", name, "CRC-32 differs between local header and central directory"))
+        if (compress_size, file_size) != (zinfo.compress_size, zinfo.file_size):
+            issues.append(StructureIssue("mismatch", name, "Sizes differ between local header and central directory"))
+
+    data_end = zinfo.header_offset + _zipfile.sizeFileHeader + name_length + extra_length + zinfo.compress_size
+    if flag_bits & _MASK_DATA_DESCRIPTOR:
+        data_end += _MIN_DESCRIPTOR_SIZE
+    if data_end > central_directory_start:
+        issues.append(StructureIssue("out_of_bounds", name,
+                                     "Entry data runs into the central directory or past the end of the file"))
+    return issues, data_end
+
+
+def check_structure(fp, infos=None):
+    """
+    Cross-check the archive open as ``fp`` at metadata speed; returns a ``StructureReport``.
+
+    The end-of-central-directory records must be consistent with the file
+    and with the ``infos`` parsed from the central directory (pass None
+    when it couldn't be parsed, to check the end records alone). Every
+    entry's local header must match its central directory record (name,
+    method, CRC-32, sizes, Zip64 fields), its data must lie before the
+    central directory, and no two entries may share bytes, which is how
+    overlapping-entry zip bombs are built. Only headers are read. Bytes
+    before the archive (a self-extractor stub, say) are reported as
+    ``prefix_bytes``, not as an issue; offsets are checked relative to them.
+    """
+    try:
+        tail = read_tail(fp)
+    except _zipfile.BadZipFile as e:
+        return StructureReport([StructureIssue("eocd", "", str(e))], 0)
+
+    issues = []
+    if infos is None:
+        return StructureReport(issues, tail.prefix_size)
+    if tail.total_entries != len(infos):
+        issues.append(StructureIssue("eocd", "", f"End record counts {tail.total_entries} entries, "
+                                                 f"central directory holds {len(infos)}"))
+
+    central_directory_start = tail.central_directory_offset + tail.prefix_size
+    ranges = []
+    for zinfo in sorted(infos, key=lambda zinfo: zinfo.header_offset):
+        entry_issues, data_end = _check_local_header(fp, zinfo, central_directory_start)
+        issues.extend(entry_issues)
+        if data_end is not None:
+            ranges.append((zinfo.header_offset, data_end, zinfo.orig_filename))
+
+    # Sorted by start, an entry overlaps when it begins before the furthest end seen so far
+    furthest_end, furthest_name = 0, None
+    for start, end, name in ranges:
+        if furthest_name is not None and start < furthest_end:
+            issues.append(StructureIssue("overlap", name, f"Entry data overlaps {furthest_name!r}"))
+        if end > furthest_end:
+            furthest_end, furthest_name = end, name
+    return StructureReport(issues, tail.prefix_size)
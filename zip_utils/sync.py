@@ -0,0 +1,128 @@
+"""Incremental extraction: only entries that differ from the files already on disk are written."""
+import os
+import stat
+import time
+
+from .planner import ExtractionPlan, create_directories
+from .progress import CHUNK_SIZE, extract_member, remove_partial
+from .zerocopy import crc32_of_file
+
+# ZIP (MS-DOS) timestamps have a 2-second resolution
+MTIME_TOLERANCE = 2
+
+
+def entry_mtime(zinfo):
+    """An entry's modification time as a POSIX timestamp (ZIP times are local time)"""
+    return time.mktime(zinfo.date_time + (0, 0, -1))
+
+
+def _unchanged(zinfo, file_path, file_stat):
+    """
+    Helper function telling whether ``file_path`` already holds the entry's content.
+
+    Size first, then mtime; only a file with the right size but another
+    time is read, to compare its CRC-32 with the central directory's.
+    """
+    if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size != zinfo.file_size:
+        return False
+    mtime = entry_mtime(zinfo)
+    if abs(file_stat.st_mtime - mtime) < MTIME_TOLERANCE:
+        return True
+    # WinZip AES (AE-2) entries store 0 instead of the CRC; nothing to compare against
+    if zinfo.CRC == 0 and zinfo.file_size > 0:
+        return False
+    with open(file_path, 'rb') as existing:
+        if crc32_of_file(existing.fileno(), zinfo.file_size) != zinfo.CRC:
+            return False
+    try:
+        # Same content: take the entry's time so the next sync decides from the stat alone
+        os.utime(file_path, (file_stat.st_atime, mtime))
+    except OSError:
+        pass
+    return True
+
+
+def plan_sync(items):
+    """
+    Split ``(zinfo, file_path)`` pairs into those to write and those already up to date.
+
+    Like ``plan_extraction``, entries come back in archive offset order,
+    each target directory is listed once (its stats come with the listing)
+    and directories for the entries to write are created up front. The
+    returned plan's ``skipped`` holds the unchanged entries.
+    """
+    listings = {}
+
+    def lookup(file_path):
+        directory, name = os.path.split(file_path)
+        if directory not in listings:
+            try:
+                with os.scandir(directory or '.') as scan:
+                    listings[directory] = {dir_entry.name: dir_entry for dir_entry in scan}
+            except (FileNotFoundError, NotADirectoryError):
+                listings[directory] = {}
+        return listings[directory].get(name)
+
+    entries = []
+    unchanged = []
+    for zinfo, file_path in sorted(items, key=lambda item: item[0].header_offset):
+        dir_entry = lookup(file_path)
+        try:
+            up_to_date = dir_entry is not None and _unchanged(zinfo, file_path, dir_entry.stat())
+        except OSError:
+            up_to_date = False
+        if up_to_date:
+            unchanged.append((zinfo, file_path))
+        else:
+            entries.append((zinfo, file_path))
+
+    create_directories({os.path.dirname(file_path) for _, file_path in entries})
+    return ExtractionPlan(entries, unchanged)
+
+
+def sync_member(zip_file, zinfo, file_path, reporter=None, chunk_size=CHUNK_SIZE, guard=None):
+    """
+    Replace ``file_path`` with the entry's content atomically.
+
+    The entry is extracted to a hidden temporary file next to the target,
+    stamped with the entry's mtime (so the next sync can skip it from its
+    stat) and renamed over the target; readers see the old file or the
+    new one, never a mix.
+    """
+    directory, name = os.path.split(file_path)
+    temp_path = os.path.join(directory, f".{name}.{os.urandom(4).hex()}.tmp")
+    try:
+        copied = extract_member(zip_file, zinfo, temp_path, reporter, chunk_size, guard)
+        mtime = entry_mtime(zinfo)
+        os.utime(temp_path, (mtime, mtime))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        remove_partial(temp_path)
+        raise
+    return copied
+
+
+def remove_extraneous(root, keep_files, keep_directories=()):
+    """
+    Delete files under ``root`` that aren't in ``keep_files``, then directories left empty.
+
+    Directories in ``keep_directories`` (the archive's own, possibly empty,
+    folders) and ``root`` itself are kept. Returns the deleted file paths.
+    """
+    keep_files = {os.path.normpath(path) for path in keep_files}
+    keep_directories = {os.path.normpath(path) for path in keep_directories}
+    keep_directories.add(os.path.normpath(root))
+    deleted = []
+    for directory, dirnames, filenames in os.walk(root, topdown=False):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if os.path.normpath(path) not in keep_files:
+                os.remove(path)
+                deleted.append(path)
+        if os.path.normpath(directory) not in keep_directories:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                # Not empty: something in it is kept
+                pass
+    return deleted
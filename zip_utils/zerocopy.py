@@ -0,0 +1,197 @@
+"""Kernel-side copies for STORED entries: copy_file_range/sendfile, with CRC-32 computed over mmap."""
+import errno
+import mmap
+import os
+import struct
+import zlib
+
+from pyzipper import zipfile as _zipfile
+
+from .planner import preallocate
+
+# Bytes handed to the kernel per call; progress and cancellation are checked in between
+ZERO_COPY_CHUNK = 16 * 1024 * 1024
+
+# Errors meaning "this syscall can't do that copy here", not "the copy failed"
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+def local_data_offset(zip_file, zinfo):
+    """Offset of an entry's data in the archive, from its local file header"""
+    with zip_file._lock:
+        zip_file.fp.seek(zinfo.header_offset)
+        local_header = zip_file.fp.read(_zipfile.sizeFileHeader)
+    if len(local_header) != _zipfile.sizeFileHeader or local_header[:4] != _zipfile.stringFileHeader:
+        raise _zipfile.BadZipFile("Bad magic number for file header")
+    fields = struct.unpack(_zipfile.structFileHeader, local_header)
+    return (zinfo.header_offset + _zipfile.sizeFileHeader
+            + fields[_zipfile._FH_FILENAME_LENGTH] + fields[_zipfile._FH_EXTRA_FIELD_LENGTH])
+
+
+def _fileno(fp):
+    """Helper function returning the OS file descriptor behind ``fp``, or None"""
+    try:
+        return fp.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def can_copy_raw(zip_file, zinfo):
+    """True when an entry's bytes on disk are exactly its content and the archive is a local file"""
+    return (zinfo.compress_type == _zipfile.ZIP_STORED
+            and not zinfo.flag_bits & _zipfile._MASK_ENCRYPTED
+            and not zinfo.is_dir()
+            and zinfo.compress_size == zinfo.file_size
+            and _fileno(zip_file.fp) is not None)
+
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, offset)
+
+
+def _sendfile(src_fd, dst_fd, offset, count):
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _copy_methods():
+    """Helper function listing the copy primitives this platform has, fastest first"""
+    methods = []
+    if hasattr(os, 'copy_file_range'):
+        methods.append(_copy_file_range)
+    if hasattr(os, 'sendfile'):
+        methods.append(_sendfile)
+    return methods
+
+
+def copy_range(src_fd, offset, count, dst_fd, reporter=None):
+    """
+    Copy ``count`` bytes at ``offset`` of ``src_fd`` to the current position of ``dst_fd``.
+
+    Uses ``copy_file_range`` (reflinks or in-kernel copy), then ``sendfile``
+    when the filesystem pair rejects it (e.g. across devices on older
+    kernels). The source file position is never touched. Returns the
+    number of bytes copied, which is short if the source ended early, or
+    None when neither syscall can do the copy: the bytes never go through
+    user space here, callers fall back to their buffered path instead.
+    """
+    methods = _copy_methods()
+    copied = 0
+    while copied < count:
+        if not methods:
+            return None
+        step = min(ZERO_COPY_CHUNK, count - copied)
+        try:
+            sent = methods[0](src_fd, dst_fd, offset + copied, step)
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+            methods.pop(0)
+            continue
+        if sent == 0:
+            break
+        copied += sent
+        if reporter is not None:
+            reporter.advance(sent)
+    return copied
+
+
+def crc32_of_file(fd, size, reporter=None):
+    """CRC-32 of the first ``size`` bytes of ``fd``, read through mmap instead of read() copies"""
+    if size == 0:
+        return 0
+    crc = 0
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            for start in range(0, size, ZERO_COPY_CHUNK):
+                crc = zlib.crc32(view[start:start + ZERO_COPY_CHUNK], crc)
+                if reporter is not None:
+                    reporter.check_cancelled()
+        finally:
+            view.release()
+    return crc
+
+
+def extract_stored(zip_file, zinfo, file_path, reporter=None):
+    """
+    Write a STORED, unencrypted entry to ``file_path`` without copying it through Python.
+
+    The data is copied by the kernel straight from the archive, then the
+    CRC-32 is verified over an mmap of the new file. Returns the size, or
+    None if the kernel can't do this copy (``file_path`` is then left for
+    the caller's buffered path to overwrite).
+    """
+    if not _copy_methods():
+        return None
+    src_fd = zip_file.fp.fileno()
+    offset = local_data_offset(zip_file, zinfo)
+    # Opened read/write so the CRC pass can map what was just written
+    with open(file_path, 'w+b') as target:
+        dst_fd = target.fileno()
+        preallocate(dst_fd, zinfo.file_size)
+        copied = copy_range(src_fd, offset, zinfo.file_size, dst_fd, reporter)
+        if copied is None:
+            return None
+        if copied != zinfo.file_size:
+            raise _zipfile.BadZipFile(f"Truncated data for {zinfo.filename!r}")
+        if crc32_of_file(dst_fd, zinfo.file_size, reporter) != zinfo.CRC:
+            raise _zipfile.BadZipFile(f"Bad CRC-32 for file {zinfo.filename!r}")
+    return zinfo.file_size
+
+
+def can_write_raw(zip_file, zinfo):
+    """True when an entry can be spliced into the archive as-is: STORED, unencrypted, seekable local output"""
+    return (zinfo.compress_type == _zipfile.ZIP_STORED
+            and getattr(zip_file, 'encryption', None) is None
+            and not zinfo.is_dir()
+            and zip_file._seekable
+            and _fileno(zip_file.fp) is not None)
+
+
+def write_stored(zip_file, zinfo, file_path, reporter=None):
+    """
+    Append ``file_path`` as a STORED entry without reading it through Python.
+
+    The CRC-32 is computed over an mmap of the source first, so the local
+    header can be written with its final sizes and CRC; the file bytes are
+    then copied by the kernel straight into the archive. Returns the size,
+    or None if the kernel can't do this copy (the archive is then left as
+    it was before the call).
+    """
+    if not _copy_methods():
+        return None
+    with open(file_path, 'rb') as source:
+        src_fd = source.fileno()
+        size = os.fstat(src_fd).st_size
+        zinfo.file_size = zinfo.compress_size = size
+        zinfo.CRC = crc32_of_file(src_fd, size, reporter)
+        zinfo.flag_bits = 0
+        if not zinfo.external_attr:
+            zinfo.external_attr = 0o600 << 16
+
+        zip64 = zip_file._allowZip64 and size > _zipfile.ZIP64_LIMIT
+        zip_file.fp.seek(zip_file.start_dir)
+        zinfo.header_offset = zip_file.fp.tell()
+        zip_file._writecheck(zinfo)
+        zip_file._didModify = True
+        zip_file.fp.write(zinfo.FileHeader(zip64))
+        zip_file.fp.flush()
+
+        # The kernel writes at the descriptor's position; the buffered file is re-synced afterwards
+        data_start = zip_file.fp.tell()
+        dst_fd = zip_file.fp.fileno()
+        os.lseek(dst_fd, data_start, os.SEEK_SET)
+        copied = copy_range(src_fd, 0, size, dst_fd, reporter)
+        if copied is None:
+            # Drop the header just written; the caller writes the entry its usual way
+            zip_file.fp.seek(zinfo.header_offset)
+            zip_file.fp.truncate()
+            return None
+        if copied != size:
+            raise OSError(f"File changed size while being archived: {file_path}")
+        zip_file.fp.seek(data_start + size)
+
+    zip_file.start_dir = zip_file.fp.tell()
+    zip_file.filelist.append(zinfo)
+    zip_file.NameToInfo[zinfo.filename] = zinfo
+    return size